@@ -1,2 +1,2 @@
-
 from resolva.resolver import Resolver
+from resolva.router import ResolverRouter
@@ -0,0 +1,12 @@
+"""
+This file is part of resolva.
+(C) copyright 2024 Michael Haussmann, spil@xeo.info
+resolva is free software and is distributed under the MIT License. See LICENSE file.
+
+Entry point for "python -m resolva", see resolva.cli
+"""
+import sys
+
+from resolva.cli import main
+
+sys.exit(main())
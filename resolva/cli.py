@@ -0,0 +1,352 @@
+"""
+This file is part of resolva.
+(C) copyright 2024 Michael Haussmann, spil@xeo.info
+resolva is free software and is distributed under the MIT License. See LICENSE file.
+
+Command line interface, to resolve lists of paths, streamed from stdin or files.
+
+Examples
+
+    find /mnt/prods -type f | python -m resolva -p patterns.json
+    python -m resolva -p pattern.py --variable sid_templates --mode all --output tsv dump.txt
+    python -m resolva -p patterns.yaml --mmap --workers 8 big_dump.txt > resolved.jsonl
+
+Each result is written as one line (or one line per matching label, in "all" mode):
+the input path, the matching label, and the resolved data.
+Throughput is reported on stderr at the end.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Iterable, Iterator, TextIO
+import argparse
+import concurrent.futures
+import csv
+import io
+import json
+import mmap
+import os
+import runpy
+import sys
+import time
+from collections import deque
+
+from resolva.resolver import Resolver  # type: ignore
+from resolva.utils import log, batched, ResolvaException  # type: ignore
+
+_cli_id = "resolva.cli"
+_encoding = sys.getfilesystemencoding()
+_errors = "surrogateescape"  # undecodable bytes are kept as is, and written back identically
+
+# worker process resolver, created by _init_worker
+_worker_resolver: Resolver | None = None
+
+
+def load_patterns(path: str, variable: str | None = None) -> dict[str, str]:
+    """
+    Loads a patterns dictionary from a JSON, YAML or python file.
+
+    For a python file, the dictionary is read from the given variable name.
+    If no variable name is given, the "patterns" variable is used,
+    or the only dictionary of strings defined in the file.
+
+    Reading YAML requires the optional PyYAML package.
+
+    Args:
+        path: path to a .json, .yaml / .yml or .py file
+        variable: name of the variable holding the patterns, in a python file
+
+    Returns:
+        The {label: pattern} dictionary
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".json":
+        with open(path, encoding="utf-8") as f:
+            patterns = json.load(f)
+
+    elif extension in (".yaml", ".yml"):
+        try:
+            import yaml  # type: ignore
+        except ImportError:
+            raise ResolvaException(f'Reading "{path}" requires PyYAML (pip install pyyaml)')
+        with open(path, encoding="utf-8") as f:
+            patterns = yaml.safe_load(f)
+
+    elif extension == ".py":
+        namespace = runpy.run_path(path)
+        if variable:
+            patterns = namespace.get(variable)
+        elif isinstance(namespace.get("patterns"), dict):
+            patterns = namespace["patterns"]
+        else:
+            found = [v for k, v in namespace.items() if not k.startswith("_") and isinstance(v, dict)
+                     and v and all(isinstance(p, str) for p in v.values())]
+            if len(found) != 1:
+                raise ResolvaException(f'Cannot choose the patterns in "{path}", please give a variable name.')
+            patterns = found[0]
+
+    else:
+        raise ResolvaException(f'Unsupported patterns file "{path}" (use .json, .yaml, .yml or .py)')
+
+    if not isinstance(patterns, dict):
+        raise ResolvaException(f'No patterns dictionary found in "{path}"')
+    return patterns
+
+
+def read_lines(paths: list[str], use_mmap: bool = False) -> Iterator[str]:
+    """
+    Yields lines without line endings, from the given files, or from stdin if no file (or "-") is given.
+    Lines are read one by one, so that memory stays constant whatever the input size.
+
+    Args:
+        paths: list of file paths. "-" means stdin.
+        use_mmap: if files should be memory mapped, instead of read through a file buffer.
+
+    Returns:
+        iterator over lines
+    """
+    for path in paths or ["-"]:
+
+        if path == "-":
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding=_encoding, errors=_errors)
+            for line in stream:
+                yield line.rstrip("\r\n")
+
+        elif use_mmap:
+            with open(path, "rb") as f:
+                if not os.fstat(f.fileno()).st_size:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for raw in iter(mapped.readline, b""):
+                        yield raw.rstrip(b"\r\n").decode(_encoding, _errors)
+
+        else:
+            with open(path, encoding=_encoding, errors=_errors) as f:
+                for line in f:
+                    yield line.rstrip("\r\n")
+
+
+def resolve_lines(resolver: Resolver, lines: Iterable[str], mode: str = "first",
+                  keep_unmatched: bool = False) -> list[tuple]:
+    """
+    Resolves the given lines, and returns a list of (path, label, data) result tuples.
+
+    Modes:
+    - first: the first matching label and its data (resolve_first)
+    - all: one result per matching label (resolve_all)
+    - label: the first matching label, without data (labels_of)
+
+    Args:
+        resolver: the Resolver
+        lines: strings to resolve
+        mode: "first", "all" or "label"
+        keep_unmatched: if non matching lines are returned, as (path, None, None)
+
+    Returns:
+        list of (path, label, data) tuples
+    """
+    results: list = []
+    if mode == "label":
+        lines = list(lines)
+        for line, label in zip(lines, resolver.labels_of(lines)):
+            if label is not None:
+                results.append((line, label, None))
+            elif keep_unmatched:
+                results.append((line, None, None))
+        return results
+
+    for line in lines:
+        if mode == "all":
+            found = resolver.resolve_all(line)
+            for label, data in found.items():
+                results.append((line, label, data))
+            matched = bool(found)
+        else:
+            label, data = resolver.resolve_first(line)
+            matched = label is not None
+            if matched:
+                results.append((line, label, data))
+        if keep_unmatched and not matched:
+            results.append((line, None, None))
+    return results
+
+
+def _init_worker(resolver: Resolver) -> None:
+    global _worker_resolver
+    log.setLevel(log.ERROR)
+    _worker_resolver = resolver
+
+
+def _resolve_batch(lines: list[str], mode: str, keep_unmatched: bool) -> list[tuple]:
+    return resolve_lines(_worker_resolver, lines, mode, keep_unmatched)  # type: ignore
+
+
+def get_writer(output_format: str, stream: TextIO) -> Callable[[list[tuple]], None]:
+    """
+    Returns a function that writes a list of (path, label, data) results to the stream.
+
+    Formats:
+    - jsonl: one json object per line, with "path", "label" and "data".
+    - tsv: tab separated path, label and compact json data.
+    - csv: comma separated path, label and compact json data.
+    """
+    def dump(data):
+        return "" if data is None else json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    if output_format == "jsonl":
+        def write(results):
+            stream.write("".join(json.dumps({"path": path, "label": label, "data": data},
+                                            ensure_ascii=False) + "\n"
+                                 for path, label, data in results))
+
+    elif output_format == "tsv":
+        def write(results):
+            stream.write("".join(f"{path}\t{label or ''}\t{dump(data)}\n"
+                                 for path, label, data in results))
+
+    elif output_format == "csv":
+        csv_writer = csv.writer(stream, lineterminator="\n")
+
+        def write(results):
+            csv_writer.writerows((path, label or "", dump(data)) for path, label, data in results)
+
+    else:
+        raise ResolvaException(f'Unknown output format "{output_format}"')
+
+    return write
+
+
+def run(resolver_patterns: dict[str, str], lines: Iterable[str], write: Callable[[list[tuple]], None],
+        mode: str = "first", workers: int = 1, batch_size: int = 10000, keep_unmatched: bool = False,
+        options: dict[str, Any] | None = None) -> tuple[int, int]:
+    """
+    Resolves the lines by batches, and writes the results.
+
+    With several workers, batches are resolved in worker processes.
+    The number of batches in flight is bounded, so that memory stays constant,
+    and results are written in input order.
+
+    Returns:
+        tuple (number of lines, number of results)
+    """
+    options = options or {}
+    count = 0
+    resolved = 0
+    resolver = Resolver(_cli_id, resolver_patterns, **options)
+
+    if workers <= 1:
+        for batch in batched(lines, batch_size):
+            results = resolve_lines(resolver, batch, mode, keep_unmatched)
+            write(results)
+            count += len(batch)
+            resolved += len(results)
+        return count, resolved
+
+    # workers get the compiled Resolver, pickled (see Resolver.__getstate__)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                initargs=(resolver,)) as executor:
+        pending: deque = deque()
+        for batch in batched(lines, batch_size):
+            pending.append(executor.submit(_resolve_batch, batch, mode, keep_unmatched))
+            count += len(batch)
+            while len(pending) >= workers * 2:
+                results = pending.popleft().result()
+                write(results)
+                resolved += len(results)
+        while pending:
+            results = pending.popleft().result()
+            write(results)
+            resolved += len(results)
+
+    return count, resolved
+
+
+def scan(resolver_patterns: dict[str, str], paths: list[str], write: Callable[[list[tuple]], None],
+         mode: str = "first", workers: int = 1, options: dict[str, Any] | None = None) -> int:
+    """
+    Resolves memory mapped files with Resolver.resolve_file, and writes the results.
+
+    Returns:
+        the number of results
+    """
+    resolver = Resolver(_cli_id, resolver_patterns, **(options or {}))
+
+    resolved = 0
+    for path in paths:
+        resolved += resolver.resolve_file(path, mode, workers=workers, sink=write)  # type: ignore
+    return resolved
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m resolva",
+                                     description="Resolves paths from stdin or files, using resolva patterns.")
+    parser.add_argument("files", nargs="*", help='files containing one path per line. Default or "-" is stdin.')
+    parser.add_argument("-p", "--patterns", required=True, help="patterns file (.json, .yaml, .yml or .py)")
+    parser.add_argument("--variable", help="name of the patterns dictionary, in a python patterns file")
+    parser.add_argument("-m", "--mode", choices=["first", "all", "label"], default="first",
+                        help="first: first match, all: every matching label, label: first matching label only")
+    parser.add_argument("-o", "--output", choices=["jsonl", "tsv", "csv"], default="jsonl", help="output format")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--batch-size", type=int, default=10000, help="number of lines per batch")
+    parser.add_argument("--buffer-size", type=int, default=1 << 20, help="output buffer size, in bytes")
+    parser.add_argument("--mmap", action="store_true", help="memory map input files, and scan them in place")
+    parser.add_argument("--keep-unmatched", action="store_true", help="also write lines that do not resolve")
+    parser.add_argument("--no-anchor-start", action="store_true", help='patterns do not start with "^"')
+    parser.add_argument("--no-anchor-end", action="store_true", help='patterns do not end with "$"')
+    parser.add_argument("--strict", action="store_true", help='literal pattern text is escaped, eg. "." is not a wildcard')
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not report throughput on stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    log.setLevel(log.ERROR)
+
+    try:
+        patterns = load_patterns(args.patterns, args.variable)
+    except (OSError, ValueError, ResolvaException) as error:
+        print(f"resolva: {error}", file=sys.stderr)
+        return 2
+    options = {"anchor_start": not args.no_anchor_start, "anchor_end": not args.no_anchor_end, "strict": args.strict}
+
+    output = open(sys.stdout.fileno(), "w", encoding=_encoding, errors=_errors, newline="",
+                  buffering=args.buffer_size, closefd=False)
+    write = get_writer(args.output, output)
+
+    # memory mapped files are scanned in place by the Resolver, without decoding every line.
+    scan_files = args.mmap and args.files and "-" not in args.files and not args.keep_unmatched
+
+    start = time.perf_counter()
+    try:
+        try:
+            if scan_files:
+                count = sum(os.path.getsize(path) for path in args.files)
+                resolved = scan(patterns, args.files, write, mode=args.mode, workers=args.workers, options=options)
+            else:
+                count, resolved = run(patterns, read_lines(args.files, args.mmap), write, mode=args.mode,
+                                      workers=args.workers, batch_size=args.batch_size,
+                                      keep_unmatched=args.keep_unmatched, options=options)
+        finally:
+            output.flush()
+    except BrokenPipeError:
+        # the reader closed the output, eg. "| head -1": stop quietly, and leave nothing to flush at exit.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except OSError as error:
+        print(f"resolva: {error}", file=sys.stderr)
+        return 2
+    duration = time.perf_counter() - start
+
+    if not args.quiet:
+        if scan_files:
+            rate = count / duration / 1e6 if duration else 0
+            report = f"{count / 1e6:.1f} MB, {resolved} results in {duration:.3f}s ({rate:,.1f} MB/s)"
+        else:
+            rate = count / duration if duration else 0
+            report = f"{count} lines, {resolved} results in {duration:.3f}s ({rate:,.0f} lines/s)"
+        print(f"resolva: {report}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
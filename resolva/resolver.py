@@ -4,15 +4,210 @@ This file is part of resolva.
 resolva is free software and is distributed under the MIT License. See LICENSE file.
 """
 from __future__ import annotations
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, Sequence
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+import concurrent.futures
 import functools
+import itertools
+import mmap
+import operator
+import os
 import string as _string
 import re
+import sys
+import time
+import weakref
 
 from resolva import template  # type: ignore
-from resolva.utils import log, ResolvaException  # type: ignore
+from resolva.utils import log, batched, get_size, ResolvaException  # type: ignore
 
-instance_cache: dict = {}
+# paths are decoded like os.fsdecode
+_fs_encoding = sys.getfilesystemencoding()
+_fs_errors = sys.getfilesystemencodeerrors()
+
+# Resolver used by worker processes (see Resolver.resolve_file)
+_worker_resolver = None
+
+# version of the compiled state, used to pickle Resolvers (see Resolver.__getstate__)
+_state_version = 7
+
+# marks a result missing from a cache, where None is a valid result (see Resolver._get_format_result)
+_no_result = object()
+
+
+def _get_heavy_labels(backtracking: dict[str, tuple], linear: set[str] = frozenset()) -> set[str]:  # type: ignore
+    """
+    Returns the labels whose regex may backtrack heavily (see template.get_backtracking_degree):
+    exponentially, polynomially with a degree of 3 or more, or with a degree of 2 over whole paths.
+    Labels run by a linear time regex backend (see template.get_regex_backend) never are.
+    """
+    return {label for label, (degree, crosses) in backtracking.items()
+            if label not in linear and (degree is None or degree >= 3 or (degree >= 2 and crosses))}
+
+
+class _TimedRegex:
+    """
+    Compiled regex wrapper, adding the time spent in each search or match to a [calls, time, max time] list.
+    Used by the profile option of the Resolver (see Resolver.get_cost_report).
+    """
+    __slots__ = ('regex', 'timing')
+
+    def __init__(self, regex: re.Pattern, timing: list):
+        self.regex = regex
+        self.timing = timing
+
+    def _account(self, start: float) -> None:
+        duration = time.perf_counter() - start
+        timing = self.timing
+        timing[0] += 1
+        timing[1] += duration
+        if duration > timing[2]:
+            timing[2] = duration
+
+    def search(self, string, *args):
+        start = time.perf_counter()
+        try:
+            return self.regex.search(string, *args)
+        finally:
+            self._account(start)
+
+    def match(self, string, *args):
+        start = time.perf_counter()
+        try:
+            return self.regex.match(string, *args)
+        finally:
+            self._account(start)
+
+
+class InstanceCache(MutableMapping):
+    """
+    Cache of Resolver instances, by id (see Resolver.get).
+
+    By default, instances are kept until they are replaced or dropped (see Resolver.drop).
+    The cache can be configured to drop:
+    - the least recently used instances, beyond *max_size* instances.
+    - instances that were not used for more than *ttl* seconds.
+    - instances that are no longer referenced elsewhere, if *weak* is True: only weak references are kept.
+
+    Example
+
+        >>> cache = InstanceCache(max_size=2)
+        >>> cache["a"], cache["b"] = "resolver a", "resolver b"
+        >>> __ = cache["a"]  # "b" is now the least recently used
+        >>> cache["c"] = "resolver c"
+        >>> list(cache)
+        ['a', 'c']
+    """
+
+    def __init__(self, max_size: int = 0, ttl: float = 0, weak: bool = False):
+        """
+        Args:
+            max_size: maximum number of instances. 0 (default) is unbounded.
+            ttl: number of seconds an instance is kept after its last use. 0 (default) keeps it forever.
+            weak: if only weak references to the instances are kept.
+        """
+        self._entries: OrderedDict = OrderedDict()  # id: (instance or weak reference, time of last use)
+        self.max_size = 0
+        self.ttl = 0.0
+        self.weak = False
+        self.configure(max_size, ttl, weak)
+
+    def configure(self, max_size: int | None = None, ttl: float | None = None, weak: bool | None = None) -> None:
+        """
+        Changes the eviction settings (see InstanceCache). Arguments left to None are not changed.
+        Existing instances are evicted, or their references converted, according to the new settings.
+        """
+        if max_size is not None:
+            self.max_size = max_size
+        if ttl is not None:
+            self.ttl = ttl
+        if weak is not None and weak != self.weak:
+            instances = {k: self._peek(k) for k in list(self._entries)}
+            self.weak = weak
+            now = time.monotonic()
+            self._entries = OrderedDict((k, (self._reference(k, v), now)) for k, v in instances.items()
+                                        if v is not None)
+        self._evict()
+
+    def _reference(self, id: Any, instance: Resolver) -> Any:
+        if not self.weak:
+            return instance
+
+        def forget(reference):
+            entry = self._entries.get(id)
+            if entry is not None and entry[0] is reference:
+                del self._entries[id]
+
+        return weakref.ref(instance, forget)
+
+    def _peek(self, id: Any) -> Resolver | None:
+        """
+        Returns the instance for the id, without marking it as used, or None if there is none, or if it expired.
+        """
+        entry = self._entries.get(id)
+        if entry is None:
+            return None
+        reference, used = entry
+        instance = reference() if self.weak else reference
+        if instance is None or (self.ttl and time.monotonic() - used > self.ttl):
+            del self._entries[id]
+            return None
+        return instance
+
+    def _evict(self) -> None:
+        """
+        Drops the least recently used instances beyond max_size, and the expired instances.
+        """
+        entries = self._entries
+        while self.max_size and len(entries) > self.max_size:
+            entries.popitem(last=False)
+        if self.ttl:
+            limit = time.monotonic() - self.ttl
+            while entries and next(iter(entries.values()))[1] < limit:
+                entries.popitem(last=False)
+
+    def __getitem__(self, id: Any) -> Resolver:
+        instance = self._peek(id)
+        if instance is None:
+            raise KeyError(id)
+        self._entries[id] = (self._entries[id][0], time.monotonic())
+        self._entries.move_to_end(id)
+        return instance
+
+    def __setitem__(self, id: Any, instance: Resolver) -> None:
+        self._entries[id] = (self._reference(id, instance), time.monotonic())
+        self._entries.move_to_end(id)
+        self._evict()
+
+    def __delitem__(self, id: Any) -> None:
+        del self._entries[id]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __iter__(self) -> Iterator:
+        return iter([k for k in list(self._entries) if self._peek(k) is not None])
+
+    def __len__(self) -> int:
+        return len(list(iter(self)))
+
+    def __repr__(self):
+        return f'resolva.resolver.InstanceCache({list(self)}, max_size={self.max_size}, ttl={self.ttl}, weak={self.weak})'
+
+    def get_memory_usage(self) -> dict[Any, int]:
+        """
+        Returns the approximate memory held by each cached instance, in bytes (see Resolver.get_memory_usage).
+        """
+        found = {}
+        for id in list(self._entries):
+            instance = self._peek(id)
+            if instance is not None:
+                found[id] = instance.get_memory_usage()['total']
+        return found
+
+
+instance_cache = InstanceCache()
 
 
 class Resolver:
@@ -49,7 +244,20 @@ class Resolver:
     def __init__(self, id: str, patterns: dict[str, str],
                  check_duplicate_placeholders: bool = True,
                  anchor_start: bool = True,
-                 anchor_end: bool = True
+                 anchor_end: bool = True,
+                 intern_values: bool = False,
+                 intern_table_size: int = 10000,
+                 hierarchy: dict[str, str | None] | None = None,
+                 analyze: bool = False,
+                 strict: bool = False,
+                 miss_cache_size: int = 10000,
+                 directory_cache_size: int = 0,
+                 result_cache_size: int = 128,
+                 split_matchers: bool = True,
+                 max_input_length: int = 0,
+                 profile: bool = False,
+                 regex_backend: str = 're',
+                 format_cache_size: int = 0
                  ):
         """
         Creates a Resolver instance.
@@ -64,6 +272,7 @@ class Resolver:
         Also, each pattern in the "patterns" dictionary is translated into a "format" string.
         This string is used to apply the format function, for the Resolvers formatting feature.
         All "format" strings are stored in an internal "formats" dict, with labels as keys.
+        Each "format" string is compiled into a formatting function, that joins literal fragments and values.
 
         Each pattern is a string containing keywords, in curly brackets, eg "{project}", that will be matched by the Resolver.
         These keywords are stored in an internal "keys" dictionary, with labels as dict keys, and a set of keywords as value.
@@ -84,16 +293,61 @@ class Resolver:
             check_duplicate_placeholders: if the pattern may contain duplicate placeholders, and if the Resolver should check if their resolved values are identical.
             anchor_start: if each patterns starts with regex "^"
             anchor_end: if each patterns ends with regex "$"
+            intern_values: if resolved keys and values should be interned, so that equal strings share the same object.
+                           Values from "enum style" placeholders, eg. "{task:(board|layout|anim)}", are always the same object.
+            intern_table_size: maximum number of other (non enum) values held in the Resolvers intern table.
+            hierarchy: optional {label: parent label} dictionary, declaring the parent of each pattern (see get_hierarchy).
+                       By default, the hierarchy is detected from the patterns.
+            analyze: if the patterns should be analysed on creation, to detect shadowed and disjoint patterns (see analyze).
+            strict: if the literal (non placeholder) text of the patterns is escaped, and matches literally.
+                    By default, it is used as regex, eg. "." matches any character.
+            miss_cache_size: maximum number of strings, and of directories, kept in the cache of strings that match nothing.
+                             0 disables the miss cache.
+            directory_cache_size: maximum number of directories for which resolve_first keeps the possible labels,
+                                  and the data resolved from the directory, to only match the last segment of
+                                  sibling paths. 0 (default) disables it.
+            result_cache_size: maximum number of results kept in the cache of each resolve method.
+                               0 disables the result caches.
+            split_matchers: if segment aligned patterns are matched by generated functions, that compare the
+                            segments of the split string, instead of running the regex (see construct_split_matcher).
+                            Only applies with anchor_start and anchor_end. The results are identical.
+            max_input_length: patterns that may backtrack heavily (see get_cost_report) do not match strings
+                              longer than this length, so that they can not stall resolving. 0 (default) disables it.
+            profile: if the time spent running each patterns regex is measured (see get_cost_report).
+                     Split matchers are then disabled, so that every pattern is measured.
+            regex_backend: the regex engine running the patterns: "re" (default), "re2" (linear time, needs google-re2),
+                           "regex" (needs the regex module), or a registered backend (see template.register_regex_backend).
+                           Patterns using a feature the backend lacks are run by re (see get_cost_report).
+            format_cache_size: maximum number of results kept in the cache of the format_first, format_one and
+                               format_all methods, keyed on the data (see get_format_cache_info). 0 (default) disables it.
         """
 
         # this is just to have a more readable dict comprehension loop later (k: construct_regex(v) ...)
         construct_regex = functools.partial(template.construct_regular_expression,
                                             anchor_start=anchor_start,
-                                            anchor_end=anchor_end)
+                                            anchor_end=anchor_end,
+                                            strict=strict)
 
         self._id = id
         self._patterns = patterns
+        self._options = {'check_duplicate_placeholders': check_duplicate_placeholders,
+                         'anchor_start': anchor_start,
+                         'anchor_end': anchor_end,
+                         'intern_values': intern_values,
+                         'intern_table_size': intern_table_size,
+                         'hierarchy': hierarchy,
+                         'analyze': analyze,
+                         'strict': strict,
+                         'miss_cache_size': miss_cache_size,
+                         'directory_cache_size': directory_cache_size,
+                         'result_cache_size': result_cache_size,
+                         'split_matchers': split_matchers,
+                         'max_input_length': max_input_length,
+                         'profile': profile,
+                         'regex_backend': regex_backend,
+                         'format_cache_size': format_cache_size}
         self._regexes = {k: construct_regex(v) for k, v in patterns.items()}
+        self._compile_backend()
         self._formats = {k: template.construct_format_specification(v) for k, v in patterns.items()}
         _keys = {k: set(template.get_keys(v)) for k, v in patterns.items()}
 
@@ -103,7 +357,51 @@ class Resolver:
             raise ResolvaException(f'Keys not identical in check: "{_keys}" vs "{_keysB}"')
 
         self._keys = _keys
-        self.check_duplicate_placeholders = check_duplicate_placeholders
+
+        # pattern segments, and parent / child hierarchy (see get_hierarchy).
+        # Segment alignment and the detected hierarchy are computed on first use (see _is_aligned and _get_hierarchy).
+        self._segments = {k: template.split_segments(v) for k, v in patterns.items()}
+        self._aligned: dict[str, bool] = {}
+        self._hierarchy = None if hierarchy is None else self._build_hierarchy(hierarchy)
+
+        # used by bulk formatting: keys in order of appearance, and per value validation regexes.
+        self._key_order = {k: tuple(dict.fromkeys(template.get_keys(v))) for k, v in patterns.items()}
+        self._validators = {k: template.construct_value_validators(v, strict) for k, v in patterns.items()}
+
+        # optional interning of resolved keys and values, seeded with keys and enum values.
+        self._intern_constants = None
+        if intern_values:
+            self._intern_constants = [key for keys in _keys.values() for key in keys]
+            for pattern in patterns.values():
+                for __, expression in template.get_placeholders(pattern):
+                    self._intern_constants.extend(template.get_literal_values(expression))
+
+        # separator count and length bounds per label (see get_pattern_bounds).
+        self._bounds = {k: self._get_bounds(template.get_pattern_bounds(v, strict)) for k, v in patterns.items()}
+
+        # backtracking degree per label (see get_backtracking_degree), and labels that may backtrack heavily.
+        # They are analysed on first use: with max_input_length, or by get_cost_report (see _get_backtracking).
+        self._backtracking: dict[str, tuple] | None = None
+        self._heavy: set[str] = set()
+        if max_input_length:
+            self._get_backtracking()
+
+        # literal prefix, suffixes, substring and length bounds per label, checked before running the regex.
+        self._checks = {k: template.get_literal_checks(v, anchor_start, anchor_end, strict) +
+                        self._limit_length(k, self._bounds[k][2:]) for k, v in patterns.items()}
+
+        # patterns that can be matched in parts (see _is_dead_directory and _resolve_in_directory).
+        self._context_free = {k: template.is_context_free(v, strict) for k, v in patterns.items()}
+        self._last_segment_ready: dict[str, bool] = {}  # computed on first use (see _is_last_segment_ready)
+
+        # pattern analysis results (see analyze)
+        self._analysis: dict[str, dict] | None = None
+
+        self._setup()
+
+        if analyze:
+            for label, earlier in self.analyze()['shadowed'].items():
+                log.warning(f'Pattern "{label}" is shadowed by "{earlier}", it is never returned by resolve_first.')
 
         log.info(f'Resolver class init - id: "{id}"')
 
@@ -112,6 +410,257 @@ class Resolver:
             log.info(f'Resolver instance already exists at "{id}". Will be overriden with: {self}')
         instance_cache[id] = self
 
+    def _setup(self) -> None:
+        """
+        Sets up the runtime state of the Resolver: formatters, matchers and caches.
+        It is derived from the compiled state, on creation, and when unpickled (see __getstate__).
+        """
+        options = self._options
+        self.check_duplicate_placeholders = options['check_duplicate_placeholders']
+        self._formatters = {k: template.construct_formatter(v) for k, v in self._formats.items()}
+
+        # bytes variants of the regexes and formatters, compiled on first use.
+        self._bytes_regexes: dict[str, re.Pattern] | None = None
+        self._bytes_formatters: dict[str, Callable] | None = None
+        self._line_regexes: dict[str, re.Pattern] | None = None  # to scan lines in files (see resolve_file)
+
+        self._relatives: tuple[dict, dict] | None = None  # descendants and ancestors (see _get_relatives)
+        self._relative_regexes: dict[tuple[str, str], re.Pattern] = {}  # compiled on first use
+
+        self._intern = None
+        if self._intern_constants is not None:
+            self._intern = template.make_interner(self._intern_constants, max_size=options['intern_table_size'])
+
+        self._matchers = [(k, v) + self._checks[k] for k, v in self._backend_regexes.items()]
+
+        # time spent per label, with the profile option (see get_cost_report)
+        self._timings: dict[str, list] = {k: [0, 0.0, 0.0] for k in self._patterns.keys()}
+        if options['profile']:
+            self._matchers = [(k, _TimedRegex(v, self._timings[k])) + self._checks[k]
+                              for k, v in self._backend_regexes.items()]
+        self._split_matchers: dict[str, Callable | None] = {}  # generated on first use (see _get_split_matcher)
+        self._multi_matchers: dict[int, tuple | None] = {}  # per separator count (see _get_multi_matcher)
+        self._completer: Callable | None = None  # built on first use (see complete)
+        self._bytes_checks: dict[str, tuple] | None = None  # encoded on first use
+        self._bytes_matchers: list[tuple] | None = None
+        self._count_matchers: dict[tuple, list[tuple]] = {}  # matchers per separator count (see _get_matchers)
+
+        # per instance caches of resolved results, so that they are released with the instance.
+        size = options['result_cache_size']
+        self._first_results: dict | None = {} if size > 0 else None
+        self._all_results: dict | None = {} if size > 0 else None
+        self._one_results: dict | None = {} if size > 0 else None
+        self._label_results: dict | None = {} if size > 0 else None  # match only caches (see label_of)
+        self._match_results: dict | None = {} if size > 0 else None
+
+        # cache of formatted results, keyed on the method and the frozen data (see _get_format_result).
+        self._format_results: dict | None = {} if options['format_cache_size'] > 0 else None
+        self._format_stats = [0, 0]  # hits, misses
+        self._value_getters = {k: operator.itemgetter(*v) for k, v in self._key_order.items() if v}
+
+        # labels whose matches are only valid with their data: patterns without placeholders (empty data),
+        # and duplicate placeholders to check. Other matches are tested without extracting groups (see matches).
+        self._data_checked = {k for k, v in self._patterns.items()
+                              if not self._keys[k] or (self.check_duplicate_placeholders and
+                                                       len(template.get_keys(v)) != len(self._keys[k]))}
+
+        # cache of strings that match no pattern, and of directories under which nothing can match (see _add_miss).
+        # It is kept apart from the result caches, so that misses do not evict resolved results.
+        self._misses: dict | None = {} if options['miss_cache_size'] > 0 else None
+        self._directories: dict[str, bool] = {}  # directory: True if nothing can match below it
+        self._dead_directories: set[str] = set()
+        self._directory_regexes: dict[tuple[str, int], re.Pattern] = {}  # compiled on first use
+
+        # per directory: possible labels, and data resolved from the directory (see _resolve_in_directory).
+        self._directory_entries: dict[str, list[tuple]] = {}
+        self._prefix_regexes: dict[tuple[str, int], re.Pattern] = {}  # compiled on first use
+        self._last_segment_regexes: dict[str, re.Pattern] = {}
+
+        # patterns tried by resolve_first, and disjoint patterns per label (see analyze).
+        self._first_regexes = self._regexes
+        self._first_matchers = self._matchers
+        self._disjoint: dict[str, frozenset] | None = None
+        if self._analysis is not None:
+            self._apply_analysis(self._analysis)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        Returns the compact compiled state of the Resolver, used by pickle and copy.
+
+        The state holds the patterns, options, generated regex sources, format strings, keys,
+        and the results of the pattern analysis, so that a Resolver can be sent to worker processes,
+        and rebuilt without translating the patterns again.
+        Caches are not included.
+        """
+        return {'version': _state_version,
+                'id': self._id,
+                'patterns': self._patterns,
+                'options': self._options,
+                'regexes': {k: (v.pattern, v.flags) for k, v in self._regexes.items()},
+                'formats': self._formats,
+                'keys': self._keys,
+                'segments': self._segments,
+                'aligned': self._aligned,
+                'hierarchy': self._hierarchy,
+                'key_order': self._key_order,
+                'validators': {k: None if v is None else {key: regex.pattern for key, regex in v.items()}
+                               for k, v in self._validators.items()},
+                'intern_constants': self._intern_constants,
+                'bounds': self._bounds,
+                'checks': self._checks,
+                'context_free': self._context_free,
+                'last_segment_ready': self._last_segment_ready,
+                'analysis': self._analysis,
+                'backtracking': self._backtracking}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """
+        Rebuilds the Resolver from its compiled state (see __getstate__).
+        The rebuilt Resolver is not added to the instance cache.
+        """
+        if state.get('version') != _state_version:
+            raise ResolvaException(f'Unsupported Resolver state version: {state.get("version")!r}')
+
+        self._id = state['id']
+        self._patterns = state['patterns']
+        self._options = state['options']
+        self._regexes = {k: re.compile(source, flags) for k, (source, flags) in state['regexes'].items()}
+        self._compile_backend()
+        self._formats = state['formats']
+        self._keys = state['keys']
+        self._segments = state['segments']
+        self._aligned = state['aligned']
+        self._hierarchy = state['hierarchy']
+        self._key_order = state['key_order']
+        self._validators = {k: None if v is None else {key: re.compile(source) for key, source in v.items()}
+                            for k, v in state['validators'].items()}
+        self._intern_constants = state['intern_constants']
+        self._bounds = state['bounds']
+        self._checks = state['checks']
+        self._context_free = state['context_free']
+        self._last_segment_ready = state['last_segment_ready']
+        self._analysis = state['analysis']
+        self._backtracking = state['backtracking']
+        self._heavy = set() if self._backtracking is None else _get_heavy_labels(self._backtracking, self._linear)
+        self._setup()
+
+    def _compile_backend(self) -> None:
+        """
+        Compiles the regexes run by the resolve methods with the regex backend option (see template.compile_with_backend).
+        Patterns that the backend can not compile keep their re regex.
+        """
+        backend = self._options['regex_backend']
+        __, linear = template.get_regex_backend(backend)
+        self._backend_regexes: dict[str, Any] = {}
+        self._backends: dict[str, str] = {}
+        for label, regex in self._regexes.items():
+            self._backend_regexes[label], self._backends[label] = template.compile_with_backend(regex, backend)
+            if self._backends[label] != backend:
+                log.info(f'Pattern "{label}" can not be compiled by the "{backend}" regex backend, it is run by "re".')
+        self._linear = {label for label, name in self._backends.items() if linear and name == backend}
+
+    def _build_hierarchy(self, declared: dict[str, str | None] | None) -> dict[str, str | None]:
+        """
+        Returns the {label: parent label} hierarchy, as declared, or detected from the patterns segments.
+
+        A pattern is the parent of another, if its segments are the first segments of the other pattern.
+        Only segment aligned patterns can be parents, and if several can, the longest is the parent.
+        """
+        anchored = self._options['anchor_start'] and self._options['anchor_end']
+
+        def extends(label, parent):
+            parent_segments = self._segments[parent]
+            segments = self._segments[label]
+            return len(parent_segments) < len(segments) and segments[:len(parent_segments)] == parent_segments
+
+        if declared is not None:
+            if not anchored:
+                raise ResolvaException('A pattern hierarchy needs anchored patterns (anchor_start and anchor_end).')
+            for label, parent in declared.items():
+                if label not in self._patterns or (parent is not None and parent not in self._patterns):
+                    raise ResolvaException(f'Unknown label in hierarchy: "{label}" -> "{parent}"')
+                if parent is not None and not extends(label, parent):
+                    raise ResolvaException(f'Pattern "{label}" does not start with the segments of its parent "{parent}"')
+            return {label: declared.get(label) for label in self._patterns.keys()}
+
+        hierarchy: dict[str, str | None] = {label: None for label in self._patterns.keys()}
+        if not anchored:
+            return hierarchy
+
+        for label in self._patterns.keys():
+            for other in self._patterns.keys():
+                if other != label and extends(label, other) and self._is_aligned(other):
+                    parent = hierarchy[label]
+                    if parent is None or len(self._segments[other]) > len(self._segments[parent]):
+                        hierarchy[label] = other
+        return hierarchy
+
+    def _get_hierarchy(self) -> dict[str, str | None]:
+        """
+        Returns the {label: parent label} hierarchy, detected from the patterns on first use (see get_hierarchy).
+        """
+        if self._hierarchy is None:
+            self._hierarchy = self._build_hierarchy(None)
+        return self._hierarchy
+
+    def _get_relatives(self) -> tuple[dict[str, list[str]], dict[str, set[str]]]:
+        """
+        Returns the descendants (in patterns order) and the ancestors of each label, from the hierarchy.
+        """
+        if self._relatives is None:
+            hierarchy = self._get_hierarchy()
+            descendants: dict[str, list[str]] = {k: [] for k in self._patterns.keys()}
+            for label in self._patterns.keys():
+                parent = hierarchy[label]
+                while parent is not None:
+                    descendants[parent].append(label)
+                    parent = hierarchy[parent]
+            ancestors: dict[str, set[str]] = {k: set() for k in self._patterns.keys()}
+            for label, labels in descendants.items():
+                for descendant in labels:
+                    ancestors[descendant].add(label)
+            self._relatives = (descendants, ancestors)
+        return self._relatives
+
+    def _get_backtracking(self) -> dict[str, tuple]:
+        """
+        Returns the backtracking degree of each pattern (see template.get_backtracking_degree), analysed on first use,
+        and sets the labels that may backtrack heavily, with a warning for each.
+        """
+        if self._backtracking is None:
+            self._backtracking = {k: template.get_backtracking_degree(v.pattern) for k, v in self._regexes.items()}
+            self._heavy = _get_heavy_labels(self._backtracking, self._linear)
+            for label in self._heavy:
+                degree = self._backtracking[label][0]
+                log.warning(f'Pattern "{label}" may backtrack heavily on long strings '
+                            f'({"exponential" if degree is None else f"degree {degree}"}). '
+                            f'Consider a more specific expression, or the max_input_length option.')
+        return self._backtracking
+
+    def _is_aligned(self, label: str) -> bool:
+        """
+        Returns True if the pattern is segment aligned (see template.is_segment_aligned), computed on first use.
+        """
+        aligned = self._aligned.get(label)
+        if aligned is None:
+            aligned = template.is_segment_aligned(self._patterns[label], strict=self._options['strict'])
+            self._aligned[label] = aligned
+        return aligned
+
+    def _is_last_segment_ready(self, label: str) -> bool:
+        """
+        Returns True if the pattern can be matched by its last segment, once its directory is resolved
+        (see _resolve_in_directory), computed on first use.
+        """
+        ready = self._last_segment_ready.get(label)
+        if ready is None:
+            options = self._options
+            ready = (options['anchor_start'] and options['anchor_end'] and self._is_aligned(label) and
+                     self._context_free[label] and
+                     len(template.get_keys(self._patterns[label])) == len(self._keys[label]))
+            self._last_segment_ready[label] = ready
+        return ready
+
     def __str__(self):
         return f"[resolva.Resolver] ID: [{self.get_id()}] - Pattern labels: {self.get_labels()}"
 
@@ -143,6 +692,27 @@ class Resolver:
             log.info(f'No Resolver instance found with id "{id}"')
         return instance
 
+    @staticmethod
+    def drop(id: Any) -> bool:
+        """
+        Removes the Resolver object with the given id from the instance cache.
+        The object itself stays usable, by whoever still holds it.
+
+        Args:
+            id: the id that was used during instantiation of the Resolver
+
+        Returns:
+            True if an instance was removed, False if there was none.
+        """
+        return instance_cache.pop(id, None) is not None
+
+    @staticmethod
+    def clear() -> None:
+        """
+        Removes all Resolver objects from the instance cache.
+        """
+        instance_cache.clear()
+
     def get_id(self) -> Any:
         """
         Gets the id for the current Resolver instance.
@@ -160,6 +730,50 @@ class Resolver:
         """
         return self._id
 
+    def clear_caches(self) -> None:
+        """
+        Empties the caches of the Resolver: resolved and formatted results, misses, and directories.
+        Compiled regexes and formatters are kept.
+        """
+        for cache in (self._first_results, self._all_results, self._one_results, self._label_results,
+                      self._match_results, self._format_results, self._misses):
+            if cache is not None:
+                cache.clear()
+        self._format_stats[:] = [0, 0]
+        self._directories.clear()
+        self._dead_directories.clear()
+        self._directory_entries.clear()
+
+    def get_memory_usage(self) -> dict[str, int]:
+        """
+        Returns the approximate memory held by the Resolver, in bytes, including the objects it refers to.
+
+        - compiled: patterns, compiled regexes, formatters and other compiled state.
+        - intern: the intern table (see intern_values).
+        - results: the resolved and formatted results caches.
+        - misses: the miss cache, and the known directories (see miss_cache_size).
+        - directories: the directory cache (see directory_cache_size).
+        - total: the sum of all above.
+
+        Objects shared between these parts are counted once.
+
+        Returns:
+            dictionary of sizes, in bytes
+        """
+        parts = {'intern': ('_intern',),
+                 'results': ('_first_results', '_all_results', '_one_results', '_label_results', '_match_results',
+                             '_format_results'),
+                 'misses': ('_misses', '_directories', '_dead_directories'),
+                 'directories': ('_directory_entries',)}
+        cached = {name for names in parts.values() for name in names}
+        seen: set = set()
+
+        usage = {'compiled': get_size([v for k, v in vars(self).items() if k not in cached], seen)}
+        for part, names in parts.items():
+            usage[part] = sum(get_size(getattr(self, name), seen) for name in names)
+        usage['total'] = sum(usage.values())
+        return usage
+
     def get_labels(self) -> list[str]:
         """
         Returns the list of pattern labels, as set during instantiation of the Resolver
@@ -350,7 +964,328 @@ class Resolver:
         """
         return self._keys.get(label)
 
-    @functools.lru_cache()
+    def get_roots(self) -> dict[str, list[str]]:
+        """
+        Returns the literal roots of each pattern: any string matched by the pattern starts with one of them
+        (see template.get_literal_roots). Used by ResolverRouter to dispatch strings.
+        Without anchor_start, or if nothing is known, the only root is the empty string.
+
+        Example
+
+            >>> r = Resolver.get("any_id")
+            >>> r.get_roots()["sequence"]
+            ['/mnt/prods/']
+
+        Returns:
+            {label: list of roots}
+        """
+        if not self._options['anchor_start']:
+            return {label: [''] for label in self._patterns.keys()}
+        return {label: template.get_literal_roots(pattern, self._options['strict'])
+                for label, pattern in self._patterns.items()}
+
+    def get_hierarchy(self) -> dict[str, str | None]:
+        """
+        Returns the parent / child hierarchy of the patterns, as a {label: parent label} dictionary.
+
+        A pattern is the child of another if it starts with all its segments, and adds more segments.
+        For example "/mnt/prods/{prod}/shots/{seq}" is a child of "/mnt/prods/{prod}".
+        The hierarchy is detected from the patterns, or declared on Resolver creation (see __init__).
+
+        The hierarchy is used to resolve a child path from its parent's result (see resolve_child).
+
+        Example
+
+            >>> # the instance was created in earlier example
+            >>> r = Resolver.get("any_id")
+            >>> print(r.get_hierarchy())
+            {'maya_file': 'sequence', 'any_file': 'sequence', 'sequence': 'project', 'project': None}
+
+        Returns:
+            The {label: parent label} dictionary. Root patterns have None as parent.
+        """
+        return self._get_hierarchy()
+
+    def get_children_of(self, label: str) -> list[str]:
+        """
+        Returns the labels of the direct children of the given label, in the patterns order.
+
+        Example
+
+            >>> # the instance was created in earlier example
+            >>> r = Resolver.get("any_id")
+            >>> print(r.get_children_of("sequence"))
+            ['maya_file', 'any_file']
+
+        Args:
+            label: a pattern label, must exist as key in the patterns dictionary
+
+        Returns:
+            List of children labels
+        """
+        return [k for k, v in self._get_hierarchy().items() if v == label]
+
+    def analyze(self) -> dict[str, dict]:
+        """
+        Analyses the patterns, to find shadowed patterns and disjoint patterns.
+
+        - A pattern is "shadowed" if an earlier pattern matches every string it matches.
+          It can never be returned by resolve_first, which then skips it.
+        - Two patterns are "disjoint" if no string can match both.
+          Once resolve_all found a match, it skips the patterns that are disjoint with it.
+
+        The analysis compares the patterns segment by segment: literal texts, "enum style" placeholders,
+        default placeholders, and identical expressions. What cannot be proven is neither shadowed nor disjoint.
+        It requires the anchor_start and anchor_end options, and only applies to segment aligned patterns.
+
+        The result is computed once, stored with the Resolver, and used from then on (only for str input).
+        Use the "analyze" option to run it on creation, and log a warning for each shadowed pattern.
+
+        Examples
+
+            >>> r = Resolver.get("any_id")
+            >>> print(r.analyze())
+            {'shadowed': {}, 'disjoint': {'sequence': ['project'], 'project': ['sequence']}}
+
+            Here "maya_file" and "any_file" are not analysed, as the unescaped "." can match any character, including "/".
+            With a generic "{ext}" pattern placed before a specific "{ext:(ma|mb)}" pattern,
+            the specific pattern would be reported as shadowed.
+
+        Returns:
+            dictionary with
+            - "shadowed": {shadowed label: label of the earlier pattern that shadows it}
+            - "disjoint": {label: list of labels of disjoint patterns}
+
+        """
+        if self._analysis is not None:
+            return self._analysis
+
+        shadowed: dict[str, str] = {}
+        disjoint: dict[str, list[str]] = {}
+
+        if self._options['anchor_start'] and self._options['anchor_end']:
+            descriptions = {label: template.describe_segments(pattern, strict=self._options['strict'])
+                            for label, pattern in self._patterns.items()}
+            labels = list(descriptions.keys())
+
+            for i, label in enumerate(labels):
+                for earlier in labels[:i]:
+                    # the earlier pattern must return data, and never raise for duplicate placeholders
+                    placeholders = template.get_keys(self._patterns[earlier])
+                    if not placeholders or len(placeholders) != len(set(placeholders)):
+                        continue
+                    if template.pattern_covers(descriptions[earlier], descriptions[label]):
+                        shadowed[label] = earlier
+                        break
+
+                for other in labels[i + 1:]:
+                    if template.patterns_are_disjoint(descriptions[label], descriptions[other]):
+                        disjoint.setdefault(label, []).append(other)
+                        disjoint.setdefault(other, []).append(label)
+
+        self._apply_analysis({'shadowed': shadowed,
+                              'disjoint': {label: sorted(disjoint[label], key=list(self._patterns).index)
+                                           for label in self._patterns.keys() if label in disjoint}})
+        return self._analysis  # type: ignore
+
+    def _apply_analysis(self, analysis: dict[str, dict]) -> None:
+        """
+        Stores the analysis results, and sets the patterns tried by resolve_first and resolve_all accordingly.
+        """
+        shadowed = analysis['shadowed']
+        self._analysis = analysis
+        self._first_regexes = {k: v for k, v in self._regexes.items() if k not in shadowed}
+        self._first_matchers = [matcher for matcher in self._matchers if matcher[0] not in shadowed]
+        self._count_matchers = {}
+        self._directory_entries = {}
+        self._disjoint = {k: frozenset(analysis['disjoint'].get(k, ())) for k in self._patterns.keys()}
+
+    def get_cost_report(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns the cost profile of each pattern, and logs it at debug level.
+
+        - degree: how much the regex may backtrack on a non matching string (see template.get_backtracking_degree):
+          0 or 1 is linear, 2 or more is polynomial (the cost grows like the length to this power), None is exponential.
+        - crosses_separator: if the backtracking repeats can match "/", and thus span whole paths, not only segments.
+        - heavy: if the pattern may backtrack heavily. A warning is logged when the patterns are analysed
+          (on creation with max_input_length, else by the first report), and the pattern does not match
+          strings longer than max_input_length, if set. Patterns run by a linear time backend (re2) are not heavy.
+        - backend: the regex backend running the pattern (see the regex_backend option).
+        - calls, time, max_time: number of regex runs, total and maximum time in seconds, with the profile option.
+
+        Example
+
+            >>> r = Resolver.get("any_id")
+            >>> r.get_cost_report()["any_file"]
+            {'degree': 2, 'crosses_separator': False, 'heavy': False, 'backend': 're', 'calls': 0, 'time': 0.0, 'max_time': 0.0}
+
+        Returns:
+            {label: cost dictionary}, in pattern order.
+        """
+        report = {}
+        for label, (degree, crosses) in self._get_backtracking().items():
+            calls, duration, max_duration = self._timings[label]
+            report[label] = {'degree': degree, 'crosses_separator': crosses, 'heavy': label in self._heavy,
+                             'backend': self._backends[label], 'calls': calls, 'time': duration, 'max_time': max_duration}
+            log.debug(f'{label}: degree {"exponential" if degree is None else degree}'
+                      f'{" over paths" if crosses else ""}{" (heavy)" if label in self._heavy else ""} - '
+                      f'{self._backends[label]}: '
+                      f'{calls} calls, {duration * 1e3:.3f} ms, max {max_duration * 1e6:.1f} us')
+        return report
+
+    def resolve_child(self, label: str, data: dict[str, str], string: str) -> tuple[str, dict[str, str]] | tuple[None, None]:
+        """
+        Resolves a path below an already resolved path, using only the new part of the path.
+
+        It receives the resolved label and data of a parent path, and the remaining string below it,
+        without the leading separator, typically a new segment, like a child in a file browser.
+
+        Only the descendants of the given label (see get_hierarchy) are tried, in patterns order.
+        Each one is matched against the remaining string only, with a regex built from its last segments,
+        instead of matching the full path from the start.
+
+        The method returns a tuple with the first matching label and the full data dictionary,
+        like resolve_first on the full path.
+
+        Examples
+
+            >>> r = Resolver.get("any_id")
+            >>> label, data = r.resolve_first("/mnt/prods/hamlet/shots/sq010")
+            >>> r.resolve_child(label, data, "sh010_v012.ma")
+            ('maya_file', {'prod': 'hamlet', 'seq': 'sq010', 'shot': 'sh010', 'version': 'v012', 'ext': 'ma'})
+
+            >>> r.resolve_child("project", {'prod': 'hamlet'}, "shots/sq020")
+            ('sequence', {'prod': 'hamlet', 'seq': 'sq020'})
+
+        Args:
+            label: the resolved label of the parent path
+            data: the resolved data of the parent path
+            string: the remaining string below the parent path
+
+        Returns:
+            Tuple with the first matching pattern label and the resolved data dictionary, or (None, None)
+
+        """
+        result = (None, None)
+
+        if not string:
+            return result
+
+        for child in self._get_relatives()[0].get(label, []):
+
+            match = self._get_relative_regex(label, child).search(string)
+            if match:
+                found = dict(data)
+                for key, value in template.match_to_dict(match, self.check_duplicate_placeholders, self._intern).items():
+                    if self.check_duplicate_placeholders and key in found and found[key] != value:
+                        raise ResolvaException(
+                            f'Different extracted values for placeholder {key!r} detected. '
+                            f'Values were {found[key]!r} and {value!r}.')
+                    found[key] = value
+                if found:
+                    return child, found
+
+        return result
+
+    def _get_relative_regex(self, ancestor: str, label: str) -> re.Pattern:
+        """
+        Returns the regex for the segments of *label* that follow the segments of its *ancestor*.
+        """
+        regex = self._relative_regexes.get((ancestor, label))
+        if regex is None:
+            relative = '/'.join(self._segments[label][len(self._segments[ancestor]):])
+            regex = template.construct_regular_expression(relative, strict=self._options['strict'])
+            self._relative_regexes[(ancestor, label)] = regex
+        return regex
+
+    def resolve_lineage(self, string: str) -> list[tuple[str, str, dict[str, str]]]:
+        """
+        Resolves a path and all its parent paths, in one call.
+
+        Each prefix of the string, cut at the "/" separators, is resolved like with resolve_first.
+        The method returns the list of resolved prefixes, from the root to the full string,
+        as (prefix, label, data) tuples. Prefixes that do not resolve are skipped.
+
+        Work is shared between prefixes, using the segment structure of the patterns:
+        - a pattern that is a descendant of an already resolved prefix (see get_hierarchy)
+          only matches the new segments, and reuses the ancestors data (see resolve_child),
+        - a segment aligned pattern is only tried on prefixes that have its number of segments.
+
+        Examples
+
+            >>> r = Resolver.get("any_id")
+            >>> for prefix, label, data in r.resolve_lineage("/mnt/prods/hamlet/shots/sq010/sh010_v012.ma"):
+            ...     print(f'{prefix} -> {label} {data}')
+            /mnt/prods/hamlet -> project {'prod': 'hamlet'}
+            /mnt/prods/hamlet/shots/sq010 -> sequence {'prod': 'hamlet', 'seq': 'sq010'}
+            /mnt/prods/hamlet/shots/sq010/sh010_v012.ma -> maya_file {'prod': 'hamlet', 'seq': 'sq010', 'shot': 'sh010', 'version': 'v012', 'ext': 'ma'}
+
+        Args:
+            string: a string to resolve, typically a path
+
+        Returns:
+            list of (prefix, label, data) tuples, for each resolved prefix, from root to full string.
+
+        """
+        lineage: list = []
+
+        if not string:
+            return lineage
+
+        separator = '/' if isinstance(string, str) else b'/'
+        parts = string.split(separator)  # type: ignore
+        prefixes = [separator.join(parts[:i + 1]) for i in range(len(parts))]
+
+        # without anchors or hierarchy, each prefix is resolved on its own.
+        if not isinstance(string, str) or not (self._options['anchor_start'] and self._options['anchor_end']):
+            for prefix in prefixes:
+                label, data = self.resolve_first(prefix)
+                if label:
+                    lineage.append((prefix, label, data))
+            return lineage
+
+        ancestors = self._get_relatives()[1]
+        for count, prefix in enumerate(prefixes, 1):
+            if not prefix:
+                continue
+
+            for label, regex in self._first_regexes.items():
+
+                if self._is_aligned(label) and len(self._segments[label]) != count:
+                    continue
+
+                # closest resolved ancestor, to match the new segments only
+                ancestor = None
+                for resolved in reversed(lineage):
+                    if resolved[1] in ancestors[label]:
+                        ancestor = resolved
+                        break
+
+                if ancestor:
+                    remainder = prefix[len(ancestor[0]) + 1:]
+                    match = self._get_relative_regex(ancestor[1], label).search(remainder)
+                    if not match:
+                        continue
+                    data = dict(ancestor[2])
+                    for key, value in template.match_to_dict(match, self.check_duplicate_placeholders,
+                                                             self._intern).items():
+                        if self.check_duplicate_placeholders and key in data and data[key] != value:
+                            raise ResolvaException(
+                                f'Different extracted values for placeholder {key!r} detected. '
+                                f'Values were {data[key]!r} and {value!r}.')
+                        data[key] = value
+                else:
+                    match = regex.search(prefix)
+                    if not match:
+                        continue
+                    data = template.match_to_dict(match, self.check_duplicate_placeholders, self._intern)
+
+                if data:
+                    lineage.append((prefix, label, data))
+                    break
+
+        return lineage
+
     def resolve_first(self, string: str) -> tuple[str, dict[str, str]] | tuple[None, None]:
         """
         The Resolver has 3 resolve methods:
@@ -380,30 +1315,85 @@ class Resolver:
             >>> print(f'Label: "{label}" - Data: "{data}"')
             Label: "any_file" - Data: "{'prod': 'hamlet', 'seq': 'sq010', 'shot': 'sh010', 'version': 'v012', 'ext': 'nk'}"
 
+            Bytes, eg. from os.scandir(bytes_path), are resolved directly, and the data values are bytes.
+
+            >>> label, data = r.resolve_first(b"/mnt/prods/hamlet/shots/sq010")
+            >>> print(f'Label: "{label}" - Data: "{data}"')
+            Label: "sequence" - Data: "{'prod': b'hamlet', 'seq': b'sq010'}"
+
         Args:
-            string: a string to resolve, typically a path
+            string: a string to resolve, typically a path. Can be bytes (see below).
+
+        Bytes input is matched with bytes variants of the regexes (patterns encoded like os.fsencode), without decoding.
+        Undecodable file names are thus resolved as is. Values can be decoded with os.fsdecode, which round trips.
+        This applies to all resolve methods.
 
         Returns:
             Tuple with the first matching pattern label and the resolved data dictionary
 
         """
+        results = self._first_results
+        if results is not None:
+            result = results.get(string)
+            if result is not None:
+                return result
+        if self._misses is not None and self._is_known_miss(string):
+            return None, None
+
+        result = self._resolve_first(string)
+
+        if result[0] is None and self._misses is not None:
+            self._add_miss(string)
+        elif results is not None:
+            if len(results) >= self._options['result_cache_size']:
+                del results[next(iter(results))]
+            results[string] = result
+        return result
 
+    def _resolve_first(self, string: str) -> tuple[str, dict[str, str]] | tuple[None, None]:
+        """
+        Implementation of resolve_first, without caches.
+        """
         result = (None, None)
 
         if not string:
             return result
 
-        for label, regex in self._regexes.items():
+        if self._options['directory_cache_size'] and isinstance(string, str) and '/' in string:
+            return self._resolve_in_directory(string) or result
+
+        length = len(string)
+        parts = None  # split once, for all split matchers
+        splittable = string[-1:] != '\n'  # "$" also matches before a final newline
+
+        for label, regex, prefix, suffixes, substring, min_length, max_length, split in self._get_matchers(string, True):
+
+            # length and literal checks, before running the regex
+            if not min_length <= length <= max_length:
+                continue
+            if prefix is not None and not string.startswith(prefix):
+                continue
+            if suffixes is not None and not string.endswith(suffixes):
+                continue
+            if substring is not None and substring not in string:
+                continue
+
+            if split is not None and splittable:
+                if parts is None:
+                    parts = string.split('/')
+                data = split(parts)
+                if data:
+                    return label, data
+                continue
 
             match = regex.search(string)
             if match:
-                data = template.match_to_dict(match, self.check_duplicate_placeholders)
+                data = template.match_to_dict(match, self.check_duplicate_placeholders, self._intern)
                 if data:
                     return label, data
 
         return result
 
-    @functools.lru_cache()
     def resolve_one(self, string: str, label: str) -> dict[str, str] | dict:
         """
         The Resolver has 3 resolve methods:
@@ -443,24 +1433,53 @@ class Resolver:
         Returns:
             Resolved data dictionary or empty dictionary if there is no match.
 
+        """
+        results = self._one_results
+        if results is None:
+            return self._resolve_one(string, label)
+        result = results.get((string, label))
+        if result is None:
+            result = self._resolve_one(string, label)
+            if len(results) >= self._options['result_cache_size']:
+                del results[next(iter(results))]
+            results[(string, label)] = result
+        return result
+
+    def _resolve_one(self, string: str, label: str) -> dict[str, str] | dict:
+        """
+        Implementation of resolve_one, without cache.
         """
         result: dict = {}
 
         if not string:
             return result
 
-        regex = self._regexes.get(label)
+        regexes = self._backend_regexes if isinstance(string, str) else self._get_bytes_regexes()
+        regex = regexes.get(label)
 
         if regex:
+            checks = self._checks if isinstance(string, str) else self._get_bytes_checks()
+            prefix, suffixes, substring, min_length, max_length = checks[label]
+            min_count, max_count = self._bounds[label][:2]
+            if not min_length <= len(string) <= max_length:
+                return result
+            if not min_count <= string.count('/' if isinstance(string, str) else b'/') <= max_count:  # type: ignore
+                return result
+            if prefix is not None and not string.startswith(prefix):
+                return result
+            if suffixes is not None and not string.endswith(suffixes):
+                return result
+            if substring is not None and substring not in string:
+                return result
+
             match = regex.search(string)
             if match:
-                data = template.match_to_dict(match, self.check_duplicate_placeholders)
+                data = template.match_to_dict(match, self.check_duplicate_placeholders, self._intern)
                 if data:
                     return data
 
         return result
 
-    @functools.lru_cache()
     def resolve_all(self, string: str) -> dict[str, dict[str, str]] | dict:
         """
         The Resolver has 3 resolve methods:
@@ -519,20 +1538,684 @@ class Resolver:
             An empty dictionary if there is no match.
 
         """
+        results = self._all_results
+        if results is not None:
+            found = results.get(string)
+            if found is not None:
+                return found
+        if self._misses is not None and self._is_known_miss(string):
+            return {}
+
+        found = self._resolve_all(string)
+
+        if not found and self._misses is not None:
+            self._add_miss(string)
+        elif results is not None:
+            if len(results) >= self._options['result_cache_size']:
+                del results[next(iter(results))]
+            results[string] = found
+        return found
 
+    def _resolve_all(self, string: str) -> dict[str, dict[str, str]] | dict:
+        """
+        Implementation of resolve_all, without caches.
+        """
         found: dict = {}
 
         if not string:
             return found
 
-        for label, regex in self._regexes.items():
+        disjoint = self._disjoint if isinstance(string, str) else None
+        skipped: set = set()
+        length = len(string)
+
+        matchers = self._get_matchers(string)
+
+        # segment aligned patterns are all matched at once (see construct_multi_matcher)
+        handled: frozenset = frozenset()
+        matched: dict = {}
+        if isinstance(string, str) and string[-1:] != '\n':  # "$" also matches before a final newline
+            multi = self._get_multi_matcher(string)
+            if multi is not None:
+                matcher, handled = multi
+                matched = matcher(string.split('/'))
+                if len(handled) == len(matchers):
+                    return matched
+
+        for label, regex, prefix, suffixes, substring, min_length, max_length, __ in matchers:
+            if label in handled:
+                data = matched.get(label)
+                if data:
+                    found[label] = data
+                    if disjoint:
+                        skipped.update(disjoint[label])
+                continue
+            if disjoint and label in skipped:
+                continue
+            if not min_length <= length <= max_length:
+                continue
+            if prefix is not None and not string.startswith(prefix):
+                continue
+            if suffixes is not None and not string.endswith(suffixes):
+                continue
+            if substring is not None and substring not in string:
+                continue
             match = regex.search(string)
             if match:
-                data = template.match_to_dict(match, self.check_duplicate_placeholders)
+                data = template.match_to_dict(match, self.check_duplicate_placeholders, self._intern)
                 if data:
                     found[label] = data
+                    if disjoint:
+                        skipped.update(disjoint[label])
+
+        return found
+
+    def label_of(self, string: str) -> str | None:
+        """
+        Returns the label of the first matching pattern, like resolve_first(string)[0], without building the data.
+
+        Regexes are only tested: groups are not extracted, and the result is cached apart from resolved results.
+
+        Example
+
+            >>> r = Resolver.get("any_id")
+            >>> print(r.label_of("/mnt/prods/hamlet/shots/sq010/sh010_v012.nk"))
+            any_file
+
+            >>> print(r.label_of("blablabla"))
+            None
+
+        Args:
+            string: a string to resolve, typically a path. Can be bytes.
+
+        Returns:
+            the first matching pattern label, or None if there is no match
+        """
+        results = self._label_results
+        if results is not None:
+            label = results.get(string, False)
+            if label is not False:
+                return label
+        if self._misses is not None and self._is_known_miss(string):
+            return None
+
+        label = self._label_of(string)
+
+        if label is None and self._misses is not None:
+            self._add_miss(string)
+        elif results is not None:
+            if len(results) >= self._options['result_cache_size']:
+                del results[next(iter(results))]
+            results[string] = label
+        return label
+
+    def labels_of(self, strings: Iterable[str]) -> list[str | None]:
+        """
+        Batch variant of label_of: returns the first matching label (or None) of each string, without caching.
+        """
+        label_of = self._label_of
+        return [label_of(string) for string in strings]
+
+    def _label_of(self, string: str) -> str | None:
+        """
+        Implementation of label_of, without caches.
+        """
+        if not string:
+            return None
+
+        length = len(string)
+        anchored = self._options['anchor_start']
+        data_checked = self._data_checked
+
+        for label, regex, prefix, suffixes, substring, min_length, max_length, __ in self._get_matchers(string, True):
+            if not min_length <= length <= max_length:
+                continue
+            if prefix is not None and not string.startswith(prefix):
+                continue
+            if suffixes is not None and not string.endswith(suffixes):
+                continue
+            if substring is not None and substring not in string:
+                continue
+
+            match = regex.match(string) if anchored else regex.search(string)
+            if match and (label not in data_checked or
+                          template.match_to_dict(match, self.check_duplicate_placeholders)):
+                return label
+
+        return None
+
+    def matches(self, string: str, label: str) -> bool:
+        """
+        Returns True if the string matches the designated pattern, like bool(resolve_one(string, label)),
+        without building the data.
+
+        Regexes are only tested: groups are not extracted, and the result is cached apart from resolved results.
+
+        Example
+
+            >>> r = Resolver.get("any_id")
+            >>> r.matches("/mnt/prods/hamlet/shots/sq010/sh010_v012.ma", "maya_file")
+            True
+            >>> r.matches("/mnt/prods/hamlet/shots/sq010/sh010_v012.nk", "maya_file")
+            False
+
+        Args:
+            string: a string to test, typically a path. Can be bytes.
+            label: the label of a pattern to match against
+
+        Returns:
+            True if the string matches the pattern, else False.
+        """
+        results = self._match_results
+        if results is None:
+            return self._matches(string, label)
+        found = results.get((string, label))
+        if found is None:
+            found = self._matches(string, label)
+            if len(results) >= self._options['result_cache_size']:
+                del results[next(iter(results))]
+            results[(string, label)] = found
         return found
 
+    def matches_many(self, strings: Iterable[str], label: str) -> list[bool]:
+        """
+        Batch variant of matches: returns True or False for each string, without caching.
+
+        Example
+
+            >>> r = Resolver.get("any_id")
+            >>> paths = ["/mnt/prods/hamlet/shots/sq010/sh010_v012.ma", "/mnt/prods/hamlet/shots/sq010"]
+            >>> [path for path, found in zip(paths, r.matches_many(paths, "maya_file")) if found]
+            ['/mnt/prods/hamlet/shots/sq010/sh010_v012.ma']
+        """
+        matches = self._matches
+        return [matches(string, label) for string in strings]
+
+    def _matches(self, string: str, label: str) -> bool:
+        """
+        Implementation of matches, without cache.
+        """
+        if not string:
+            return False
+
+        regexes = self._backend_regexes if isinstance(string, str) else self._get_bytes_regexes()
+        regex = regexes.get(label)
+        if regex is None:
+            return False
+
+        checks = self._checks if isinstance(string, str) else self._get_bytes_checks()
+        prefix, suffixes, substring, min_length, max_length = checks[label]
+        min_count, max_count = self._bounds[label][:2]
+        if not min_length <= len(string) <= max_length:
+            return False
+        if not min_count <= string.count('/' if isinstance(string, str) else b'/') <= max_count:  # type: ignore
+            return False
+        if prefix is not None and not string.startswith(prefix):
+            return False
+        if suffixes is not None and not string.endswith(suffixes):
+            return False
+        if substring is not None and substring not in string:
+            return False
+
+        match = regex.match(string) if self._options['anchor_start'] else regex.search(string)
+        if match is None:
+            return False
+        if label in self._data_checked:
+            return bool(template.match_to_dict(match, self.check_duplicate_placeholders))
+        return True
+
+    def complete(self, partial: str, labels: Iterable[str] | None = None) -> dict[str, tuple[str | None, str, list[str]]]:
+        """
+        Completes a partially typed string, eg. for typeahead while a path is typed in a browser.
+
+        Returns the patterns that the string can still match once it is continued, with, for each,
+        the placeholder the end of the string is in, the text typed in it, and its "enum style" values
+        (eg. from "{task:(board|layout|anim)}") that start with the typed text.
+        If the end of the string is in literal text of the pattern, the key is None, and the value is the literal text.
+
+        The completer is built on first use, from the segments of the patterns (see template.construct_completer),
+        so that each call only checks the typed segments once per distinct pattern segment.
+        Strings are completed from their start, and duplicate placeholders are not compared.
+
+        Example
+
+            >>> r = Resolver.get("any_id")
+            >>> r.complete("/mnt/prods/hamlet/shots/sq010/sh010_v012.m")
+            {'maya_file': ('ext', 'm', ['ma', 'mb']), 'any_file': ('ext', 'm', [])}
+            >>> r.complete("/mnt/prods/hamlet/sh")
+            {'maya_file': (None, 'sh', ['shots']), 'any_file': (None, 'sh', ['shots']), 'sequence': (None, 'sh', ['shots'])}
+
+        Args:
+            partial: the typed string
+            labels: optional labels of the patterns to complete. By default, all patterns.
+
+        Returns:
+            {label: (key, typed, values)} dictionary, in the patterns order. Empty if no pattern can match.
+        """
+        if self._completer is None:
+            self._completer = template.construct_completer(self._patterns, self._options['strict'],
+                                                           aligned={k: self._is_aligned(k) for k in self._patterns})
+        return self._completer(partial, None if labels is None else set(labels))
+
+    def _resolve_in_directory(self, string: str) -> tuple[str, dict[str, str]] | None:
+        """
+        Resolves the string like resolve_first, using the labels that are possible in its directory.
+
+        For each directory, the possible labels are computed once, in pattern order:
+        - anchored, segment aligned, context free patterns without duplicate placeholders, whose first segments
+          match the directory. The data of the directory is kept, and only the last segment of the string is matched.
+        - other patterns, that could match a string in this directory. The whole string is matched.
+
+        Returns:
+            tuple (label, data), or None if there is no match
+        """
+        position = string.rfind('/')
+        directory = string[:position]
+
+        entries = self._directory_entries.get(directory)
+        if entries is None:
+            entries = self._get_directory_entries(directory)
+            if len(self._directory_entries) >= self._options['directory_cache_size']:
+                del self._directory_entries[next(iter(self._directory_entries))]
+            self._directory_entries[directory] = entries
+
+        name = string[position + 1:]
+        limit = self._options['max_input_length']
+        too_long = bool(limit) and len(string) > limit
+        for label, regex, data in entries:
+            if data is None:
+                if too_long and label in self._heavy:
+                    continue
+                match = regex.search(string)
+                if match:
+                    found = template.match_to_dict(match, self.check_duplicate_placeholders, self._intern)
+                    if found:
+                        return label, found
+            else:
+                match = regex.search(name)
+                if match:
+                    found = dict(data)
+                    found.update(template.match_to_dict(match, self.check_duplicate_placeholders, self._intern))
+                    if found:
+                        return label, found
+        return None
+
+    def _get_directory_entries(self, directory: str) -> list[tuple]:
+        """
+        Returns the (label, regex, data) entries of the labels that can match a string in the directory.
+        Data is the data resolved from the directory, if the regex only matches the last segment, else None.
+        """
+        count = directory.count('/') + 1  # number of segments of the directory
+        strict = self._options['strict']
+        entries = []
+
+        for label, regex in self._first_regexes.items():
+            min_count, max_count = self._bounds[label][:2]
+            if not min_count <= count <= max_count:
+                continue
+
+            if not self._is_last_segment_ready(label):
+                entries.append((label, regex, None))
+                continue
+
+            segments = self._segments[label]
+            if len(segments) != count + 1:
+                continue
+            prefix_regex = self._prefix_regexes.get((label, count))
+            if prefix_regex is None:
+                prefix_regex = template.construct_regular_expression('/'.join(segments[:count]), anchor_start=False,
+                                                                     anchor_end=False, strict=strict)
+                self._prefix_regexes[(label, count)] = prefix_regex
+            match = prefix_regex.fullmatch(directory)
+            if not match:
+                continue
+
+            last_regex = self._last_segment_regexes.get(label)
+            if last_regex is None:
+                last_regex = template.construct_regular_expression(segments[-1], strict=strict)
+                self._last_segment_regexes[label] = last_regex
+            data = template.match_to_dict(match, self.check_duplicate_placeholders, self._intern)
+            entries.append((label, last_regex, data))
+
+        return entries
+
+    def _is_known_miss(self, string: str | bytes) -> bool:
+        """
+        Returns True if the string is known to match nothing: it is in the miss cache, or below a dead directory.
+        """
+        if string in self._misses:  # type: ignore
+            return True
+        if self._dead_directories and isinstance(string, str):
+            position = string.find('/', 1)
+            while position != -1:
+                if string[:position] in self._dead_directories:
+                    return True
+                position = string.find('/', position + 1)
+        return False
+
+    def _add_miss(self, string: str | bytes) -> None:
+        """
+        Adds a string that matches nothing to the miss cache, dropping the oldest entry if the cache is full.
+
+        The directory of the string is checked as well: if no pattern can match anything below it,
+        it is kept as "dead directory", so that its whole subtree is a miss without being resolved.
+        """
+        misses = self._misses
+        size = self._options['miss_cache_size']
+        if len(misses) >= size:  # type: ignore
+            del misses[next(iter(misses))]  # type: ignore
+        misses[string] = None  # type: ignore
+
+        if not isinstance(string, str):
+            return
+        position = string.rfind('/')
+        while position > 0:
+            directory = string[:position]
+            if directory in self._directories:
+                return
+            dead = self._is_dead_directory(directory)
+            if len(self._directories) >= size:
+                oldest = next(iter(self._directories))
+                del self._directories[oldest]
+                self._dead_directories.discard(oldest)
+            self._directories[directory] = dead
+            if not dead:
+                return
+            self._dead_directories.add(directory)
+            # the parent directory may be dead as well, and cover a larger subtree.
+            position = directory.rfind('/')
+
+    def _is_dead_directory(self, directory: str) -> bool:
+        """
+        Returns True if no pattern can match a string below the directory, ie. starting with directory + "/".
+
+        A pattern cannot match if its literal prefix does not fit the directory, or,
+        for anchored segment aligned patterns, if it has no more segments than the directory,
+        or if its first segments do not match the directory.
+        """
+        head = directory + '/'
+        count = directory.count('/') + 1
+        anchored = self._options['anchor_start'] and self._options['anchor_end']
+
+        for label in self._patterns.keys():
+            prefix = self._checks[label][0]
+            if prefix is not None and not head.startswith(prefix) and not prefix.startswith(head):
+                continue
+            if not (anchored and self._context_free[label] and self._is_aligned(label)):
+                return False
+            segments = self._segments[label]
+            if len(segments) <= count:
+                continue
+            regex = self._directory_regexes.get((label, count))
+            if regex is None:
+                regex = template.construct_regular_expression('/'.join(segments[:count]),
+                                                              strict=self._options['strict'])
+                self._directory_regexes[(label, count)] = regex
+            if regex.search(directory):
+                return False
+        return True
+
+    def _get_bytes_regexes(self) -> dict[str, re.Pattern]:
+        """
+        Returns the bytes compiled variants of the regexes, to resolve bytes without decoding.
+        """
+        if self._bytes_regexes is None:
+            self._bytes_regexes = {k: template.construct_bytes_regular_expression(v)
+                                   for k, v in self._regexes.items()}
+        return self._bytes_regexes
+
+    def _get_bounds(self, bounds: tuple) -> tuple[int, int, int, int]:
+        """
+        Returns the (min count, max count, min length, max length) of separators and characters
+        in matched strings, from bounds computed by template.get_match_bounds, using sys.maxsize if unbounded.
+        Maximums only apply to patterns anchored at start and end, and "$" may match before a final newline.
+        """
+        min_count, max_count, min_length, max_length = bounds
+        if not (self._options['anchor_start'] and self._options['anchor_end']):
+            max_count = max_length = None
+        return (min_count, sys.maxsize if max_count is None else max_count,
+                min_length, sys.maxsize if max_length is None else max_length + 1)
+
+    def _get_matchers(self, string: str | bytes, first: bool = False) -> list[tuple]:
+        """
+        Returns the (label, regex, prefix, suffixes, substring, min length, max length, split matcher) matchers,
+        of the labels that can match a string with its number of separators.
+        Lists are computed per separator count on first use, for str (resolve_first or resolve_all) or bytes.
+        Bytes are always matched by the regex: their split matcher is None.
+        """
+        if isinstance(string, str):
+            key = ('first' if first else 'all', string.count('/'))
+        else:
+            key = ('bytes', string.count(b'/'))
+
+        matchers = self._count_matchers.get(key)
+        if matchers is None:
+            as_str = isinstance(string, str)
+            if as_str:
+                candidates = self._first_matchers if first else self._matchers
+            else:
+                candidates = self._get_bytes_matchers()
+            count = key[1]
+            matchers = [matcher + (self._get_split_matcher(matcher[0]) if as_str else None,) for matcher in candidates
+                        if self._bounds[matcher[0]][0] <= count <= self._bounds[matcher[0]][1]]
+            if len(self._count_matchers) < 1000:
+                self._count_matchers[key] = matchers
+        return matchers
+
+    def _get_split_matcher(self, label: str) -> Callable | None:
+        """
+        Returns the generated split matcher of the label (see construct_split_matcher), or None if the regex is used.
+        Split matchers are generated on first use, so that creating and unpickling Resolvers stays fast.
+        """
+        split = self._split_matchers.get(label, False)
+        if split is False:
+            split = None
+            options = self._options
+            if options['split_matchers'] and options['anchor_start'] and options['anchor_end'] and not options['profile']:
+                split = template.construct_split_matcher(self._patterns[label], self._intern, options['strict'],
+                                                         aligned=self._is_aligned(label))
+            self._split_matchers[label] = split
+        return split
+
+    def _get_multi_matcher(self, string: str) -> tuple[Callable, frozenset] | None:
+        """
+        Returns the multi matcher of the labels that can match a string with its number of separators,
+        and have a split matcher (see construct_multi_matcher), with the set of these labels.
+        Returns None if there is no such label. Multi matchers are generated on first use, per separator count.
+        """
+        count = string.count('/')
+        multi = self._multi_matchers.get(count, False)
+        if multi is False:
+            multi = None
+            labels = [matcher[0] for matcher in self._get_matchers(string) if matcher[-1] is not None]
+            if labels:
+                matcher, handled = template.construct_multi_matcher({k: self._patterns[k] for k in labels},
+                                                                    self._intern, self._options['strict'],
+                                                                    aligned={k: self._is_aligned(k) for k in labels})
+                multi = (matcher, frozenset(handled))
+            if len(self._multi_matchers) < 1000:
+                self._multi_matchers[count] = multi
+        return multi
+
+    def _limit_length(self, label: str, lengths: tuple[int, int]) -> tuple[int, int]:
+        """
+        Returns the (min length, max length) bounds of the label, with max_input_length for heavy labels.
+        """
+        limit = self._options['max_input_length']
+        if limit and label in self._heavy:
+            return lengths[0], min(lengths[1], limit)
+        return lengths
+
+    def _get_bytes_checks(self) -> dict[str, tuple]:
+        """
+        Returns the bytes variants of the literal checks (prefix, suffixes, substring), and bytes length bounds.
+        """
+        if self._bytes_checks is None:
+            def encode(value):
+                if value is None:
+                    return None
+                if isinstance(value, tuple):
+                    return tuple(os.fsencode(v) for v in value)
+                return os.fsencode(value)
+            regexes = self._get_bytes_regexes()
+            self._bytes_checks = {k: tuple(encode(c) for c in v[:3]) +
+                                  self._limit_length(k, self._get_bounds(template.get_match_bounds(regexes[k].pattern))[2:])
+                                  for k, v in self._checks.items()}
+        return self._bytes_checks
+
+    def _get_bytes_matchers(self) -> list[tuple]:
+        """
+        Returns the (label, regex, prefix, suffixes, substring) matchers, with bytes regexes and literal checks.
+        """
+        if self._bytes_matchers is None:
+            checks = self._get_bytes_checks()
+            self._bytes_matchers = [(k, v) + checks[k] for k, v in self._get_bytes_regexes().items()]
+        return self._bytes_matchers
+
+    def _get_formatters(self, data: dict[str, Any]) -> dict[str, Callable]:
+        """
+        Returns the compiled formatters, or their bytes variants if the data values are bytes.
+        """
+        if not isinstance(next(iter(data.values())), bytes):
+            return self._formatters
+        if self._bytes_formatters is None:
+            self._bytes_formatters = {k: template.construct_formatter(v, as_bytes=True)
+                                      for k, v in self._formats.items()}
+        return self._bytes_formatters
+
+    def resolve_file(self, path: str, mode: str = "first", label: str | None = None, workers: int = 1,
+                     sink: Callable[[list[tuple]], Any] | None = None,
+                     chunk_size: int = 1 << 24) -> Iterator[tuple[str, str, dict[str, str]]] | int:
+        """
+        Resolves a large file of newline delimited paths (like a "find" dump).
+
+        The file is memory mapped and never read as a whole into python strings.
+        Lines are scanned directly in the mapped bytes, with bytes compiled variants of the regexes.
+        Only matching lines and their matched values are decoded (like os.fsdecode).
+
+        Modes:
+        - first: like resolve_first, the first matching label per line
+        - all: like resolve_all, one result per matching label
+        - one: like resolve_one, using the given "label"
+        - label: like label_of, the first matching label per line, with None as data (values are not decoded)
+
+        Results are (path, label, data) tuples, for matching lines only, in file order.
+
+        With several workers, the file is split into chunks of about *chunk_size* bytes, at line boundaries.
+        Each chunk is mapped and resolved by a worker process, and results are returned in file order.
+
+        Examples
+
+            >>> import tempfile
+            >>> with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            ...     __ = f.write("/mnt/prods/hamlet/shots/sq010/sh010_v012.ma\\n/tmp/foo\\n/mnt/prods/hamlet\\n")
+            >>> r = Resolver.get("any_id")
+            >>> for path, label, data in r.resolve_file(f.name):
+            ...     print(label, data)
+            maya_file {'prod': 'hamlet', 'seq': 'sq010', 'shot': 'sh010', 'version': 'v012', 'ext': 'ma'}
+            project {'prod': 'hamlet'}
+            >>> os.remove(f.name)
+
+        Args:
+            path: path of the file to resolve
+            mode: "first", "all", "one" or "label"
+            label: the pattern label, for mode "one"
+            workers: number of worker processes
+            sink: optional callable, receiving lists of results, instead of yielding them
+            chunk_size: approximate size in bytes of the chunks given to workers
+
+        Returns:
+            an iterator over (path, label, data) results, or if a sink is given, the number of results.
+        """
+
+        if mode not in ("first", "all", "one", "label"):
+            raise ResolvaException(f'Unknown mode "{mode}", should be "first", "all", "one" or "label".')
+        if mode == "one" and label not in self._regexes:
+            raise ResolvaException(f'Mode "one" needs an existing label, got "{label}".')
+
+        results = self._iter_file(path, mode, label, workers, chunk_size)
+        if sink is None:
+            return results
+
+        count = 0
+        for batch in batched(results, 10000):
+            sink(batch)
+            count += len(batch)
+        return count
+
+    def _iter_file(self, path: str, mode: str, label: str | None, workers: int,
+                   chunk_size: int) -> Iterator[tuple[str, str, dict[str, str]]]:
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if workers <= 1:
+                    yield from self._resolve_buffer(mapped, 0, size, mode, label)
+                    return
+                chunks = _split_lines(mapped, size, chunk_size)
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                    initargs=(self,)) as executor:
+            pending: deque = deque()
+            for start, end in chunks:
+                pending.append(executor.submit(_resolve_file_chunk, path, start, end, mode, label))
+                while len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def _resolve_buffer(self, buffer: Any, start: int, end: int, mode: str,
+                        label: str | None) -> Iterator[tuple[str, str, dict[str, str]]]:
+        """
+        Resolves the lines of a bytes buffer (eg. a mmap), between the *start* and *end* offsets.
+        The regexes are matched in place, using pos and endpos, so lines are not copied.
+        """
+        if self._line_regexes is None:
+            self._line_regexes = {k: template.construct_bytes_regular_expression(v, multiline=True)
+                                  for k, v in self._regexes.items()}
+
+        if mode == "one":
+            regexes = [(label, self._line_regexes[label])]
+        else:
+            regexes = list(self._line_regexes.items())
+
+        # in label mode, data is only built for the labels whose matches need it (see label_of).
+        checked = self._data_checked if mode == "label" else None
+
+        find = buffer.find
+        position = start
+        while position < end:
+            newline = find(b"\n", position, end)
+            if newline < 0:
+                newline = end
+            stop = newline
+            if stop > position and buffer[stop - 1] == 13:  # "\r"
+                stop -= 1
+
+            line = None
+            if stop > position:
+                for _label, regex in regexes:
+                    match = regex.search(buffer, position, stop)
+                    if match:
+                        if checked is not None:
+                            if (_label in checked and
+                                    not template.match_to_dict(match, self.check_duplicate_placeholders)):
+                                continue
+                            data = None
+                        else:
+                            data = template.match_to_dict(match, self.check_duplicate_placeholders,
+                                                          self._intern, _fs_encoding, _fs_errors)
+                        if data or checked is not None:
+                            if line is None:
+                                line = buffer[position:stop].decode(_fs_encoding, _fs_errors)
+                            yield line, _label, data
+                            if mode != "all":
+                                break
+
+            position = newline + 1
+
     def format_first(self, data: dict[str, str]) -> tuple[str, str] | tuple[None, None]:
         """
         The Resolver has 3 format methods:
@@ -566,25 +2249,39 @@ class Resolver:
             >>> print(formatted)
             ('sequence', '/mnt/prods/hamlet/shots/sq010')
 
+            >>> data = {'prod': b'hamlet', 'seq': b'sq010'}
+            >>> formatted = r.format_first(data)
+            >>> print(formatted)
+            ('sequence', b'/mnt/prods/hamlet/shots/sq010')
+
         Args:
             data: a string data dictionary to format
 
+        If the data values are bytes, the formatted string is bytes (see resolve_first). This applies to all format methods.
+
         Returns:
             a tuple with the label and the formatted string, or (None, None) if there is no match.
 
         """
+        if self._format_results is None or not data:
+            return self._format_first(data)
+        return self._get_format_result('first', data, self._format_first)
 
+    def _format_first(self, data: dict[str, str]) -> tuple[str, str] | tuple[None, None]:
+        """
+        Implementation of format_first, without cache.
+        """
         result = (None, None)
 
         if not data:
             return result
 
-        for label, _format in self._formats.items():
+        for label, formatter in self._get_formatters(data).items():
 
             if data.keys() != self._keys.get(label):
                 continue
 
-            formatted = _format.format(**data)
+            formatted = formatter(data)
 
             # reverse check
             reverse_check = self.resolve_one(formatted, label)
@@ -633,20 +2330,31 @@ class Resolver:
             the formatted string, or None if the pattern does not match.
 
         """
-
+        if self._format_results is None or not data:
+            return self._format_one(data, label)
+        getter = self._value_getters.get(label)
+        if getter is None or data.keys() != self._keys[label]:
+            return self._format_one(data, label)
+        # the keys are known, the values in pattern order are enough
+        return self._get_format_result(('one', label, getter(data)), data, self._format_one, label)
+
+    def _format_one(self, data: dict[str, str], label: str) -> str | None:
+        """
+        Implementation of format_one, without cache.
+        """
         if not data:
             return None
 
-        _format = self.get_format_for(label)
+        formatter = self._get_formatters(data).get(label)
 
-        if not _format:
+        if not formatter:
             log.info(f'Asked to format with "{label}", but not found in {self.get_formats()}')
             return None
 
         if data.keys() != self._keys.get(label):
             return None
 
-        formatted = _format.format(**data)
+        formatted = formatter(data)
 
         # reverse check
         reverse_check = self.resolve_one(formatted, label)
@@ -699,18 +2407,25 @@ class Resolver:
             An empty dictionary if there is no match.
 
         """
+        if self._format_results is None or not data:
+            return self._format_all(data)
+        return self._get_format_result('all', data, self._format_all)
 
+    def _format_all(self, data: dict[str, str]) -> dict[str, dict[str, str]] | dict:
+        """
+        Implementation of format_all, without cache.
+        """
         found: dict = {}
 
         if not data:
             return found
 
-        for label, _format in self._formats.items():
+        for label, formatter in self._get_formatters(data).items():
 
             if data.keys() != self._keys.get(label):
                 continue
 
-            formatted = _format.format(**data)
+            formatted = formatter(data)
 
             # reverse check
             reverse_check = self.resolve_one(formatted, label)
@@ -721,6 +2436,173 @@ class Resolver:
 
         return found
 
+    def _get_format_result(self, key: tuple | str, data: dict[str, Any], function: Callable, *args: Any) -> Any:
+        """
+        Returns the result of the format method, from the format cache (see format_cache_size).
+
+        The cache key is the method and the frozen data: the set of its items, so that equal data dictionaries
+        share the result, whatever their key order, or for format_one, the values in the order of the pattern keys.
+        A key given as the method name only is completed with the set of items, once the values are checked.
+        Data holding other values than strings (or bytes) is not cached, as equal numbers may format differently, eg. 1 and 1.0,
+        and other values may not be hashable.
+        """
+        for value in data.values():
+            if value.__class__ is not str and value.__class__ is not bytes:
+                return function(data, *args)
+
+        if key.__class__ is str:
+            key = (key, frozenset(data.items()))
+
+        results = self._format_results
+        result = results.get(key, _no_result)  # type: ignore
+        if result is _no_result:
+            self._format_stats[1] += 1
+            result = function(data, *args)
+            if len(results) >= self._options['format_cache_size']:  # type: ignore
+                del results[next(iter(results))]  # type: ignore
+            results[key] = result  # type: ignore
+        else:
+            self._format_stats[0] += 1
+        return result
+
+    def get_format_cache_info(self) -> dict[str, int]:
+        """
+        Returns the statistics of the format cache (see format_cache_size):
+        hits, misses, and current and maximum number of cached results.
+
+        Example
+
+            >>> r = Resolver.get("any_id")
+            >>> r.get_format_cache_info()
+            {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 0}
+        """
+        hits, misses = self._format_stats
+        return {'hits': hits, 'misses': misses, 'size': len(self._format_results or ()),
+                'max_size': self._options['format_cache_size']}
+
+    def format_many(self, label: str,
+                    data: dict[str, Sequence[Any]] | Iterable[Sequence[Any]],
+                    keys: Sequence[str] | None = None) -> list[str | None]:
+        """
+        Formats many data rows with the designated pattern, in bulk.
+
+        The data is either:
+        - a dictionary of columns: each key maps to a sequence of values, all of the same length,
+        - an iterable of rows: each row is a tuple of values, in the order of the given "keys".
+          By default, the keys order is the order of first appearance in the pattern.
+
+        The result is identical to calling format_one for each row:
+        a formatted string, or None if the row does not match the pattern.
+
+        It is faster, because each distinct value is validated only once per column,
+        instead of a reverse check on each formatted string.
+        The strings are then assembled by a formatter compiled from the literal fragments of the "format" string.
+        (If values can not be validated individually, for example with duplicate placeholders, or for bytes values,
+        each row is reverse checked.)
+
+        Examples
+
+            >>> r = Resolver.get("any_id")
+            >>> columns = {'prod': ['hamlet', 'hamlet'], 'seq': ['sq010', 'sq020']}
+            >>> r.format_many("sequence", columns)
+            ['/mnt/prods/hamlet/shots/sq010', '/mnt/prods/hamlet/shots/sq020']
+
+            >>> rows = [('hamlet', 'sq010', 'sh010', 'v001', 'ma'), ('hamlet', 'sq010', 'sh010', 'v002', 'nk')]
+            >>> r.format_many("maya_file", rows)
+            ['/mnt/prods/hamlet/shots/sq010/sh010_v001.ma', None]
+
+        Args:
+            label: a pattern label, must exist as key in the patterns dictionary
+            data: a dictionary of columns, or an iterable of rows
+            keys: the keys order of the rows. Defaults to the order of first appearance in the pattern.
+
+        Returns:
+            list of formatted strings, or None for rows that do not match, in the input order.
+
+        """
+
+        _format = self.get_format_for(label)
+
+        if not _format:
+            log.info(f'Asked to format with "{label}", but not found in {self.get_formats()}')
+            return []
+
+        if isinstance(data, dict):
+            order = tuple(data.keys())
+            rows: Iterable[Sequence[Any]] = zip(*data.values())
+        else:
+            order = tuple(keys) if keys else self._key_order[label]
+            rows = data
+
+        if set(order) != self._keys.get(label) or len(order) != len(set(order)):
+            return [None for __ in rows]
+
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return []
+        rows = itertools.chain([first], rows)
+
+        validators = self._validators.get(label)
+        if not validators or (first and isinstance(first[0], bytes)):
+            return [self.format_one(dict(zip(order, row)), label) for row in rows]
+
+        formatter = template.construct_formatter(_format, order)
+        checks = [validators[key].fullmatch for key in order]
+        memos: list[dict] = [{} for __ in order]
+        width = len(order)
+
+        result: list = []
+        for row in rows:
+            if len(row) != width:
+                result.append(None)
+                continue
+            values = []
+            for memo, check, value in zip(memos, checks, row):
+                checked = memo.get(value, False)
+                if checked is False:
+                    checked = value if isinstance(value, str) else format(value)
+                    if not check(checked):
+                        checked = None
+                    memo[value] = checked
+                if checked is None:
+                    result.append(None)
+                    break
+                values.append(checked)
+            else:
+                result.append(formatter(values))
+
+        return result
+
+
+def _split_lines(buffer: Any, size: int, chunk_size: int) -> list[tuple[int, int]]:
+    """
+    Returns (start, end) offsets of chunks of about *chunk_size* bytes, ending at line boundaries.
+    """
+    chunks = []
+    start = 0
+    while start < size:
+        end = min(start + chunk_size, size)
+        if end < size:
+            newline = buffer.find(b"\n", end - 1)
+            end = size if newline < 0 else newline + 1
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+
+def _init_worker(resolver: Resolver) -> None:
+    # the Resolver is unpickled from its compiled state (see Resolver.__getstate__)
+    global _worker_resolver
+    _worker_resolver = resolver
+
+
+def _resolve_file_chunk(path: str, start: int, end: int, mode: str,
+                        label: str | None) -> list[tuple[str, str, dict[str, str]]]:
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return list(_worker_resolver._resolve_buffer(mapped, start, end, mode, label))  # type: ignore
+
 
 if __name__ == "__main__":
 
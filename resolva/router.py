@@ -0,0 +1,221 @@
+"""
+This file is part of resolva.
+(C) copyright 2024 Michael Haussmann, spil@xeo.info
+resolva is free software and is distributed under the MIT License. See LICENSE file.
+
+Router over several Resolvers, eg. one Resolver per project.
+
+Instead of trying each Resolver in turn, the router dispatches each string to the Resolvers that can match it,
+from a table of the literal roots of their patterns (see Resolver.get_roots), or of declared roots.
+"""
+from __future__ import annotations
+from typing import Any, Iterable
+import concurrent.futures
+from collections import deque
+
+from resolva.resolver import Resolver  # type: ignore
+from resolva.utils import log, batched, ResolvaException  # type: ignore
+
+# router used by worker processes (see ResolverRouter.resolve_many)
+_worker_router: ResolverRouter | None = None
+
+
+class ResolverRouter:
+    """
+    Combines several Resolvers, and dispatches each string to the Resolvers that can match it.
+
+    Each Resolver gets roots: literal texts that the strings it matches start with.
+    By default, they are computed from its patterns: the literal prefix, and the values of a first "enum style"
+    placeholder, eg. "/mnt/prods/{prod:(hamlet|othello)}/..." has the roots "/mnt/prods/hamlet/" and "/mnt/prods/othello/".
+    They can also be declared, eg. for a Resolver per project with generic "{project}/..." patterns.
+    A Resolver without roots receives all strings.
+
+    A string is looked up in the roots table, by its first characters, once per distinct root length.
+    The dispatched Resolvers are then tried in the order they were added,
+    so that results are the same as trying all Resolvers in turn.
+
+    Example
+
+        >>> router = ResolverRouter(["any_id"])
+        >>> router.resolve_first("/mnt/prods/hamlet/shots/sq010")
+        ('any_id', 'sequence', {'prod': 'hamlet', 'seq': 'sq010'})
+        >>> router.get_resolvers("/tmp/file")
+        []
+    """
+
+    def __init__(self, resolvers: Iterable[Resolver | Any] = (), roots: dict[Any, Iterable[str]] | None = None):
+        """
+        Creates a router over the given Resolvers.
+
+        Args:
+            resolvers: Resolvers, or ids of Resolvers in the instance cache (see Resolver.get), in priority order.
+            roots: optional {Resolver id: roots} dictionary, declaring the roots of some Resolvers (see add).
+        """
+        self._resolvers: list[Resolver] = []
+        self._ids: list[Any] = []
+        self._roots: list[list[str]] = []
+        self._table: list[tuple[int, dict[str, list[int]]]] = []  # (root length, {root: resolver indexes})
+        self._everywhere: list[int] = []  # indexes of Resolvers receiving all strings
+
+        roots = roots or {}
+        for resolver in resolvers:
+            id = resolver.get_id() if isinstance(resolver, Resolver) else resolver
+            self.add(resolver, roots.get(id))
+
+    def __str__(self) -> str:
+        return f'[resolva.ResolverRouter] Resolver IDs: {self._ids}'
+
+    def add(self, resolver: Resolver | Any, roots: Iterable[str] | None = None) -> None:
+        """
+        Adds a Resolver to the router, after the Resolvers already added.
+
+        Args:
+            resolver: a Resolver, or the id of a Resolver in the instance cache (see Resolver.get).
+            roots: optional literal texts that all strings matched by the Resolver start with.
+                   By default, they are computed from its patterns (see Resolver.get_roots).
+                   Strings that start with no declared root are not dispatched to the Resolver.
+        """
+        if not isinstance(resolver, Resolver):
+            found = Resolver.get(resolver)
+            if found is None:
+                raise ResolvaException(f'No Resolver found for id "{resolver}"')
+            resolver = found
+        if resolver.get_id() in self._ids:
+            raise ResolvaException(f'A Resolver with id "{resolver.get_id()}" is already routed.')
+
+        if roots is None:
+            roots = [root for label_roots in resolver.get_roots().values() for root in label_roots]
+        roots = list(dict.fromkeys(roots))
+
+        index = len(self._resolvers)
+        self._resolvers.append(resolver)
+        self._ids.append(resolver.get_id())
+        self._roots.append(roots)
+
+        if not roots or '' in roots:
+            self._everywhere.append(index)
+        else:
+            table = dict(self._table)
+            for root in roots:
+                table.setdefault(len(root), {}).setdefault(root, []).append(index)
+            self._table = sorted(table.items())
+        log.debug(f'Routing to "{resolver.get_id()}": {"all strings" if index in self._everywhere else roots}')
+
+    def get_ids(self) -> list[Any]:
+        """
+        Returns the ids of the routed Resolvers, in priority order.
+        """
+        return list(self._ids)
+
+    def get_roots(self) -> dict[Any, list[str]]:
+        """
+        Returns the roots of each routed Resolver, by id. An empty root means that the Resolver receives all strings.
+        """
+        return {id: list(roots) for id, roots in zip(self._ids, self._roots)}
+
+    def _dispatch(self, string: str) -> list[int]:
+        """
+        Returns the indexes of the Resolvers that can match the string, in priority order.
+        """
+        if not isinstance(string, str):
+            return list(range(len(self._resolvers)))  # roots are str, bytes go to all Resolvers
+
+        found = self._everywhere
+        length = len(string)
+        merge = False
+        for root_length, roots in self._table:
+            if root_length > length:
+                break
+            indexes = roots.get(string[:root_length])
+            if indexes:
+                if found:
+                    merge = True
+                    found = found + indexes
+                else:
+                    found = indexes
+        return sorted(set(found)) if merge else found
+
+    def get_resolvers(self, string: str) -> list[Resolver]:
+        """
+        Returns the Resolvers that the string is dispatched to, in priority order.
+        """
+        resolvers = self._resolvers
+        return [resolvers[index] for index in self._dispatch(string)]
+
+    def resolve_first(self, string: str) -> tuple[Any, str, dict[str, str]] | tuple[None, None, None]:
+        """
+        Resolves the string with the first dispatched Resolver that matches it (see Resolver.resolve_first).
+
+        Returns:
+            tuple with the Resolver id, the label and the data, or (None, None, None) if there is no match.
+        """
+        resolvers = self._resolvers
+        for index in self._dispatch(string):
+            label, data = resolvers[index].resolve_first(string)
+            if label is not None:
+                return self._ids[index], label, data  # type: ignore
+        return None, None, None
+
+    def resolve_all(self, string: str) -> dict[Any, dict[str, dict[str, str]]]:
+        """
+        Resolves the string with all dispatched Resolvers (see Resolver.resolve_all).
+
+        Returns:
+            {Resolver id: {label: data}} for the Resolvers that match, or an empty dictionary.
+        """
+        found = {}
+        resolvers = self._resolvers
+        for index in self._dispatch(string):
+            resolved = resolvers[index].resolve_all(string)
+            if resolved:
+                found[self._ids[index]] = resolved
+        return found
+
+    def _resolve_batch(self, strings: list[str], mode: str) -> list:
+        resolve = self.resolve_all if mode == "all" else self.resolve_first
+        return [resolve(string) for string in strings]
+
+    def resolve_many(self, strings: Iterable[str], mode: str = "first", workers: int = 1,
+                     batch_size: int = 10000) -> list:
+        """
+        Resolves many strings, with resolve_first or resolve_all, optionally in worker processes.
+
+        With several workers, the router and its Resolvers are sent to the worker processes (pickled,
+        see Resolver.__getstate__), and batches of strings are resolved in parallel.
+        The number of batches in flight is bounded, and results are returned in input order.
+
+        Args:
+            strings: strings to resolve
+            mode: "first" (see resolve_first) or "all" (see resolve_all)
+            workers: number of worker processes. 1 resolves in the current process.
+            batch_size: number of strings per batch sent to a worker
+
+        Returns:
+            list of results, in the order of the strings
+        """
+        if mode not in ("first", "all"):
+            raise ResolvaException(f'Unknown mode "{mode}" (use "first" or "all")')
+
+        if workers <= 1:
+            return self._resolve_batch(list(strings), mode)
+
+        results: list = []
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                    initargs=(self,)) as executor:
+            pending: deque = deque()
+            for batch in batched(strings, batch_size):
+                pending.append(executor.submit(_resolve_batch, batch, mode))
+                while len(pending) >= workers * 2:
+                    results.extend(pending.popleft().result())
+            while pending:
+                results.extend(pending.popleft().result())
+        return results
+
+
+def _init_worker(router: ResolverRouter) -> None:
+    global _worker_router
+    _worker_router = router
+
+
+def _resolve_batch(strings: list[str], mode: str) -> list:
+    return _worker_router._resolve_batch(strings, mode)  # type: ignore
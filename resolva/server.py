@@ -0,0 +1,559 @@
+"""
+This file is part of resolva.
+(C) copyright 2024 Michael Haussmann, spil@xeo.info
+resolva is free software and is distributed under the MIT License. See LICENSE file.
+
+Resolver server over a Unix domain socket, for short-lived client processes.
+
+A long-lived server process keeps warm Resolvers, and their caches, and serves resolve and format requests.
+Short-lived processes (DCC hooks, farm scripts...) use a ResolverClient, that has the same methods as the Resolver,
+instead of creating the Resolver themselves. If the server is not running, the client resolves in-process.
+On Windows, without Unix domain sockets, there is no ResolverServer, and clients always resolve in-process.
+
+Starting the server
+
+    python -m resolva.server -p patterns.json --id sids
+    python -m resolva.server -p pattern.py --variable sid_templates --id sids --socket "$XDG_RUNTIME_DIR/sids.sock"
+
+Protocol
+
+Each message is a JSON object, prefixed by its length in bytes (4 bytes, big endian).
+- request: {"id": request number, "resolver": Resolver id, "method": method name, "args": [arguments]},
+  or "batch": [[arguments], ...] instead of "args", to call the method for each argument list.
+- response: {"id": request number, "result": result}, or {"id": request number, "error": message}.
+Requests are answered in order, so that clients can send several requests before reading the responses (pipelining).
+A client can register a Resolver that the server does not know, with the "register" method,
+and {"patterns": {...}, "options": {...}}.
+"""
+from __future__ import annotations
+from typing import Any, Iterable, Sequence
+import argparse
+import json
+import math
+import os
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+from resolva.resolver import Resolver  # type: ignore
+from resolva.utils import log, batched, ResolvaException  # type: ignore
+
+_HEADER = struct.Struct('>I')
+_CREDENTIALS = struct.Struct('3i')  # pid, uid, gid (see SO_PEERCRED)
+_MAX_MESSAGE_SIZE = 1 << 30
+
+# Unix domain sockets, and per user socket paths. Without them (Windows), there is no server,
+# and clients resolve in-process.
+_unix_sockets = hasattr(socket, 'AF_UNIX') and hasattr(os, 'getuid')
+
+# Resolver methods served
+_methods = frozenset(['resolve_first', 'resolve_one', 'resolve_all', 'label_of', 'matches',
+                      'format_first', 'format_one', 'format_all', 'format_many', 'get_labels', 'get_patterns'])
+
+
+def get_default_socket_path(create: bool = False) -> str:
+    """
+    Returns the socket path from the RESOLVA_SOCKET environment variable, or in the user runtime directory
+    ($XDG_RUNTIME_DIR), or in a private per user directory of the temporary directory.
+
+    Args:
+        create: creates the private directory if needed (for the server).
+                An existing directory must be owned by the user, and not accessible to others.
+    """
+    path = os.environ.get('RESOLVA_SOCKET')
+    if path:
+        return path
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return os.path.join(runtime, 'resolva.sock')
+
+    directory = os.path.join(tempfile.gettempdir(), f'resolva-{os.getuid()}')
+    if create:
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+        status = os.lstat(directory)
+        if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid() or status.st_mode & 0o077:
+            raise ResolvaException(f'"{directory}" is not a private directory of the user')
+    return os.path.join(directory, 'resolva.sock')
+
+
+def get_peer_uid(connection: socket.socket) -> int | None:
+    """
+    Returns the user id of the process at the other end of a Unix domain socket,
+    or None where SO_PEERCRED is not available (Linux only).
+    """
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _CREDENTIALS.size)
+    return _CREDENTIALS.unpack(credentials)[1]
+
+
+def send_message(connection: socket.socket, message: Any) -> None:
+    """
+    Sends a JSON message, prefixed by its length.
+    """
+    payload = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    connection.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def receive_message(stream: Any) -> Any:
+    """
+    Reads a length prefixed JSON message from a binary file-like stream.
+
+    Returns:
+        the message, or None at the end of the stream
+    """
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    size = _HEADER.unpack(header)[0]
+    if size > _MAX_MESSAGE_SIZE:
+        raise ResolvaException(f'Message too large: {size} bytes')
+    payload = stream.read(size)
+    if len(payload) < size:
+        return None
+    return json.loads(payload)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self) -> None:
+        while True:
+            try:
+                request = receive_message(self.rfile)
+            except (OSError, ValueError, ResolvaException) as error:
+                log.debug(f'Closing connection: {error}')
+                return
+            if request is None:
+                return
+            response = self.server.execute(request)  # type: ignore
+            try:
+                try:
+                    send_message(self.connection, response)
+                except (TypeError, ValueError) as error:  # a result that is not JSON serializable
+                    send_message(self.connection, {'id': response['id'], 'error': f'Invalid result: {error}'})
+            except OSError:
+                return
+
+
+if hasattr(socket, 'AF_UNIX'):  # not on Windows
+
+    class ResolverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """
+        Serves resolve and format requests to ResolverClients, over a Unix domain socket.
+
+        Each connection is handled by a thread. Calls to the Resolvers are serialized,
+        as the Resolver caches are not thread safe, and calls are short.
+
+        The socket is only accessible to the user, and where the peer user is known (SO_PEERCRED),
+        connections of other users are refused.
+        """
+        daemon_threads = True
+
+        def __init__(self, path: str | None = None, resolvers: Iterable[Resolver] | dict[Any, Resolver] = ()):
+            """
+            Args:
+                path: the socket path, by default get_default_socket_path(), in a private directory.
+                      A stale socket file (with no server listening) is replaced.
+                resolvers: the Resolvers to serve, or a {id: Resolver} dictionary.
+                           Clients can register other Resolvers (see ResolverClient).
+            """
+            path = path or get_default_socket_path(create=True)
+            if isinstance(resolvers, dict):
+                self.resolvers = dict(resolvers)
+            else:
+                self.resolvers = {resolver.get_id(): resolver for resolver in resolvers}
+            self._lock = threading.Lock()
+
+            if os.path.exists(path):
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    probe.connect(path)
+                except OSError:
+                    os.unlink(path)
+                else:
+                    raise ResolvaException(f'A server is already listening on "{path}"')
+                finally:
+                    probe.close()
+
+            mask = os.umask(0o177)  # the socket is only usable by the user
+            try:
+                super().__init__(path, _RequestHandler)
+            finally:
+                os.umask(mask)
+            self.path = path
+            log.info(f'Resolver server listening on "{path}", serving {list(self.resolvers)}')
+
+        def verify_request(self, request: Any, client_address: Any) -> bool:
+            uid = get_peer_uid(request)
+            if uid is not None and uid != os.getuid():
+                log.warning(f'Refused a connection of user {uid}')
+                return False
+            return True
+
+        def server_close(self) -> None:
+            super().server_close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+        def execute(self, request: dict) -> dict:
+            """
+            Executes a request, and returns the response.
+
+            Any error, including malformed requests, is returned as an error response, and the connection stays open.
+            """
+            if not isinstance(request, dict):
+                return {'id': None, 'error': f'Invalid request: {request!r}'}
+            response: dict = {'id': request.get('id')}
+            try:
+                response['result'] = self._execute(request)
+            except Exception as error:
+                log.debug(f'Request {response["id"]} failed: {error!r}')
+                response['error'] = str(error) or error.__class__.__name__
+            return response
+
+        def _execute(self, request: dict) -> Any:
+            id = request.get('resolver')
+            method = request.get('method')
+
+            with self._lock:
+                if method == 'register':
+                    if id not in self.resolvers:
+                        self.resolvers[id] = Resolver(id, request['patterns'], **request.get('options', {}))
+                        log.info(f'Registered Resolver "{id}"')
+                    return True
+
+                resolver = self.resolvers.get(id)
+                if resolver is None:
+                    raise ResolvaException(f'Unknown Resolver "{id}"')
+                if method not in _methods:
+                    raise ResolvaException(f'Unknown method "{method}"')
+
+                function = getattr(resolver, method)
+                if 'batch' in request:
+                    return [function(*args) for args in request['batch']]
+                return function(*request.get('args', ()))
+
+
+class ResolverClient:
+    """
+    Client of a ResolverServer, with the same resolve and format methods as the Resolver.
+
+    If the server is not running, or goes away, the client resolves in-process,
+    with the Resolver from the instance cache, or created from the given patterns,
+    and tries to connect again after the retry interval.
+    If the server does not know the Resolver, the client registers it, with its patterns.
+
+    Values are sent as JSON: data values are str (bytes are not supported), and tuples are returned as tuples.
+
+    Example
+
+        client = ResolverClient("sids", patterns)
+        client.resolve_first("hamlet/s/sq010")
+        client.resolve_many(paths)  # batched and pipelined
+    """
+
+    def __init__(self, id: Any, patterns: dict[str, str] | None = None, path: str | None = None,
+                 timeout: float | None = 10.0, retry_interval: float = 5.0, **options: Any):
+        """
+        Args:
+            id: the Resolver id
+            patterns: the Resolver patterns, used to register the Resolver on the server, or to resolve in-process.
+            path: the socket path, by default get_default_socket_path().
+            timeout: timeout of socket operations, in seconds.
+            retry_interval: while resolving in-process, seconds between attempts to connect to the server.
+            options: the Resolver options, used with the patterns.
+        """
+        self._id = id
+        self._patterns = patterns
+        self._options = options
+        self._path = path or (get_default_socket_path() if _unix_sockets else None)
+        self._timeout = timeout
+        self._retry_interval = retry_interval
+        self._retry_time = 0.0
+        self._count = 0
+        self._resolver: Resolver | None = None
+        self._socket: socket.socket | None = None
+        self._stream: Any = None
+
+        if not _unix_sockets:
+            log.debug('No Unix domain sockets, resolving in-process.')
+            self._retry_time = math.inf
+            return
+        self._connect()
+
+    def _connect(self) -> bool:
+        """
+        Connects to the server. On failure, the next attempt is after the retry interval.
+
+        Returns:
+            True if connected
+        """
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(self._timeout)
+        try:
+            connection.connect(self._path)
+        except OSError as error:
+            connection.close()
+            self._retry_time = time.monotonic() + self._retry_interval
+            log.debug(f'No Resolver server on "{self._path}" ({error}), resolving in-process.')
+            return False
+
+        # only trusts a server of the same user: the peer user, or else the owner of the socket file
+        try:
+            uid = get_peer_uid(connection)
+            if uid is None:
+                uid = os.stat(self._path).st_uid  # type: ignore
+        except OSError:
+            uid = None
+        if uid != os.getuid():
+            connection.close()
+            self._retry_time = math.inf
+            log.warning(f'The Resolver server on "{self._path}" is run by another user ({uid}), resolving in-process.')
+            return False
+
+        self._socket = connection
+        self._stream = connection.makefile('rb')
+        return True
+
+    def __str__(self) -> str:
+        where = f'server "{self._path}"' if self._socket is not None else 'in-process'
+        return f'[resolva.ResolverClient] ID: [{self._id}] - {where}'
+
+    def is_connected(self) -> bool:
+        """
+        Returns True if requests are sent to the server, False if they are resolved in-process.
+        """
+        return self._socket is not None
+
+    def close(self) -> None:
+        """
+        Closes the connection. The client then resolves in-process, and does not reconnect.
+        """
+        self._disconnect()
+        self._retry_time = math.inf
+
+    def _disconnect(self) -> None:
+        if self._socket is not None:
+            self._stream.close()
+            self._socket.close()
+            self._socket = None
+
+    def _get_resolver(self) -> Resolver:
+        if self._resolver is None:
+            resolver = Resolver.get(self._id)
+            if resolver is None:
+                if self._patterns is None:
+                    raise ResolvaException(f'No server, and no patterns to create the Resolver "{self._id}"')
+                resolver = Resolver(self._id, self._patterns, **self._options)
+            self._resolver = resolver
+        return self._resolver
+
+    def _send(self, method: str, **fields: Any) -> int:
+        self._count += 1
+        send_message(self._socket, dict(id=self._count, resolver=self._id, method=method, **fields))  # type: ignore
+        return self._count
+
+    def _receive(self, number: int) -> Any:
+        response = receive_message(self._stream)
+        if response is None:
+            raise ConnectionError('The Resolver server closed the connection')
+        if response.get('id') != number:
+            raise ConnectionError(f'Unexpected response {response.get("id")}, expected {number}')
+        if 'error' in response:
+            raise ResolvaException(response['error'])
+        return response['result']
+
+    def _request(self, method: str, calls: list[Sequence], batch_size: int) -> list:
+        """
+        Sends the calls by batches, without waiting for each response.
+
+        Several batches are sent by a thread, while the responses are read, so that neither side
+        blocks on a full socket buffer, waiting for the other to read.
+        """
+        batches = list(batched(calls, batch_size))
+        if len(batches) == 1:
+            return self._receive(self._send(method, batch=batches[0]))
+
+        first = self._count + 1
+        self._count += len(batches)
+        connection = self._socket
+
+        def send() -> None:
+            try:
+                for number, batch in enumerate(batches, first):
+                    request = dict(id=number, resolver=self._id, method=method, batch=batch)
+                    send_message(connection, request)  # type: ignore
+            except OSError as error:
+                log.debug(f'Sending to the Resolver server failed: {error}')
+
+        sender = threading.Thread(target=send, daemon=True)
+        sender.start()
+
+        results: list = []
+        failure: ResolvaException | None = None
+        try:
+            for number in range(first, first + len(batches)):
+                try:
+                    results.extend(self._receive(number))
+                except ResolvaException as error:
+                    # read the other responses, so that the next request reads its own response
+                    failure = failure or error
+        except BaseException:
+            # the connection is unusable, and shutting it down stops the sender
+            try:
+                connection.shutdown(socket.SHUT_RDWR)  # type: ignore
+            except OSError:
+                pass
+            self._disconnect()
+            raise
+        finally:
+            sender.join()
+        if failure is not None:
+            raise failure
+        return results
+
+    def _call_many(self, method: str, calls: list[Sequence], batch_size: int = 1000) -> list:
+        """
+        Calls the Resolver method for each argument list, on the server, or in-process.
+        """
+        if self._socket is None and time.monotonic() >= self._retry_time:
+            self._connect()
+        if self._socket is not None:
+            try:
+                try:
+                    return self._request(method, calls, batch_size)
+                except ResolvaException as error:
+                    if not str(error).startswith('Unknown Resolver') or self._patterns is None:
+                        raise
+                    self._receive(self._send('register', patterns=self._patterns, options=self._options))
+                    return self._request(method, calls, batch_size)
+            except (OSError, ValueError) as error:
+                log.info(f'Resolver server unavailable ({error}), resolving in-process.')
+                self._disconnect()
+                self._retry_time = time.monotonic() + self._retry_interval
+
+        function = getattr(self._get_resolver(), method)
+        return [function(*args) for args in calls]
+
+    def _call(self, method: str, *args: Any) -> Any:
+        return self._call_many(method, [args])[0]
+
+    def resolve_first(self, string: str) -> tuple[str, dict[str, str]] | tuple[None, None]:
+        """See Resolver.resolve_first"""
+        return tuple(self._call('resolve_first', string))  # type: ignore
+
+    def resolve_one(self, string: str, label: str) -> dict[str, str] | dict:
+        """See Resolver.resolve_one"""
+        return self._call('resolve_one', string, label)
+
+    def resolve_all(self, string: str) -> dict[str, dict[str, str]] | dict:
+        """See Resolver.resolve_all"""
+        return self._call('resolve_all', string)
+
+    def label_of(self, string: str) -> str | None:
+        """See Resolver.label_of"""
+        return self._call('label_of', string)
+
+    def matches(self, string: str, label: str) -> bool:
+        """See Resolver.matches"""
+        return self._call('matches', string, label)
+
+    def format_first(self, data: dict[str, str]) -> tuple[str, str] | tuple[None, None]:
+        """See Resolver.format_first"""
+        return tuple(self._call('format_first', data))  # type: ignore
+
+    def format_one(self, data: dict[str, str], label: str) -> str | None:
+        """See Resolver.format_one"""
+        return self._call('format_one', data, label)
+
+    def format_all(self, data: dict[str, str]) -> dict[str, str] | dict:
+        """See Resolver.format_all"""
+        return self._call('format_all', data)
+
+    def format_many(self, label: str, data: dict[str, Sequence[Any]] | Iterable[Sequence[Any]],
+                    keys: Sequence[str] | None = None) -> list[str | None]:
+        """See Resolver.format_many"""
+        if not isinstance(data, dict):
+            data = [list(row) for row in data]
+        return self._call('format_many', label, data, keys)
+
+    def get_labels(self) -> list[str]:
+        """See Resolver.get_labels"""
+        return self._call('get_labels')
+
+    def get_patterns(self) -> dict[str, str]:
+        """See Resolver.get_patterns"""
+        return self._call('get_patterns')
+
+    def labels_of(self, strings: Iterable[str]) -> list[str | None]:
+        """See Resolver.labels_of"""
+        return self._call_many('label_of', [(string,) for string in strings])
+
+    def matches_many(self, strings: Iterable[str], label: str) -> list[bool]:
+        """See Resolver.matches_many"""
+        return self._call_many('matches', [(string, label) for string in strings])
+
+    def resolve_many(self, strings: Iterable[str], mode: str = "first") -> list:
+        """
+        Resolves many strings, with resolve_first or resolve_all, in batches sent without waiting for each response.
+
+        Returns:
+            list of results, in the order of the strings
+        """
+        if mode not in ("first", "all"):
+            raise ResolvaException(f'Unknown mode "{mode}" (use "first" or "all")')
+        results = self._call_many(f'resolve_{mode}', [(string,) for string in strings])
+        return [tuple(result) for result in results] if mode == "first" else results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m resolva.server",
+                                     description="Serves Resolvers to ResolverClients, over a Unix domain socket.")
+    parser.add_argument("-p", "--patterns", help="patterns file (.json, .yaml, .yml or .py)")
+    parser.add_argument("--variable", help="name of the patterns dictionary, in a python patterns file")
+    parser.add_argument("--id", default="default", help="id of the Resolver created from the patterns")
+    parser.add_argument("-s", "--socket", help="socket path (default: $RESOLVA_SOCKET, or a per user temporary path)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    from resolva.cli import load_patterns  # type: ignore
+
+    args = parse_args(argv)
+    if not hasattr(socket, 'AF_UNIX'):
+        print("resolva.server: Unix domain sockets are not available on this platform", file=sys.stderr)
+        return 2
+
+    resolvers = []
+    try:
+        if args.patterns:
+            resolvers.append(Resolver(args.id, load_patterns(args.patterns, args.variable)))
+        server = ResolverServer(args.socket, resolvers)
+    except (OSError, ValueError, ResolvaException) as error:
+        print(f"resolva.server: {error}", file=sys.stderr)
+        return 2
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)  # stop like with Ctrl-C, and remove the socket file
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,29 +11,41 @@ licence: Apache License, Version 2.0, January 2004, http://www.apache.org/licens
 """
 import functools
 from collections import defaultdict
+import os
 import re
+import string as _string
 import sys
 
 from resolva.utils import ResolvaException
 
+try:
+    from re import _parser as _sre_parse  # type: ignore  # python >= 3.11
+except ImportError:
+    import sre_parse as _sre_parse  # type: ignore
+from _sre import MAXREPEAT as _MAXREPEAT  # type: ignore
+
 _default_placeholder_expression = "[^/]*"  # spil
 _STRIP_EXPRESSION_REGEX = re.compile(r'{(.+?)(:(\\}|.)+?)}')
 _PLAIN_PLACEHOLDER_REGEX = re.compile(r'{(.+?)}')
+_PLACEHOLDER_REGEX = re.compile(r'{(?P<placeholder>.+?)(:(?P<expression>(\\}|.)+?))?}')
+_REGEX_SPECIAL_CHARACTERS = '.^$*+?{}[]\\|()'
+_ESCAPE_REGEX = re.compile(r'(?P<placeholder>{(.+?)(:(\\}|.)+?)?})|(?P<other>.+?)')
+
 
+def construct_regular_expression(pattern, anchor_start=True, anchor_end=True, strict=False):
+    '''Return a regular expression to represent *pattern*.
 
-def construct_regular_expression(pattern, anchor_start=True, anchor_end=True):
-    '''Return a regular expression to represent *pattern*.'''
+    If *strict* is True, the non-placeholder text is escaped, and matches literally.
+    Else it is used as regular expression, eg. "." matches any character.
+    '''
     # Escape non-placeholder components.
-    # expression = re.sub(
-    #     r'(?P<placeholder>{(.+?)(:(\\}|.)+?)?})|(?P<other>.+?)',
-    #     self._escape,
-    #     pattern
-    # )
-    expression = pattern
+    if strict:
+        expression = _ESCAPE_REGEX.sub(_escape, pattern)
+    else:
+        expression = pattern
 
     # Replace placeholders with regex pattern.
-    expression = re.sub(
-        r'{(?P<placeholder>.+?)(:(?P<expression>(\\}|.)+?))?}',
+    expression = _PLACEHOLDER_REGEX.sub(
         functools.partial(
             _convert, placeholder_count=defaultdict(int)
         ),
@@ -64,6 +76,111 @@ def construct_regular_expression(pattern, anchor_start=True, anchor_end=True):
     return compiled
 
 
+def construct_bytes_regular_expression(regex, multiline=False):
+    """
+    Returns a bytes compiled variant of the compiled *regex*, to match bytes without decoding.
+
+    The pattern is encoded like file system paths (os.fsencode).
+    Note that character classes like "\\d" or "\\w" match ASCII characters only in bytes regexes.
+
+    Args:
+        regex: a compiled str regex, as returned by construct_regular_expression
+        multiline: if "^" and "$" should also match at line boundaries (to scan lines in a buffer)
+
+    Returns:
+        the compiled bytes regex
+    """
+    flags = regex.flags & ~re.UNICODE
+    if multiline:
+        flags |= re.MULTILINE
+    return re.compile(os.fsencode(regex.pattern), flags)
+
+
+# regex backends (see compile_with_backend) - name: [module or module name, linear time, end anchor]
+# re2 runs in linear time, without backtracking, and its "$" only matches at the very end of the string,
+# where re also matches before a final newline.
+_regex_backends = {'re': [re, False, None],
+                   're2': ['re2', True, r'(?:\n)?\z'],
+                   'regex': ['regex', False, None]}
+
+
+def register_regex_backend(name, module, linear=False, end_anchor=None):
+    """
+    Registers a regex backend, usable with the regex_backend option of the Resolver.
+
+    Args:
+        name: the backend name
+        module: the backend module, or its name, imported on first use.
+                It has a compile(source) function returning compiled patterns like re.Pattern,
+                that raises module.error (or re.error) for unsupported expressions.
+        linear: if the backend runs in linear time, so that its patterns never backtrack heavily.
+        end_anchor: the backend expression replacing a final "$", if its "$" does not also match before a final newline.
+    """
+    _regex_backends[name] = [module, linear, end_anchor]
+
+
+def get_regex_backend(name):
+    """
+    Returns the module of the named regex backend, and if it runs in linear time.
+
+    >>> module, linear = get_regex_backend('re')
+    >>> module.__name__, linear
+    ('re', False)
+
+    Raises:
+        ResolvaException if the backend is unknown, or its module is not installed.
+    """
+    backend = _regex_backends.get(name)
+    if backend is None:
+        raise ResolvaException(f'Unknown regex backend "{name}" (use one of {list(_regex_backends)})')
+    if isinstance(backend[0], str):
+        try:
+            backend[0] = __import__(backend[0])
+        except ImportError:
+            raise ResolvaException(f'The "{name}" regex backend requires the "{backend[0]}" module')
+    return backend[0], backend[1]
+
+
+def compile_with_backend(regex, backend='re'):
+    """
+    Returns the compiled variant of *regex* for the regex backend, and the name of the backend used.
+
+    Expressions that the backend can not compile, because they use a feature it lacks
+    (eg. look-arounds or possessive repeats with re2), or flags, fall back to *regex* itself, with "re".
+
+    >>> compile_with_backend(re.compile('^(?P<name001>[^/]*)$'))
+    (re.compile('^(?P<name001>[^/]*)$'), 're')
+
+    Args:
+        regex: a compiled str regex, as returned by construct_regular_expression
+        backend: name of the regex backend (see get_regex_backend)
+
+    Returns:
+        tuple (compiled pattern, backend name)
+    """
+    module, __ = get_regex_backend(backend)
+    if module is re or regex.flags & ~re.UNICODE:
+        return regex, 're'
+
+    source = regex.pattern
+    end_anchor = _regex_backends[backend][2]
+    if end_anchor is not None and source.endswith('$') and not source.endswith('\\$'):
+        source = source[:-1] + end_anchor
+    try:
+        return module.compile(source), backend
+    except (getattr(module, 'error', re.error), re.error):
+        return regex, 're'
+
+
+def _escape(match):
+    '''Escape matched 'other' group value.'''
+    groups = match.groupdict()
+    if groups['other'] is not None:
+        return re.escape(groups['other'])
+
+    return groups['placeholder']
+
+
 def _convert(match, placeholder_count):
     '''Return a regular expression to represent *match*.
 
@@ -91,13 +208,16 @@ def _convert(match, placeholder_count):
     return r'(?P<{0}>{1})'.format(placeholder_name, expression)
 
 
-def match_to_dict(match, check_duplicate_placeholders=True):
+def match_to_dict(match, check_duplicate_placeholders=True, intern=None, encoding=None, errors='surrogateescape'):
     """
     Derived from lucidity.Template.parse function.
 
     Args:
         match: regex match
         check_duplicate_placeholders: if we should check that duplicate placeholders have identical values.
+        intern: optional callable returning a shared instance for a key or value (see make_interner)
+        encoding: to decode values, for matches on bytes (eg. sys.getfilesystemencoding())
+        errors: error handler used to decode values, default "surrogateescape" keeps undecodable bytes (like os.fsdecode)
 
     Returns:
         the dictionary of key values extracted from the regex match.
@@ -108,6 +228,13 @@ def match_to_dict(match, check_duplicate_placeholders=True):
         # Strip number that was added to make group name unique.
         key = key[:-3]
 
+        if encoding is not None and value is not None:
+            value = value.decode(encoding, errors)
+
+        if intern is not None and value is not None:
+            key = intern(key)
+            value = intern(value)
+
         # If check_duplicate_placeholders is True, ensure that
         # all duplicate placeholders extract the same value.
         if check_duplicate_placeholders:
@@ -124,15 +251,1471 @@ def match_to_dict(match, check_duplicate_placeholders=True):
     return data
 
 
+def get_placeholders(pattern):
+    """
+    Returns the placeholders of *pattern*, in order of appearance, including duplicates.
+
+    Each placeholder is a (key, expression) tuple.
+    Placeholders without expression get the default placeholder expression.
+
+    Args:
+        pattern: a pattern string, eg. "{project}/{type:(a|s)}"
+
+    Returns:
+        list of (key, expression) tuples, eg. [("project", "[^/]*"), ("type", "(a|s)")]
+    """
+    result = []
+    for match in _PLACEHOLDER_REGEX.finditer(pattern):
+        expression = match.group('expression')
+        if expression is None:
+            expression = _default_placeholder_expression
+        expression = expression.replace('\\{', '{').replace('\\}', '}')
+        result.append((match.group('placeholder'), expression))
+    return result
+
+
+def get_literals(pattern):
+    """
+    Returns the literal (non placeholder) texts of *pattern*.
+
+    There is always one more literal text than placeholders, possibly empty strings.
+
+    Args:
+        pattern: a pattern string, eg. "{project}/s/{sequence}"
+
+    Returns:
+        list of literal texts, eg. ["", "/s/", ""]
+    """
+    literals = []
+    position = 0
+    for match in _PLACEHOLDER_REGEX.finditer(pattern):
+        literals.append(pattern[position:match.start()])
+        position = match.end()
+    literals.append(pattern[position:])
+    return literals
+
+
+def unescape_literal(text):
+    """
+    Returns the string matched by the regex *text*, if *text* only matches this literal string.
+    Else returns None.
+
+    Escaped non-alphanumeric characters are literals, eg. "\\*" returns "*".
+    Any other special character or escape sequence (eg. "\\d") means *text* is not a literal.
+    """
+    result = []
+    escaped = False
+    for char in text:
+        if escaped:
+            if char.isalnum() or char == '_':
+                return None
+            result.append(char)
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char in _REGEX_SPECIAL_CHARACTERS:
+            return None
+        else:
+            result.append(char)
+    if escaped:
+        return None
+    return ''.join(result)
+
+
+def _literal_value(text, strict=False):
+    """
+    Returns the string matched by a literal text of a pattern, or None if it is not a plain literal.
+    In strict mode, literal texts are escaped, and always match themselves.
+    """
+    return text if strict else unescape_literal(text)
+
+
+def get_literal_checks(pattern, anchor_start=True, anchor_end=True, strict=False):
+    """
+    Returns literal strings that any string matched by *pattern* must contain, to reject strings before running a regex.
+
+    - prefix: the literal text the string starts with (needs anchor_start), or None.
+    - suffixes: tuple of literal texts the string ends with, for str.endswith (needs anchor_end), or None.
+      Like "$", the suffix may be followed by a final newline.
+    - substring: the longest other literal text (at least 2 characters) the string contains, or None.
+
+    Literal texts containing regex special characters are not used, unless *strict* is True.
+
+    Args:
+        pattern: a pattern string
+        anchor_start: if the patterns regex starts with "^"
+        anchor_end: if the patterns regex ends with "$"
+        strict: if literal texts are escaped (see construct_regular_expression)
+
+    Returns:
+        tuple (prefix, suffixes, substring)
+    """
+    literals = [_literal_value(text, strict) for text in get_literals(pattern)]
+
+    prefix = None
+    suffixes = None
+    if anchor_start and literals[0]:
+        prefix = literals[0]
+        literals[0] = None
+    if anchor_end and literals[-1]:
+        suffixes = (literals[-1], literals[-1] + '\n')
+        literals[-1] = None
+
+    candidates = [literal for literal in literals if literal and len(literal) > 1]
+    substring = max(candidates, key=len) if candidates else None
+    return prefix, suffixes, substring
+
+
+def get_literal_roots(pattern, strict=False):
+    """
+    Returns the literal texts that any string matched by the anchored *pattern* starts with, one of them at least.
+
+    This is the literal prefix of the pattern, followed by each value of the first placeholder,
+    if it is "enum style", and by the literal text after it.
+    If nothing is known, the only root is the empty string.
+
+    >>> get_literal_roots('/mnt/prods/{prod:(hamlet|othello)}/{seq}')
+    ['/mnt/prods/hamlet/', '/mnt/prods/othello/']
+    >>> get_literal_roots('{project}/{type:s}')
+    ['']
+
+    Args:
+        pattern: a pattern string
+        strict: if literal texts are escaped (see construct_regular_expression)
+
+    Returns:
+        list of literal texts
+    """
+    literals = [_literal_value(text, strict) for text in get_literals(pattern)]
+    prefix = literals[0] or ''
+    if literals[0] is None or len(literals) == 1:
+        return [prefix]
+
+    values = get_literal_values(get_placeholders(pattern)[0][1], complete=True)
+    if not values:
+        return [prefix]
+    return [prefix + value + (literals[1] or '') for value in values]
+
+
+def get_literal_values(expression, complete=False):
+    """
+    Returns the literal alternatives of an "enum style" placeholder expression.
+
+    For example "(board|layout|anim|v\\d\\d\\d|\\*)" returns ["board", "layout", "anim", "*"].
+    Alternatives that are not plain literals (here "v\\d\\d\\d") are ignored.
+    A plain literal expression, like in "{type:s}", returns a single value.
+
+    Args:
+        expression: a placeholder expression
+        complete: if True, an empty list is returned unless all alternatives are plain literals,
+                  so that the values are exactly the strings matched by the expression.
+
+    Returns:
+        list of literal strings, possibly empty.
+    """
+    body = expression
+    if body.startswith('(?:') and body.endswith(')'):
+        body = body[3:-1]
+    elif body.startswith('(') and not body.startswith('(?') and body.endswith(')'):
+        body = body[1:-1]
+
+    # nested groups are not analysed
+    if '(' in body.replace('\\(', '') or ')' in body.replace('\\)', ''):
+        return []
+
+    alternatives = []
+    current = []
+    escaped = False
+    for char in body:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == '\\':
+            current.append(char)
+            escaped = True
+        elif char == '|':
+            alternatives.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    alternatives.append(''.join(current))
+
+    result = []
+    for alternative in alternatives:
+        value = unescape_literal(alternative)
+        if value is None and complete:
+            return []
+        if value is not None and value not in result:
+            result.append(value)
+    return result
+
+
+def make_interner(constants=(), max_size=10000):
+    """
+    Returns an "intern" function, that returns a shared instance for equal strings.
+
+    The given constants (eg. keys and enum values) are always returned as the same object.
+    Other strings are added to a table, up to *max_size* entries.
+    Once the table is full, new strings are returned as is.
+
+    Args:
+        constants: strings that are always interned
+        max_size: maximum number of non-constant strings held in the table
+
+    Returns:
+        a function that takes a string, and returns the shared equal string.
+    """
+    _constants = {value: value for value in constants}
+    table = {}
+
+    def intern(value):
+        found = _constants.get(value)
+        if found is None:
+            found = table.get(value)
+            if found is None:
+                if len(table) < max_size:
+                    table[value] = value
+                found = value
+        return found
+
+    return intern
+
+
 def construct_format_specification(pattern):
     '''Return format specification from *pattern*.'''
     return _STRIP_EXPRESSION_REGEX.sub('{\g<1>}', pattern)
 
 
+def split_segments(pattern, separator='/'):
+    """
+    Splits *pattern* in segments, at each separator that is not inside a placeholder.
+
+    Args:
+        pattern: a pattern string, eg. "{project}/{type:(a|s)}/{sequence}"
+        separator: the segment separator
+
+    Returns:
+        list of segment patterns, eg. ["{project}", "{type:(a|s)}", "{sequence}"]
+    """
+    segments = ['']
+    position = 0
+    for match in _PLACEHOLDER_REGEX.finditer(pattern):
+        literal = pattern[position:match.start()].split(separator)
+        segments[-1] += literal[0]
+        segments.extend(literal[1:])
+        segments[-1] += match.group(0)
+        position = match.end()
+    literal = pattern[position:].split(separator)
+    segments[-1] += literal[0]
+    segments.extend(literal[1:])
+    return segments
+
+
+def is_segment_aligned(pattern, separator='/', strict=False):
+    """
+    Returns True if no part of *pattern* can match the separator, except the literal separators.
+    Each segment of a matching string then matches the corresponding segment of the pattern.
+
+    For example "{project}/{type:(a|s)}/{sequence}" is segment aligned,
+    but "{project}/{path:(.*)}" is not, and neither is "{shot}.{ext}" (the unescaped "." matches any character),
+    unless *strict* is True.
+
+    Args:
+        pattern: a pattern string
+        separator: the segment separator
+        strict: if literal texts are escaped (see construct_regular_expression)
+
+    Returns:
+        True if the pattern is segment aligned
+    """
+    return not any(_segment_matches_separator(segment, separator, strict)
+                   for segment in split_segments(pattern, separator))
+
+
+@functools.lru_cache(maxsize=4096)
+def _segment_matches_separator(segment, separator, strict):
+    # memoized, as patterns often share segments, eg. "{project}/{type:(a|s)}"
+    expression = construct_regular_expression(segment, anchor_start=False, anchor_end=False, strict=strict).pattern
+    return can_match_character(expression, separator)
+
+
+def describe_segment(segment, strict=False):
+    """
+    Describes the strings matched by a pattern segment, for pattern analysis (see pattern_covers).
+
+    The description is a (kind, value) tuple:
+    - ("values", frozenset of strings): the segment matches exactly these strings (literal text, "enum style" placeholder).
+    - ("any", None): the segment is a single default placeholder, matching any segment.
+    - ("regex", compiled regex): the segment matches the strings that fully match the regex.
+    - ("unknown", None): the segment depends on its context (anchors, lookarounds...) and cannot be analysed.
+
+    Args:
+        segment: a pattern segment, without separator
+        strict: if literal texts are escaped (see construct_regular_expression)
+
+    Returns:
+        tuple (kind, value)
+    """
+    placeholders = get_placeholders(segment)
+    texts = get_literals(segment)
+    literals = [_literal_value(text, strict) for text in texts]
+    if strict:
+        texts = [re.escape(text) for text in texts]
+
+    if None not in literals:
+        values = None
+        if not placeholders:
+            values = literals
+        elif len(placeholders) == 1:
+            expression = placeholders[0][1]
+            if expression == _default_placeholder_expression and not literals[0] and not literals[1]:
+                return 'any', None
+            values = [literals[0] + value + literals[1] for value in get_literal_values(expression, complete=True)]
+        # a value containing a newline could be matched differently at the end of the string ("$")
+        if values and not any('\n' in value for value in values):
+            return 'values', frozenset(values)
+
+    if not all(_is_context_free(text) for text in texts) or \
+            not all(_is_context_free(expression) for __, expression in placeholders):
+        return 'unknown', None
+
+    source = texts[0]
+    for (__, expression), text in zip(placeholders, texts[1:]):
+        source += '(?:{0}){1}'.format(expression, text)
+    try:
+        return 'regex', re.compile(source)
+    except re.error:
+        return 'unknown', None
+
+
+def describe_segments(pattern, separator='/', strict=False):
+    """
+    Returns the description of each segment of *pattern* (see describe_segment),
+    or None if the pattern is not segment aligned (see is_segment_aligned).
+    """
+    if not is_segment_aligned(pattern, separator, strict):
+        return None
+    return [describe_segment(segment, strict) for segment in split_segments(pattern, separator)]
+
+
+def _segment_covers(first, second):
+    kind, value = first
+    other_kind, other_value = second
+    if kind == 'any':
+        return True
+    if kind == 'values':
+        return other_kind == 'values' and other_value <= value
+    if kind == 'regex':
+        if other_kind == 'values':
+            return all(value.fullmatch(other) for other in other_value)
+        return other_kind == 'regex' and other_value.pattern == value.pattern
+    return False
+
+
+def _segments_are_disjoint(first, second, last):
+    if first[0] == 'regex' and second[0] == 'values':
+        first, second = second, first
+    kind, value = first
+    other_kind, other_value = second
+    if kind == 'values' and other_kind == 'values':
+        return not value & other_value
+    if kind == 'values' and other_kind == 'regex':
+        # at the end of the string, "$" also matches before a trailing newline
+        return not any(other_value.fullmatch(v) or (last and other_value.fullmatch(v + '\n')) for v in value)
+    return False
+
+
+def pattern_covers(first, second):
+    """
+    Returns True if every string matched by the second pattern is also matched by the first one.
+    Patterns are given as segment descriptions (see describe_segments), and must be anchored at start and end.
+    A False result means "not proven".
+    """
+    if first is None or second is None or len(first) != len(second):
+        return False
+    return all(_segment_covers(a, b) for a, b in zip(first, second))
+
+
+def patterns_are_disjoint(first, second):
+    """
+    Returns True if no string can be matched by both patterns.
+    Patterns are given as segment descriptions (see describe_segments), and must be anchored at start and end.
+    A False result means "not proven".
+    """
+    if first is None or second is None:
+        return False
+    if len(first) != len(second):
+        return True
+    last = len(first) - 1
+    return any(_segments_are_disjoint(a, b, i == last) for i, (a, b) in enumerate(zip(first, second)))
+
+
+_CATEGORY_EXPRESSIONS = {
+    'CATEGORY_DIGIT': r'\d', 'CATEGORY_NOT_DIGIT': r'\D',
+    'CATEGORY_SPACE': r'\s', 'CATEGORY_NOT_SPACE': r'\S',
+    'CATEGORY_WORD': r'\w', 'CATEGORY_NOT_WORD': r'\W',
+    'CATEGORY_LINEBREAK': r'\n', 'CATEGORY_NOT_LINEBREAK': r'[^\n]',
+}
+
+
+def can_match_character(expression, character):
+    """
+    Returns True if the regex *expression* may match the given character.
+    The regex is analysed statically. Unknown constructs are assumed to match (the result may be a false positive).
+
+    Args:
+        expression: a regex string
+        character: a single character
+
+    Returns:
+        False if the expression can never match the character
+    """
+    try:
+        parsed = _sre_parse.parse(expression)
+    except re.error:
+        return True
+    return _can_match_character(parsed, character)
+
+
+def _can_match_character(parsed, character):
+    code = ord(character)
+    for op, av in parsed:
+        name = getattr(op, 'name', str(op))
+        if name == 'LITERAL':
+            if av == code:
+                return True
+        elif name == 'NOT_LITERAL':
+            if av != code:
+                return True
+        elif name == 'ANY':
+            if character != '\n':
+                return True
+        elif name == 'IN':
+            if _in_matches_character(av, character):
+                return True
+        elif name == 'BRANCH':
+            if any(_can_match_character(item, character) for item in av[1]):
+                return True
+        elif name in ('SUBPATTERN', 'ATOMIC_GROUP'):
+            if _can_match_character(av[-1] if name == 'SUBPATTERN' else av, character):
+                return True
+        elif name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            if av[1] and _can_match_character(av[2], character):
+                return True
+        elif name == 'GROUPREF_EXISTS':
+            if any(item is not None and _can_match_character(item, character) for item in av[1:]):
+                return True
+        elif name in ('AT', 'ASSERT', 'ASSERT_NOT'):
+            continue
+        else:
+            return True
+    return False
+
+
+def _in_matches_character(items, character):
+    code = ord(character)
+    negate = False
+    found = False
+    for op, av in items:
+        name = getattr(op, 'name', str(op))
+        if name == 'NEGATE':
+            negate = True
+        elif name == 'LITERAL':
+            found = found or av == code
+        elif name == 'RANGE':
+            found = found or av[0] <= code <= av[1]
+        elif name == 'CATEGORY':
+            category = _CATEGORY_EXPRESSIONS.get(getattr(av, 'name', str(av)))
+            found = found or category is None or bool(re.match(category, character))
+        else:
+            return True
+    return found != negate
+
+
+def get_match_bounds(expression, character='/'):
+    """
+    Returns bounds of the strings matched by the regex *expression*:
+    the minimum and maximum number of *character* they contain, and their minimum and maximum length.
+    Maximum values are None if unbounded. The regex is analysed statically, and the bounds may be wider than exact.
+
+    Args:
+        expression: a regex string, or bytes
+        character: a single character, typically the separator
+
+    Returns:
+        tuple (min count, max count, min length, max length)
+    """
+    try:
+        parsed = _sre_parse.parse(expression)
+    except re.error:
+        return 0, None, 0, None
+    min_count, max_count = _count_character(parsed, ord(character))
+    try:
+        min_length, max_length = parsed.getwidth()
+    except (re.error, KeyError, TypeError):
+        min_length, max_length = 0, None
+    if max_length is not None and max_length >= _MAXREPEAT:
+        max_length = None
+    return min_count, max_count, min_length, max_length
+
+
+def get_pattern_bounds(pattern, strict=False, character='/'):
+    """
+    Returns the bounds of the strings matched by *pattern*, like get_match_bounds on its regex.
+
+    The bounds of the literal texts and of each placeholder expression are added up,
+    and the bounds of expressions are memoized, as patterns share most of their placeholders.
+    If a literal text is a regex (not strict, with special characters), the whole regex is analysed.
+
+    Args:
+        pattern: a pattern string
+        strict: if literal texts are escaped (see construct_regular_expression)
+        character: a single character, typically the separator
+
+    Returns:
+        tuple (min count, max count, min length, max length)
+    """
+    literals = [_literal_value(text, strict) for text in get_literals(pattern)]
+    if None in literals:
+        return get_match_bounds(construct_regular_expression(pattern, strict=strict).pattern, character)
+
+    text = ''.join(literals)
+    min_count = max_count = text.count(character)
+    min_length = max_length = len(text)
+    for __, expression in get_placeholders(pattern):
+        low_count, high_count, low_length, high_length = _get_expression_bounds(expression, character)
+        min_count += low_count
+        min_length += low_length
+        max_count = None if max_count is None or high_count is None else max_count + high_count
+        max_length = None if max_length is None or high_length is None else max_length + high_length
+    return min_count, max_count, min_length, max_length
+
+
+@functools.lru_cache(maxsize=4096)
+def _get_expression_bounds(expression, character):
+    return get_match_bounds('(?:{0})'.format(expression), character)
+
+
+def _count_character(parsed, code):
+    """
+    Returns the (minimum, maximum) number of occurrences of the character *code* in strings matched by *parsed*.
+    """
+    low, high = 0, 0
+    for op, av in parsed:
+        name = getattr(op, 'name', str(op))
+        if name == 'LITERAL':
+            item_low = item_high = int(av == code)
+        elif name == 'NOT_LITERAL':
+            item_low, item_high = 0, int(av != code)
+        elif name == 'ANY':
+            item_low, item_high = 0, int(code != 10)
+        elif name == 'IN':
+            item_low, item_high = 0, int(_in_matches_character(av, chr(code)))
+        elif name == 'BRANCH':
+            bounds = [_count_character(item, code) for item in av[1]]
+            item_low = min(bound[0] for bound in bounds)
+            item_high = None if any(bound[1] is None for bound in bounds) else max(bound[1] for bound in bounds)
+        elif name in ('SUBPATTERN', 'ATOMIC_GROUP'):
+            item_low, item_high = _count_character(av[-1] if name == 'SUBPATTERN' else av, code)
+        elif name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            minimum, maximum, item = av
+            sub_low, sub_high = _count_character(item, code)
+            item_low = minimum * sub_low
+            if sub_high == 0:
+                item_high = 0
+            elif sub_high is None or maximum >= _MAXREPEAT:
+                item_high = None
+            else:
+                item_high = maximum * sub_high
+        elif name in ('AT', 'ASSERT', 'ASSERT_NOT'):
+            continue
+        else:
+            item_low, item_high = 0, None
+        low += item_low
+        high = None if high is None or item_high is None else high + item_high
+    return low, high
+
+
+def get_backtracking_degree(expression, character='/'):
+    """
+    Estimates how much the regex *expression* may backtrack on a string that does not match.
+
+    The degree is the number of unbounded repeats (eg. "*", "+") that follow each other,
+    and can match the same characters, so that the regex engine tries every way to share a string between them:
+    the cost grows like the string length to the power of the degree.
+    - 0: no unbounded repeat.
+    - 1: linear.
+    - 2 or more: polynomial, eg. "{name:(.*)}_{ext:(.*)}" has degree 2.
+    - None: exponential, with nested unbounded repeats, eg. "{name:((a+)+)}".
+
+    The regex is analysed statically, the result is an estimation.
+    Possessive repeats and atomic groups do not backtrack, and are ignored.
+
+    Args:
+        expression: a regex string
+        character: the separator. Repeats matching it may backtrack over whole paths, not only segments.
+
+    Returns:
+        tuple (degree, crosses), crosses being True if the repeats of the highest degree can match *character*.
+    """
+    try:
+        parsed = _sre_parse.parse(expression)
+    except re.error:
+        return 0, False
+    if _has_nested_repeats(parsed, False):
+        return None, True
+
+    degree, crosses = 0, False
+    chain: list = []  # unbounded repeats following each other, and matching common characters
+    for op, av in _flatten_sequence(parsed):
+        name = getattr(op, 'name', str(op))
+        if name == 'AT':
+            continue
+        if name in ('MAX_REPEAT', 'MIN_REPEAT') and av[1] >= _MAXREPEAT:
+            probes = _get_probes(av[2])
+            if chain and not probes & chain[-1]:
+                chain = []
+            chain.append(probes)
+            if len(chain) > degree or (len(chain) == degree and not crosses):
+                degree = len(chain)
+                crosses = any(character in item for item in chain)
+        elif chain:
+            # the text between repeats must be matchable by the previous repeat, to keep the chain
+            if name in ('POSSESSIVE_REPEAT', 'ATOMIC_GROUP') or not _get_probes([(op, av)]) & chain[-1]:
+                chain = []
+    return degree, crosses
+
+
+# characters used to compare what parts of a regex can match (see get_backtracking_degree)
+_PROBES = frozenset(chr(code) for code in range(32, 127))
+
+
+def _get_probes(parsed):
+    """
+    Returns the set of probe characters that a regex part may match.
+    """
+    return frozenset(char for char in _PROBES if _can_match_character(parsed, char))
+
+
+def _flatten_sequence(parsed):
+    """
+    Yields the (op, argument) items of a parsed regex, in order, entering groups.
+    """
+    for op, av in parsed:
+        if getattr(op, 'name', str(op)) == 'SUBPATTERN':
+            yield from _flatten_sequence(av[-1])
+        else:
+            yield op, av
+
+
+def _has_nested_repeats(parsed, inside):
+    """
+    Returns True if the parsed regex has an unbounded repeat inside another unbounded repeat.
+    """
+    for op, av in parsed:
+        name = getattr(op, 'name', str(op))
+        if name in ('MAX_REPEAT', 'MIN_REPEAT'):
+            unbounded = av[1] >= _MAXREPEAT
+            if unbounded and inside:
+                return True
+            if _has_nested_repeats(av[2], inside or unbounded):
+                return True
+        elif name == 'SUBPATTERN':
+            if _has_nested_repeats(av[-1], inside):
+                return True
+        elif name == 'BRANCH':
+            if any(_has_nested_repeats(item, inside) for item in av[1]):
+                return True
+    return False
+
+
 def get_keys(pattern):
     return _PLAIN_PLACEHOLDER_REGEX.findall(construct_format_specification(pattern))
 
 
+def split_format_specification(specification):
+    """
+    Splits a format specification (see construct_format_specification) in literal fragments and keys.
+
+    There is always one more fragment than keys, so that the formatted string is:
+    fragments[0] + value of keys[0] + fragments[1] + ... + value of keys[-1] + fragments[-1]
+
+    Duplicate placeholders appear as often as they are used.
+
+    Args:
+        specification: a format string, eg. "{project}/s/{sequence}"
+
+    Returns:
+        tuple of fragments list and keys list, eg. (["", "/s/", ""], ["project", "sequence"])
+    """
+    fragments = []
+    keys = []
+    literal = []
+    for text, key, __, __ in _string.Formatter().parse(specification):
+        literal.append(text)
+        if key is not None:
+            fragments.append(''.join(literal))
+            literal = []
+            keys.append(key)
+    fragments.append(''.join(literal))
+    return fragments, keys
+
+
+@functools.lru_cache(maxsize=4096)
+def construct_formatter(specification, keys=None, as_bytes=False):
+    """
+    Compiles a format specification (see construct_format_specification) into a fast formatting function.
+
+    The specification is parsed once, in literal fragments and key slots.
+    The generated function joins the fragments with the values, without parsing the specification again.
+    Duplicate placeholders simply use the same value several times.
+
+    By default, the function takes a data dictionary, like specification.format(**data).
+    If *keys* is given, the function takes a sequence of values in the order of *keys*.
+
+    If *as_bytes* is True, the function takes bytes values and returns bytes.
+    The literal fragments are encoded like file system paths (os.fsencode).
+
+    Args:
+        specification: a format string, eg. "{project}/s/{sequence}"
+        keys: optional tuple of keys, defining the order of the values sequence
+        as_bytes: if the function formats bytes values to bytes
+
+    Returns:
+        the formatting function
+    """
+    fragments, slots = split_format_specification(specification)
+    if as_bytes:
+        fragments = [os.fsencode(fragment) for fragment in fragments]
+
+    items = []
+    for fragment, key in zip(fragments, slots):
+        if fragment:
+            items.append(repr(fragment))
+        if keys is None:
+            items.append('data[{0!r}]'.format(key))
+        else:
+            items.append('data[{0}]'.format(keys.index(key)))
+    if fragments[-1] or not items:
+        items.append(repr(fragments[-1]))
+
+    # other values are converted as str.format does
+    if keys is None:
+        values = 'data'
+    else:
+        values = 'dict(zip(keys, data))'
+    if as_bytes:
+        join = 'b"".join'
+        fallback = 'os.fsencode(specification.format(**{{k: os.fsdecode(v) if isinstance(v, bytes) else v ' \
+                   'for k, v in {0}.items()}}))'.format(values)
+    else:
+        join = '"".join'
+        fallback = 'specification.format(**{0})'.format(values)
+
+    source = (
+        'def formatter(data):\n'
+        '    try:\n'
+        '        return {0}(({1},))\n'
+        '    except TypeError:\n'
+        '        return {2}\n'
+    ).format(join, ', '.join(items), fallback)
+
+    namespace = {'specification': specification, 'keys': keys, 'os': os}
+    exec(source, namespace)
+    return namespace['formatter']
+
+
+def construct_split_matcher(pattern, intern=None, strict=False, separator='/', aligned=None):
+    """
+    Compiles a segment aligned *pattern* into a fast matching function, that checks the segments of a string,
+    split at separators, instead of running the regex.
+
+    Each segment is checked with:
+    - literal equality, for literal segments.
+    - frozenset membership, for "enum style" placeholders with literal values (and literal text around).
+    - no check, for default placeholders.
+    - a regex fullmatch of the placeholder value, for other expressions.
+
+    The generated function takes the list of segments, eg. string.split("/"), and returns the same data dictionary
+    as matching the regex of the pattern, anchored at start and end, or None if there is no match.
+    A string ending with a newline must be matched by the regex, as "$" also matches before it.
+
+    Only patterns with unique keys, and segments holding at most one placeholder, with literal text
+    and context free expressions, can be matched this way. Else None is returned, and the regex must be used.
+
+    Args:
+        pattern: a pattern string
+        intern: optional callable returning a shared instance for a key or value (see make_interner)
+        strict: if literal texts are escaped (see construct_regular_expression)
+        separator: the segment separator
+        aligned: if the pattern is known to be segment aligned or not (see is_segment_aligned). None checks it.
+
+    Returns:
+        the matching function, or None
+
+    Example
+
+        >>> matcher = construct_split_matcher("{project}/{type:(a|s)}/sq{sequence:(\\d+)}")
+        >>> matcher("hamlet/s/sq010".split("/"))
+        {'project': 'hamlet', 'type': 's', 'sequence': '010'}
+        >>> print(matcher("hamlet/x/sq010".split("/")))
+        None
+    """
+    segments = describe_split_segments(pattern, strict, separator, aligned)
+    if segments is None:
+        return None
+
+    namespace = {'intern': intern}
+    conditions = []
+    items = []
+
+    for i, (test, key, head, tail) in enumerate(segments):
+        part = 'p{0}'.format(i)
+        condition = _split_condition(part, test, head, tail, 'test{0}'.format(i), namespace)
+        if condition:
+            conditions.append('not ({0})'.format(condition))
+        if key is not None:
+            items.append(_split_item(part, key, head, tail, 'key{0}'.format(i), intern, namespace))
+
+    source = (
+        'def matcher(parts):\n'
+        '    if len(parts) != {0}:\n'
+        '        return None\n'
+        '    {1}, = parts\n'
+        '    if {2}:\n'
+        '        return None\n'
+        '    return {{{3}}}\n'
+    ).format(len(segments), ', '.join('p{0}'.format(i) for i in range(len(segments))),
+             ' or '.join(conditions) or 'False', ', '.join(items))
+
+    exec(source, namespace)
+    return namespace['matcher']
+
+
+def construct_multi_matcher(patterns, intern=None, strict=False, separator='/', aligned=None):
+    """
+    Compiles several segment aligned patterns into one function, that returns the data of every matching pattern,
+    like a set of regexes matched in a single pass.
+
+    The patterns are arranged in a tree, segment by segment, so that a segment check shared by several patterns
+    is only run once, and patterns failing at the same segment are all rejected at once.
+    Data is only extracted for the matching patterns, and once for patterns with the same placeholder layout,
+    which then share the same data dictionary.
+
+    The generated function takes the list of segments, eg. string.split("/"), like construct_split_matcher,
+    and returns a {label: data} dictionary, in the order of *patterns*.
+    Patterns without placeholders never match, as their data is empty (see Resolver.resolve_all).
+
+    Args:
+        patterns: {label: pattern} dictionary
+        intern: optional callable returning a shared instance for a key or value (see make_interner)
+        strict: if literal texts are escaped (see construct_regular_expression)
+        separator: the segment separator
+        aligned: optional {label: bool} dictionary, if the patterns are known to be segment aligned
+
+    Returns:
+        tuple (function, list of the labels it handles). Other patterns cannot be matched by segments.
+
+    Example
+
+        >>> matcher, labels = construct_multi_matcher({"maya_file": "{prod}/{shot}/{ext:(ma|mb)}",
+        ...                                            "any_file": "{prod}/{shot}/{ext}",
+        ...                                            "sequence": "{prod}/{seq:(sq\\d+)}"})
+        >>> found = matcher("hamlet/sh010/ma".split("/"))
+        >>> found
+        {'maya_file': {'prod': 'hamlet', 'shot': 'sh010', 'ext': 'ma'}, 'any_file': {'prod': 'hamlet', 'shot': 'sh010', 'ext': 'ma'}}
+        >>> found['maya_file'] is found['any_file']
+        True
+    """
+    namespace: dict = {'intern': intern}
+    names: dict = {}  # name of each distinct segment check
+    entries = []
+    labels = []
+
+    for label, pattern in patterns.items():
+        segments = describe_split_segments(pattern, strict, separator, None if aligned is None else aligned[label])
+        if segments is None:
+            continue
+        labels.append(label)
+        if any(key is not None for __, key, __, __ in segments):
+            entries.append((len(entries), label, segments))
+
+    def build(group, position, indent):
+        lines = []
+        count = len(group[0][2])
+        if position == count:
+            lines.append('{0}found.update({1!r})'.format(indent, tuple(index for index, __, __ in group)))
+            return lines
+        branches: dict = {}
+        for entry in group:
+            test, __, head, tail = entry[2][position]
+            branches.setdefault((test, head, tail), []).append(entry)
+        for (test, head, tail), branch in branches.items():
+            name = names.setdefault((test, head, tail), 'test{0}'.format(len(names)))
+            condition = _split_condition('p{0}'.format(position), test, head, tail, name, namespace)
+            if condition:
+                lines.append('{0}if {1}:'.format(indent, condition))
+                lines.extend(build(branch, position + 1, indent + '    '))
+            else:
+                lines.extend(build(branch, position + 1, indent))
+        return lines
+
+    lines = ['def matcher(parts):',
+             '    found = set()',
+             '    count = len(parts)']
+    by_count: dict = {}
+    for entry in entries:
+        by_count.setdefault(len(entry[2]), []).append(entry)
+    for count, group in by_count.items():
+        lines.append('    if count == {0}:'.format(count))
+        lines.append('        {0}, = parts'.format(', '.join('p{0}'.format(i) for i in range(count))))
+        lines.extend(build(group, 0, '        '))
+
+    lines.append('    if not found:')
+    lines.append('        return {}')
+    lines.append('    result = {}')
+
+    layouts: dict = {}  # data variable and source, per placeholder layout
+    for index, label, segments in entries:
+        layout = tuple((i, key, len(head), len(tail)) for i, (__, key, head, tail) in enumerate(segments)
+                       if key is not None)
+        if layout not in layouts:
+            items = [_split_item('p{0}'.format(i), key, head, tail, 'key{0}_{1}'.format(index, i), intern, namespace)
+                     for i, (__, key, head, tail) in enumerate(segments) if key is not None]
+            layouts[layout] = ('data{0}'.format(index), '{{{0}}}'.format(', '.join(items)))
+            lines.append('    data{0} = None'.format(index))
+        data, source = layouts[layout]
+        namespace['label{0}'.format(index)] = label
+        lines.append('    if {0} in found:'.format(index))
+        lines.append('        if {0} is None:'.format(data))
+        lines.append('            {0} = {1}'.format(data, source))
+        lines.append('        result[label{0}] = {1}'.format(index, data))
+    lines.append('    return result')
+
+    exec('\n'.join(lines) + '\n', namespace)
+    return namespace['matcher'], labels
+
+
+def describe_split_segments(pattern, strict=False, separator='/', aligned=None):
+    """
+    Describes the segments of *pattern* for split matching (see construct_split_matcher).
+
+    Each segment is a (test, key, head, tail) tuple:
+    - test: how the segment is checked, ("equal", text), ("values", frozenset of strings), ("any", None)
+      or ("regex", expression of the placeholder value).
+    - key: the key of the placeholder of the segment, or None for a literal segment.
+    - head, tail: the literal texts before and after the placeholder.
+
+    Args:
+        pattern: a pattern string
+        strict: if literal texts are escaped (see construct_regular_expression)
+        separator: the segment separator
+        aligned: if the pattern is known to be segment aligned or not (see is_segment_aligned). None checks it.
+
+    Returns:
+        list of segment descriptions, or None if the pattern cannot be matched by segments.
+    """
+    if aligned is None:
+        aligned = is_segment_aligned(pattern, separator, strict)
+    keys = get_keys(pattern)
+    if not aligned or len(keys) != len(set(keys)):
+        return None
+
+    segments = []
+    for segment in split_segments(pattern, separator):
+        placeholders = get_placeholders(segment)
+        literals = [_literal_value(text, strict) for text in get_literals(segment)]
+        if None in literals or len(placeholders) > 1:
+            return None
+
+        if not placeholders:
+            segments.append((('equal', literals[0]), None, '', ''))
+            continue
+
+        key, expression = placeholders[0]
+        head, tail = literals
+        values = get_literal_values(expression, complete=True)
+        if values:
+            test = ('values', frozenset(head + v + tail for v in values))
+        elif expression == _default_placeholder_expression:
+            test = ('any', None)
+        else:
+            if not _is_context_free(expression):
+                return None
+            try:
+                re.compile('(?:{0})'.format(expression))
+            except re.error:
+                return None
+            test = ('regex', expression)
+        segments.append((test, key, head, tail))
+
+    return segments
+
+
+def _split_value(part, head, tail):
+    """
+    Returns the source of the placeholder value, in the segment variable *part*.
+    """
+    if tail:
+        return '{0}[{1}:len({0}) - {2}]'.format(part, len(head), len(tail))
+    if head:
+        return '{0}[{1}:]'.format(part, len(head))
+    return part
+
+
+def _split_condition(part, test, head, tail, name, namespace):
+    """
+    Returns the source of the condition checking the segment variable *part*, or an empty string if any value matches.
+    Values and regexes are set in the namespace, as *name*.
+    """
+    kind, value = test
+    if kind == 'equal':
+        return '{0} == {1!r}'.format(part, value)
+    if kind == 'values':
+        namespace[name] = value
+        return '{0} in {1}'.format(part, name)
+
+    conditions = []
+    if head or tail:
+        conditions.append('len({0}) >= {1}'.format(part, len(head) + len(tail)))
+        if head:
+            conditions.append('{0}.startswith({1!r})'.format(part, head))
+        if tail:
+            conditions.append('{0}.endswith({1!r})'.format(part, tail))
+    if kind == 'regex':
+        namespace[name] = re.compile('(?:{0})'.format(value)).fullmatch
+        conditions.append('{0}({1}) is not None'.format(name, _split_value(part, head, tail)))
+    return ' and '.join(conditions)
+
+
+def _split_item(part, key, head, tail, name, intern, namespace):
+    """
+    Returns the source of the "key: value" item of the data dictionary, for the segment variable *part*.
+    """
+    value = _split_value(part, head, tail)
+    if intern is None:
+        return '{0!r}: {1}'.format(key, value)
+    namespace[name] = intern(key)
+    return '{0}: intern({1})'.format(name, value)
+
+
+def _is_context_free(expression):
+    """
+    Returns True if *expression* matches a value independently of the surrounding string.
+    This is not the case with anchors, lookarounds, word boundaries and backreferences.
+    """
+    in_class = False
+    escaped = False
+    for i, char in enumerate(expression):
+        if escaped:
+            if char in 'bBAZ' or char.isdigit():
+                return False
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif char in '^$':
+            return False
+        elif char == '(' and expression[i + 1:i + 2] == '?':
+            if expression[i + 2:i + 3] in ('=', '!', '<') or expression[i + 2:i + 4] == 'P=':
+                return False
+    return True
+
+
+def is_context_free(pattern, strict=False):
+    """
+    Returns True if each part of *pattern* matches independently of the surrounding string,
+    so that parts of the pattern, eg. its first segments, can be matched alone.
+    This is not the case with anchors, lookarounds, word boundaries and backreferences.
+
+    Args:
+        pattern: a pattern string
+        strict: if literal texts are escaped (see construct_regular_expression)
+
+    Returns:
+        True if the pattern is context free
+    """
+    if not all(_is_context_free(expression) for __, expression in get_placeholders(pattern)):
+        return False
+    return strict or all(_is_context_free(text) for text in get_literals(pattern))
+
+
+def construct_value_validators(pattern, strict=False):
+    """
+    Returns a regex per key, to validate placeholder values individually, instead of validating a formatted string.
+
+    A formatted string matches the patterns regex if each value fully matches its validator.
+    This is only guaranteed if keys are unique, if expressions do not depend on their context,
+    and if the literal text of the pattern matches itself.
+    Else None is returned, and formatted strings must be checked as a whole.
+
+    Args:
+        pattern: a pattern string
+        strict: if literal texts are escaped (see construct_regular_expression), and thus match themselves.
+
+    Returns:
+        dictionary of compiled regexes, with keys as dict keys, or None.
+    """
+    placeholders = get_placeholders(pattern)
+    keys = [key for key, __ in placeholders]
+    if len(keys) != len(set(keys)):
+        return None
+
+    for literal in ([] if strict else get_literals(pattern)):
+        try:
+            if not re.fullmatch(literal, literal):
+                return None
+        except re.error:
+            return None
+
+    validators = {}
+    for key, expression in placeholders:
+        if not _is_context_free(expression):
+            return None
+        try:
+            validators[key] = re.compile('(?:{0})'.format(expression))
+        except re.error:
+            return None
+    return validators
+
+
+def construct_prefix_expression(expression):
+    """
+    Returns a regex source, that fully matches the beginnings of the strings fully matched by the regex *expression*.
+    For example "v\\d\\d" gives a regex fully matching "", "v", "v0" and "v01", to check text while it is typed.
+
+    Returns None if the expression uses constructs that are not analysed (anchors, lookarounds, backreferences, flags).
+
+    >>> prefix = re.compile(construct_prefix_expression(r'(sq\\d\\d\\d|\\*)'))
+    >>> [bool(prefix.fullmatch(text)) for text in ['', 's', 'sq01', 'sq0123', '*', 'sh']]
+    [True, True, True, False, True, False]
+
+    Args:
+        expression: a regex string
+
+    Returns:
+        regex string, or None
+    """
+    try:
+        return _prefix_source(list(_sre_parse.parse(expression)))
+    except (re.error, ValueError):
+        return None
+
+
+def _prefix_source(items):
+    # the beginnings of XY are the beginnings of X, and X followed by the beginnings of Y
+    if not items:
+        return ''
+    op, av = items[0]
+    name = getattr(op, 'name', str(op))
+    if name in ('LITERAL', 'NOT_LITERAL', 'ANY', 'IN'):
+        first = '(?:{0})?'.format(_item_source(op, av))
+    elif name == 'BRANCH':
+        first = '(?:{0})'.format('|'.join(_prefix_source(list(item)) for item in av[1]))
+    elif name == 'SUBPATTERN':
+        if av[1] or av[2]:
+            raise ValueError(name)
+        first = '(?:{0})'.format(_prefix_source(list(av[-1])))
+    elif name in ('MAX_REPEAT', 'MIN_REPEAT'):
+        low, high, item = av
+        if high == 0:
+            first = ''
+        else:
+            first = '(?:{0}){{0,{1}}}(?:{2})'.format(_sequence_source(list(item)), '' if high == _MAXREPEAT else high - 1,
+                                                    _prefix_source(list(item)))
+    else:
+        raise ValueError(name)
+    if len(items) == 1:
+        return first
+    return '(?:{0}|{1}{2})'.format(first, _item_source(op, av), _prefix_source(items[1:]))
+
+
+def _sequence_source(items):
+    return ''.join(_item_source(op, av) for op, av in items)
+
+
+def _item_source(op, av):
+    # regex source of a parsed item, without capturing groups
+    name = getattr(op, 'name', str(op))
+    if name == 'LITERAL':
+        return re.escape(chr(av))
+    if name == 'NOT_LITERAL':
+        return '[^{0}]'.format(re.escape(chr(av)))
+    if name == 'ANY':
+        return '.'
+    if name == 'IN':
+        parts = []
+        for item_op, item_av in av:
+            item_name = getattr(item_op, 'name', str(item_op))
+            if item_name == 'NEGATE':
+                parts.insert(0, '^')
+            elif item_name == 'LITERAL':
+                parts.append(re.escape(chr(item_av)))
+            elif item_name == 'RANGE':
+                parts.append('{0}-{1}'.format(re.escape(chr(item_av[0])), re.escape(chr(item_av[1]))))
+            elif item_name == 'CATEGORY' and len(_CATEGORY_EXPRESSIONS.get(getattr(item_av, 'name', ''), '')) == 2:
+                parts.append(_CATEGORY_EXPRESSIONS[item_av.name])
+            else:
+                raise ValueError(item_name)
+        return '[{0}]'.format(''.join(parts))
+    if name == 'BRANCH':
+        return '(?:{0})'.format('|'.join(_sequence_source(list(item)) for item in av[1]))
+    if name == 'SUBPATTERN':
+        if av[1] or av[2]:
+            raise ValueError(name)
+        return '(?:{0})'.format(_sequence_source(list(av[-1])))
+    if name in ('MAX_REPEAT', 'MIN_REPEAT'):
+        low, high, item = av
+        return '(?:{0}){{{1},{2}}}'.format(_sequence_source(list(item)), low, '' if high == _MAXREPEAT else high)
+    raise ValueError(name)
+
+
+def _character_checker(expression):
+    # checks that the regex *expression* may match each character of a text (see can_match_character)
+    known = {}
+
+    def check(text):
+        for character in text:
+            found = known.get(character)
+            if found is None:
+                found = known[character] = can_match_character(expression, character)
+            if not found:
+                return False
+        return True
+    return check
+
+
+def describe_completion_elements(pattern, strict=False, separator='/'):
+    """
+    Describes the literal texts and placeholders of *pattern*, in order, to complete typed text (see construct_completer).
+
+    Each element is a (key, values, full, prefix, crosses) tuple:
+    - key: the key of the placeholder, or None for literal text.
+    - values: the literal strings matched by the element: the literal text, or the "enum style" values of the placeholder.
+      Literal text is split at separators, that are elements of their own.
+    - full: callable returning True if a text fully matches the element, or None if the element only matches its values.
+    - prefix: callable returning True if a text can be the beginning of a match (see construct_prefix_expression).
+      If the expression is not analysed, it returns True if the element may match each character of the text.
+    - crosses: if the element may match the separator.
+
+    Args:
+        pattern: a pattern string
+        strict: if literal texts are escaped (see construct_regular_expression)
+        separator: the segment separator
+
+    Returns:
+        list of element descriptions
+    """
+    elements = []
+    texts = get_literals(pattern)
+    parts = [(None, texts[0])]
+    for (key, expression), text in zip(get_placeholders(pattern), texts[1:]):
+        parts.extend([(key, expression), (None, text)])
+
+    for key, expression in parts:
+        if key is None:
+            value = _literal_value(expression, strict)
+            if value is not None:
+                # separators are elements of their own, so that literal text is completed segment by segment
+                elements.extend((None, (text,), None, None, text == separator)
+                                for text in re.split('({0})'.format(re.escape(separator)), value) if text)
+                continue
+            values = ()
+        else:
+            values = tuple(get_literal_values(expression))
+            if get_literal_values(expression, complete=True):
+                elements.append((key, values, None, None, any(separator in value for value in values)))
+                continue
+
+        prefix = construct_prefix_expression(expression)
+        check = _character_checker(expression)
+        full = re.compile('(?:{0})'.format(expression)).fullmatch if _is_context_free(expression) else check
+        elements.append((key, values, full, check if prefix is None else re.compile(prefix).fullmatch,
+                         can_match_character(expression, separator)))
+    return elements
+
+
+def _find_cursor(elements, text, separator):
+    """
+    Returns the (element index, start) of the element that *text* ends in, or None if *text* cannot be
+    the beginning of a match of the elements (see describe_completion_elements).
+
+    When the end of the text can be in several elements, the element starting last is used,
+    but the text stays in a placeholder or segment until something is typed after it
+    (eg. "sh010" is in "{shot}" of "{shot}_{version}", and "sh010_" is in "{version}").
+    """
+    length = len(text)
+    starts = {0}
+    found = None
+    for index, (key, values, full, prefix, crosses) in enumerate(elements):
+        ends = set()
+        for start in sorted(starts):
+            rest = text[start:]
+            if full is None:
+                possible = any(value.startswith(rest) for value in values)
+                ends.update(start + len(value) for value in values if text.startswith(value, start))
+            else:
+                possible = bool(prefix(rest))
+                stop = -1 if crosses else text.find(separator, start)
+                stop = length if stop < 0 else stop
+                ends.update(end for end in range(start, stop + 1) if full(text[start:end]))
+            if possible and (found is None or start > found[1]) and \
+                    (start < length or index == 0 or (elements[index - 1][0] is None and values != (separator,))):
+                found = (index, start)
+        starts = ends
+        if not starts:
+            break
+    return found
+
+
+def _get_completion(elements, text, separator):
+    # (key, typed, values) of the element that *text* ends in, or None (see construct_completer)
+    cursor = _find_cursor(elements, text, separator)
+    if cursor is None:
+        return None
+    key, values = elements[cursor[0]][:2]
+    typed = text[cursor[1]:]
+    return key, typed, [value for value in values if value.startswith(typed)]
+
+
+def construct_completer(patterns, strict=False, separator='/', aligned=None):
+    """
+    Returns a function completing typed text with several patterns, eg. for typeahead while a path is typed.
+
+    The function takes the typed text, and optionally a set of labels to complete, and returns a
+    {label: (key, typed, values)} dictionary, in the order of *patterns*, for each pattern that can still match
+    once the text is continued:
+    - key: the placeholder the end of the text is in, or None if it is in literal text of the pattern.
+    - typed: the text typed in this placeholder (or literal text) so far.
+    - values: the "enum style" values of the placeholder that start with the typed text, or the literal text.
+
+    Segment aligned patterns are arranged in a tree of segments, like in construct_multi_matcher, so that the typed
+    segments are checked once per distinct segment. The elements of each segment are described once
+    (see describe_completion_elements). Other patterns are completed element by element, over the whole text.
+    Patterns completed from the same segment share the same result tuple.
+    Duplicate placeholders are not checked against each other.
+
+    Args:
+        patterns: {label: pattern} dictionary
+        strict: if literal texts are escaped (see construct_regular_expression)
+        separator: the segment separator
+        aligned: optional {label: bool} dictionary, if the patterns are known to be segment aligned
+
+    Returns:
+        function
+
+    Example
+
+        >>> complete = construct_completer({"shot": "{prod}/s/{seq:(sq\\d+)}/{shot}/{task:(anim|layout|lighting)}",
+        ...                                 "sequence": "{prod}/s/{seq:(sq\\d+)}"})
+        >>> complete("hamlet/s/sq01")
+        {'shot': ('seq', 'sq01', []), 'sequence': ('seq', 'sq01', [])}
+        >>> complete("hamlet/s/sq010/sh010/la")
+        {'shot': ('task', 'la', ['layout'])}
+    """
+    labels = list(patterns)
+    tree: dict = {}  # {segment: [label indexes, subtree]}
+    unaligned = []  # (label index, elements)
+    for index, (label, pattern) in enumerate(patterns.items()):
+        if not (is_segment_aligned(pattern, separator, strict) if aligned is None else aligned[label]):
+            unaligned.append((index, describe_completion_elements(pattern, strict, separator)))
+            continue
+        node = tree
+        for segment in split_segments(pattern, separator):
+            entry = node.setdefault(segment, [[], {}])
+            entry[0].append(index)
+            node = entry[1]
+
+    described: dict = {}  # per distinct segment
+
+    def compile_node(node):
+        # per node: typed segment values to subtrees, completions per typed text, and other segments
+        exact: dict = {}
+        prefixes: dict = {}
+        others = []
+        for segment, (indexes, subtree) in node.items():
+            if segment not in described:
+                kind, values = describe_segment(segment, strict)
+                # an empty segment expects the separator, like in the other patterns
+                elements = describe_completion_elements(segment, strict, separator) or \
+                    [(None, (separator,), None, None, True)]
+                full = None
+                if kind != 'values':
+                    full = construct_regular_expression(segment, anchor_start=False, anchor_end=False,
+                                                        strict=strict).fullmatch
+                completions = None
+                if len(elements) == 1 and elements[0][2] is None:
+                    key, values_ = elements[0][:2]
+                    completions = {}
+                    for value in values_:
+                        for end in range(len(value) + 1):
+                            typed = value[:end]
+                            if typed not in completions:
+                                completions[typed] = (key, typed, [v for v in values_ if v.startswith(typed)])
+                described[segment] = (values if kind == 'values' else None, full, elements, completions)
+            values, full, elements, completions = described[segment]
+            child = compile_node(subtree)
+            if values is not None:
+                for value in values:
+                    exact.setdefault(value, []).append(child)
+            if completions is not None:
+                for typed, completion in completions.items():
+                    prefixes.setdefault(typed, []).append((indexes, completion))
+            if values is None or completions is None:
+                others.append((segment, full, elements, completions is None, indexes, child))
+        return exact, prefixes, others
+
+    root = compile_node(tree)
+
+    def complete(text, wanted=None):
+        parts = text.split(separator)
+        last = parts.pop()
+        nodes = [root]
+        for part in parts:
+            found_nodes = []
+            for exact, __, others in nodes:
+                found_nodes.extend(exact.get(part, ()))
+                found_nodes.extend(child for __, full, __, __, __, child in others
+                                   if full is not None and full(part) is not None)
+            nodes = found_nodes
+            if not nodes:
+                break
+
+        found = []  # (label indexes, completion)
+        completions: dict = {}  # per last segment pattern
+        for __, prefixes, others in nodes:
+            found.extend(prefixes.get(last, ()))
+            for segment, __, elements, scanned, indexes, __ in others:
+                if scanned:
+                    completion = completions.get(segment, False)
+                    if completion is False:
+                        completion = completions[segment] = _get_completion(elements, last, separator)
+                    if completion is not None:
+                        found.append((indexes, completion))
+        for index, elements in unaligned:
+            if wanted is None or labels[index] in wanted:
+                completion = _get_completion(elements, text, separator)
+                if completion is not None:
+                    found.append(((index,), completion))
+
+        if len(found) == 1:
+            result = dict.fromkeys([labels[index] for index in found[0][0]], found[0][1])
+        else:
+            by_index: dict = {}
+            for indexes, completion in found:
+                by_index.update(dict.fromkeys(indexes, completion))
+            result = {labels[index]: by_index[index] for index in sorted(by_index)}
+        if wanted is not None:
+            return {label: completion for label, completion in result.items() if label in wanted}
+        return result
+
+    return complete
+
+
 if __name__ == "__main__":
 
     pat = '{project}/{type:s}/{sequence}/{shot}/{task}/{version}/{state}/{ext:ma|mb}'
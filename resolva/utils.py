@@ -3,8 +3,10 @@ This file is part of resolva.
 (C) copyright 2024 Michael Haussmann, spil@xeo.info
 resolva is free software and is distributed under the MIT License. See LICENSE file.
 """
+import functools
 import logging
 import sys
+import types
 
 log = logging.getLogger("resolva")
 
@@ -32,6 +34,50 @@ class ResolvaException(Exception):
     """
 
 
+def batched(iterable, size):
+    """
+    Yields lists of *size* items from the iterable (the last one may be shorter).
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def get_size(obj, seen=None):
+    """
+    Returns the approximate memory size of *obj*, in bytes, including the objects it contains:
+    items of containers, and closure variables of functions.
+
+    Objects whose id is in *seen* are not counted, and counted objects are added to it,
+    so that shared objects are counted once over several calls.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(get_size(k, seen) + get_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(get_size(item, seen) for item in obj)
+    elif isinstance(obj, types.FunctionType) and obj.__closure__:
+        for cell in obj.__closure__:
+            try:
+                size += get_size(cell.cell_contents, seen)
+            except ValueError:  # empty cell
+                pass
+    elif isinstance(obj, functools.partial):
+        size += get_size(obj.func, seen) + get_size(obj.args, seen) + get_size(obj.keywords, seen)
+    return size
+
+
 if __name__ == "__main__":
 
     log.debug("debug")
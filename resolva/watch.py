@@ -0,0 +1,448 @@
+"""
+This file is part of resolva.
+(C) copyright 2024 Michael Haussmann, spil@xeo.info
+resolva is free software and is distributed under the MIT License. See LICENSE file.
+
+Incremental resolution from file system change feeds.
+
+Instead of crawling and resolving a whole tree again to notice changes, a Watcher reads the created,
+moved and deleted paths from an event source, resolves only these paths, and keeps a ResultIndex current.
+The work is proportional to the changes, not to the size of the tree.
+
+Event sources have a read(timeout) method, returning a list of (action, path, is_directory) changes,
+where action is "add" or "remove", and a close() method.
+- InotifySource watches a directory tree on Linux, with inotify (through ctypes).
+- QueueSource receives changes from any other feed (or from tests), with put().
+
+Example
+
+    import resolva
+    from resolva.watch import Watcher, InotifySource
+
+    r = resolva.Resolver.get("sids")
+    watcher = Watcher(r, InotifySource("/mnt/prods", initial_scan=True), root="/mnt/prods")
+    while True:
+        for kind, path, label, data in watcher.poll(timeout=1.0):
+            print(kind, path, label, data)
+"""
+from __future__ import annotations
+from typing import Any, Callable, Iterable, Iterator
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import threading
+import time
+
+from resolva.resolver import Resolver  # type: ignore
+from resolva.utils import log, ResolvaException  # type: ignore
+
+# inotify constants (see "man inotify")
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_ONLYDIR
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+
+class ResultIndex:
+    """
+    Index of resolved paths: {path: (label, data)}, with the paths of each label,
+    and the tree of indexed paths, so that a directory subtree is removed without scanning the whole index.
+
+    >>> index = ResultIndex()
+    >>> index.add("hamlet/s/sq010", "shot__sequence", {'project': 'hamlet', 'type': 's', 'sequence': 'sq010'})
+    True
+    >>> [path for path, label, data in index.remove("hamlet")]
+    ['hamlet/s/sq010']
+    >>> len(index)
+    0
+    """
+
+    def __init__(self, separator: str = '/'):
+        self._separator = separator
+        self._results: dict[str, tuple[str, dict[str, str]]] = {}
+        self._labels: dict[str, set[str]] = {}
+        self._children: dict[str, set[str]] = {}  # path: child paths, indexed or with indexed descendants
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._results
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._results)
+
+    def get(self, path: str) -> tuple[str, dict[str, str]] | None:
+        """
+        Returns the (label, data) result of the path, or None if it is not indexed.
+        """
+        return self._results.get(path)
+
+    def items(self) -> Iterator[tuple[str, tuple[str, dict[str, str]]]]:
+        """
+        Returns an iterator over (path, (label, data)) items.
+        """
+        return iter(self._results.items())
+
+    def get_paths(self, label: str) -> set[str]:
+        """
+        Returns the indexed paths resolved with the given label.
+        """
+        return set(self._labels.get(label, ()))
+
+    def add(self, path: str, label: str, data: dict[str, str]) -> bool:
+        """
+        Adds the result of the path. Returns False if the path is already indexed with the same label.
+        """
+        previous = self._results.get(path)
+        if previous is not None:
+            if previous[0] == label:
+                return False
+            self._labels[previous[0]].discard(path)
+        self._results[path] = (label, data)
+        self._labels.setdefault(label, set()).add(path)
+
+        # link the path to its ancestors, up to an already linked one
+        separator = self._separator
+        child = path
+        while separator in child:
+            parent = child.rpartition(separator)[0]
+            children = self._children.setdefault(parent, set())
+            if child in children:
+                break
+            children.add(child)
+            child = parent
+        return True
+
+    def remove(self, path: str) -> list[tuple[str, str, dict[str, str]]]:
+        """
+        Removes the path and all indexed paths below it.
+
+        Returns:
+            list of removed (path, label, data) tuples
+        """
+        removed = []
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            result = self._results.pop(current, None)
+            if result is not None:
+                self._labels[result[0]].discard(current)
+                removed.append((current, result[0], result[1]))
+            stack.extend(self._children.pop(current, ()))
+        self._unlink(path)
+        return removed
+
+    def discard(self, path: str) -> tuple[str, dict[str, str]] | None:
+        """
+        Removes the path only, and keeps the indexed paths below it.
+
+        Returns:
+            the removed (label, data) result, or None if the path is not indexed.
+        """
+        result = self._results.pop(path, None)
+        if result is not None:
+            self._labels[result[0]].discard(path)
+            if path not in self._children:
+                self._unlink(path)
+        return result
+
+    def _unlink(self, path: str) -> None:
+        """
+        Unlinks the path from its parent, and the ancestors left without children.
+        """
+        separator = self._separator
+        child = path
+        while separator in child:
+            parent = child.rpartition(separator)[0]
+            children = self._children.get(parent)
+            if children is None:
+                break
+            children.discard(child)
+            if children or parent in self._results:
+                break
+            del self._children[parent]
+            child = parent
+
+    def clear(self) -> None:
+        self._results.clear()
+        self._labels.clear()
+        self._children.clear()
+
+
+class QueueSource:
+    """
+    Event source fed by put(), eg. from another change feed, a message queue, or tests.
+    It is thread safe: changes can be put from other threads.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+
+    def put(self, action: str, path: str, is_directory: bool = False) -> None:
+        """
+        Adds a change: action is "add" (created, or moved in) or "remove" (deleted, or moved out).
+        """
+        if action not in ("add", "remove"):
+            raise ResolvaException(f'Unknown change action "{action}" (use "add" or "remove")')
+        self._queue.put((action, path, is_directory))
+
+    def read(self, timeout: float | None = None) -> list[tuple[str, str, bool]]:
+        """
+        Returns the pending changes, waiting up to timeout seconds for the first one (None waits forever).
+        """
+        try:
+            changes = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                changes.append(self._queue.get_nowait())
+            except queue.Empty:
+                return changes
+
+    def close(self) -> None:
+        pass
+
+
+class InotifySource:
+    """
+    Event source watching a directory tree with Linux inotify, through ctypes.
+
+    Each directory of the tree is watched. New directories are watched when they appear,
+    and their content is reported as added, as it may have been created before the watch.
+    Directories moved out of the tree are reported as removed, with their content (see ResultIndex.remove).
+
+    If the kernel event queue overflows, events are lost and a warning is logged: a full scan is then needed.
+    """
+
+    def __init__(self, directory: str, initial_scan: bool = False):
+        """
+        Args:
+            directory: the root of the tree to watch
+            initial_scan: if the paths existing in the tree are reported as added by the first read.
+        """
+        library = ctypes.util.find_library('c') or 'libc.so.6'
+        try:
+            self._libc = ctypes.CDLL(library, use_errno=True)
+            self._libc.inotify_init1
+        except (OSError, AttributeError):
+            raise ResolvaException('inotify is not available on this system, use another event source.')
+
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise ResolvaException(f'inotify_init1 failed: {os.strerror(ctypes.get_errno())}')
+        self._directory = directory.rstrip('/') or '/'
+        self._watches: dict[int, str] = {}  # watch descriptor: directory
+        self._pending: list[tuple[str, str, bool]] = []
+
+        scanned = self._watch_tree(self._directory)
+        if initial_scan:
+            self._pending.extend(scanned)
+
+    def _watch(self, directory: str) -> bool:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            log.debug(f'Can not watch "{directory}": {os.strerror(ctypes.get_errno())}')
+            return False
+        self._watches[wd] = directory
+        return True
+
+    def _watch_tree(self, directory: str) -> list[tuple[str, str, bool]]:
+        """
+        Watches the directory and its sub directories, and returns their content as "add" changes.
+        """
+        found = []
+        if not self._watch(directory):
+            return found
+        for parent, directories, files in os.walk(directory):
+            for name in directories:
+                path = os.path.join(parent, name)
+                if self._watch(path):
+                    found.append(("add", path, True))
+            found.extend(("add", os.path.join(parent, name), False) for name in files)
+        return found
+
+    def _forget_tree(self, directory: str) -> None:
+        """
+        Stops watching the directory and its sub directories (moved out of the tree).
+        """
+        below = directory + '/'
+        for wd, path in list(self._watches.items()):
+            if path == directory or path.startswith(below):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._watches[wd]
+
+    def read(self, timeout: float | None = None) -> list[tuple[str, str, bool]]:
+        """
+        Returns the pending changes, waiting up to timeout seconds for the first one (None waits forever).
+        """
+        if self._pending:
+            changes, self._pending = self._pending, []
+            return changes
+        if self._fd < 0 or not select.select([self._fd], [], [], timeout)[0]:
+            return []
+
+        changes = []
+        while True:
+            try:
+                buffer = os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if mask & _IN_Q_OVERFLOW:
+                    log.warning(f'inotify events were lost under "{self._directory}", a full scan is needed.')
+                    continue
+                if mask & _IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None or not name:
+                    continue
+
+                path = os.path.join(directory, os.fsdecode(name))
+                is_directory = bool(mask & _IN_ISDIR)
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    changes.append(("add", path, is_directory))
+                    if is_directory:
+                        changes.extend(self._watch_tree(path))
+                elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                    changes.append(("remove", path, is_directory))
+                    if is_directory and mask & _IN_MOVED_FROM:
+                        self._forget_tree(path)
+        return changes
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+            self._watches.clear()
+
+
+class Watcher:
+    """
+    Keeps a ResultIndex current from the changes of an event source.
+
+    Changes are read in bursts (see poll), and coalesced: only the last change of each path counts,
+    so that a file created and deleted within a burst costs nothing. A path removed and then added again
+    within a burst first loses its subtree, eg. a directory moved out and replaced by another one.
+    Added paths are resolved with resolve_first, removed paths are removed from the index with their subtree.
+
+    Each poll returns events, as (kind, path, label, data) tuples, where kind is "add" or "remove".
+    Paths that do not resolve are not indexed, and an indexed path added again that no longer resolves is removed.
+    """
+
+    def __init__(self, resolver: Resolver, source: Any, index: ResultIndex | None = None, root: str = '',
+                 burst: float = 0.05, max_delay: float = 1.0):
+        """
+        Args:
+            resolver: the Resolver
+            source: the event source (see InotifySource and QueueSource)
+            index: the index to keep current. By default, a new empty ResultIndex.
+            root: a directory removed from the start of the event paths before resolving,
+                  when the patterns are relative to it. Paths outside of it are ignored.
+            burst: after a change, how long to wait for more changes to coalesce, in seconds.
+            max_delay: maximum time spent collecting a burst, in seconds.
+        """
+        self.resolver = resolver
+        self.source = source
+        self.index = index if index is not None else ResultIndex()
+        self._root = root.rstrip('/') + '/' if root else ''
+        self.burst = burst
+        self.max_delay = max_delay
+
+    def _relative(self, path: str) -> str | None:
+        root = self._root
+        if not root:
+            return path
+        if not path.startswith(root) or len(path) == len(root):
+            return None
+        return path[len(root):]
+
+    def process(self, changes: Iterable[tuple[str, str, bool]]) -> list[tuple[str, str, str, dict[str, str]]]:
+        """
+        Coalesces the changes, applies them to the index, and returns the resulting events.
+        """
+        latest: dict[str, tuple[str, bool]] = {}  # path: (last action, removed within the burst)
+        for action, path, __ in changes:
+            path = self._relative(path)  # type: ignore
+            if path is None:
+                continue
+            removed = latest.pop(path, ("", False))[1]  # keep the order of the last change
+            latest[path] = (action, removed or action == "remove")
+
+        events: list = []
+        index = self.index
+        resolve_first = self.resolver.resolve_first
+        for path, (action, removed) in latest.items():
+            if action == "remove":
+                events.extend(("remove", old_path, label, data) for old_path, label, data in index.remove(path))
+                continue
+
+            label, data = resolve_first(path)
+            unchanged = False
+            if removed:
+                # removed, then added again (eg. a directory replaced by another): the old subtree goes first,
+                # and the path itself gives no event if its result is the same.
+                for old_path, old_label, old_data in index.remove(path):
+                    if old_path == path and old_label == label:
+                        unchanged = True
+                    else:
+                        events.append(("remove", old_path, old_label, old_data))
+
+            if label is None:
+                # the path does not resolve (anymore), its previous result goes
+                previous = index.discard(path)
+                if previous is not None:
+                    events.append(("remove", path, previous[0], previous[1]))
+            elif index.add(path, label, data) and not unchanged:  # type: ignore
+                events.append(("add", path, label, data))
+        return events
+
+    def poll(self, timeout: float | None = None) -> list[tuple[str, str, str, dict[str, str]]]:
+        """
+        Waits up to timeout seconds for changes (None waits forever), collects the burst, and processes it.
+
+        Returns:
+            list of (kind, path, label, data) events, possibly empty.
+        """
+        changes = self.source.read(timeout)
+        if not changes:
+            return []
+        deadline = time.monotonic() + self.max_delay
+        while time.monotonic() < deadline:
+            more = self.source.read(self.burst)
+            if not more:
+                break
+            changes.extend(more)
+        return self.process(changes)
+
+    def run(self, sink: Callable[[list[tuple]], Any], stop: threading.Event | None = None,
+            timeout: float = 0.5) -> None:
+        """
+        Polls until the stop event is set, and calls sink with each non empty list of events.
+        """
+        while stop is None or not stop.is_set():
+            events = self.poll(timeout)
+            if events:
+                sink(events)
+
+    def close(self) -> None:
+        self.source.close()
@@ -0,0 +1,355 @@
+"""
+Micro benchmarks for resolva.
+
+Run all benchmarks:
+    python -m resolva_tests.benchmark
+"""
+import timeit
+
+from resolva import Resolver, ResolverRouter, template  # type: ignore
+from resolva.utils import ResolvaException  # type: ignore
+from resolva_tests.data import test_root, test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.WARNING)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+
+
+def measure(name, function, number=100000, reference=None):
+    """
+    Runs function *number* times, and prints the time per call.
+    If a reference time per call is given, the speedup is printed as well.
+
+    Returns:
+        time per call, in seconds
+    """
+    per_call = min(timeit.repeat(function, number=number, repeat=3)) / number
+    speedup = f" (x{reference / per_call:.2f})" if reference else ""
+    print(f"{name:<50} {per_call * 1e6:>8.3f} us{speedup}")
+    return per_call
+
+
+def bench_format():
+    print("Formatting")
+
+    label = "shot__file"
+    data = {'project': 'hamlet', 'type': 's', 'sequence': 'sq010', 'shot': 'sh0010',
+            'task': 'anim', 'version': 'v001', 'state': 'w', 'ext': 'ma'}
+    specification = r.get_format_for(label)
+    formatter = template.construct_formatter(specification)
+    assert formatter(data) == specification.format(**data)
+
+    reference = measure("str.format(**data)", lambda: specification.format(**data))
+    measure("compiled formatter(data)", lambda: formatter(data), reference=reference)
+
+    # duplicate placeholders
+    specification = "{project}/{type}/{sequence}/{ext}/bla.{ext}"
+    formatter = template.construct_formatter(specification)
+    assert formatter(data) == specification.format(**data)
+
+    reference = measure("str.format(**data) - duplicate keys", lambda: specification.format(**data))
+    measure("compiled formatter(data) - duplicate keys", lambda: formatter(data), reference=reference)
+
+    measure("Resolver.format_one", lambda: r.format_one(data, label), number=20000)
+    print()
+
+
+def bench_format_cache():
+    print("Formatting the same entities repeatedly (format cache)")
+
+    with (test_root / "ressources" / "hamlet.sids.txt").open() as f:
+        entities = [found for found in map(r.resolve_first, f.read().splitlines()) if found[0]]
+
+    rc = Resolver.get("sids_format_cache") or Resolver("sids_format_cache", sid_templates, format_cache_size=10000)
+    for label, data in entities:
+        assert rc.format_one(data, label) == r.format_one(data, label)
+        assert rc.format_first(data) == r.format_first(data)
+
+    reference = measure(f"format_one - {len(entities)} entities",
+                        lambda: [r.format_one(data, label) for label, data in entities], number=10)
+    measure(f"format_one, format cache - {len(entities)} entities",
+            lambda: [rc.format_one(data, label) for label, data in entities], number=10, reference=reference)
+    reference = measure(f"format_first - {len(entities)} entities",
+                        lambda: [r.format_first(data) for label, data in entities], number=10)
+    measure(f"format_first, format cache - {len(entities)} entities",
+            lambda: [rc.format_first(data) for label, data in entities], number=10, reference=reference)
+    print()
+
+
+def bench_resolve():
+    print("Resolving (without caches)")
+
+    # the methods without caches, to measure matching, not cache lookups
+    resolve_first = Resolver._resolve_first  # type: ignore
+    resolve_all = Resolver._resolve_all  # type: ignore
+    rn = Resolver.get("sids_no_miss_cache") or Resolver("sids_no_miss_cache", sid_templates, miss_cache_size=0)
+
+    measure(f"resolve_first - {len(test_strings)} strings", lambda: [resolve_first(rn, s) for s in test_strings],
+            number=200)
+    measure(f"resolve_all - {len(test_strings)} strings", lambda: [resolve_all(rn, s) for s in test_strings],
+            number=200)
+    print()
+
+
+def bench_misses():
+    print("Resolving strings that match nothing")
+
+    # temporary files below matching directories, and a subtree where nothing can match
+    misses = [f"hamlet/s/sq010/sh0010/anim/v001/w/tmp/autosave_{i}.ma" for i in range(500)] + \
+             [f"cache/tmp/{i}/file.tmp" for i in range(500)]
+
+    def resolve(resolver):
+        return [resolver.resolve_first(s) for s in misses]
+
+    rn = Resolver.get("sids_no_miss_cache") or Resolver("sids_no_miss_cache", sid_templates, miss_cache_size=0)
+    reference = measure(f"no miss cache - {len(misses)} strings",
+                        lambda: (rn.clear_caches(), resolve(rn)), number=20)
+    rm = Resolver.get("sids_misses") or Resolver("sids_misses", sid_templates)
+
+    def first_pass():
+        rm.clear_caches()
+        return resolve(rm)
+
+    measure(f"miss cache, first pass - {len(misses)} strings", first_pass, number=20, reference=reference)
+    measure(f"miss cache, known misses - {len(misses)} strings", lambda: resolve(rm), number=20, reference=reference)
+    print()
+
+
+def bench_directories():
+    print("Resolving sibling files (directory cache)")
+
+    # a crawl, in directory order
+    crawl = [f"hamlet/s/sq{q:03d}/sh{h:04d}/anim/v001/w/{ext}"
+             for q in range(10) for h in range(10) for ext in ("ma", "mb", "mov", "abc", "json", "tmp")]
+
+    def resolve(resolver):
+        resolver.clear_caches()
+        return [resolver.resolve_first(s) for s in crawl]
+
+    rn = Resolver.get("sids_misses") or Resolver("sids_misses", sid_templates)
+    reference = measure(f"resolve_first - {len(crawl)} strings", lambda: resolve(rn), number=20)
+    rd = Resolver.get("sids_directories") or Resolver("sids_directories", sid_templates, directory_cache_size=1000)
+    measure(f"resolve_first, directory cache - {len(crawl)} strings", lambda: resolve(rd), number=20,
+            reference=reference)
+    print()
+
+
+def bench_match():
+    print("Filtering (match only)")
+
+    strings = test_strings * 10
+    label = "shot__file"
+    rn = Resolver.get("sids_no_result_cache") or Resolver("sids_no_result_cache", sid_templates, result_cache_size=0)
+    assert [bool(rn.resolve_one(s, label)) for s in strings] == rn.matches_many(strings, label)
+    assert [rn.resolve_first(s)[0] for s in strings] == rn.labels_of(strings)
+
+    reference = measure(f"resolve_one - {len(strings)} strings",
+                        lambda: [s for s in strings if rn.resolve_one(s, label)], number=200)
+    measure(f"matches_many - {len(strings)} strings", lambda: rn.matches_many(strings, label), number=200,
+            reference=reference)
+    reference = measure(f"resolve_first()[0] - {len(strings)} strings",
+                        lambda: [rn.resolve_first(s)[0] for s in strings], number=200)
+    measure(f"labels_of - {len(strings)} strings", lambda: rn.labels_of(strings), number=200, reference=reference)
+    print()
+
+
+def bench_split_matchers():
+    print("Resolving with split matchers (without caches)")
+
+    with (test_root / "ressources" / "hamlet.sids.txt").open() as f:
+        strings = f.read().splitlines()
+
+    resolve_first = Resolver._resolve_first  # type: ignore
+    resolve_all = Resolver._resolve_all  # type: ignore
+    rr = Resolver.get("sids_regex_only") or Resolver("sids_regex_only", sid_templates, split_matchers=False)
+    rs = Resolver.get("sids") or Resolver("sids", sid_templates)
+    assert [resolve_first(rr, s) for s in strings] == [resolve_first(rs, s) for s in strings]
+    assert [resolve_all(rr, s) for s in strings] == [resolve_all(rs, s) for s in strings]
+
+    reference = measure(f"resolve_first, re.search - {len(strings)} strings",
+                        lambda: [resolve_first(rr, s) for s in strings], number=20)
+    measure(f"resolve_first, split matchers - {len(strings)} strings",
+            lambda: [resolve_first(rs, s) for s in strings], number=20, reference=reference)
+    reference = measure(f"resolve_all, re.search - {len(strings)} strings",
+                        lambda: [resolve_all(rr, s) for s in strings], number=20)
+    measure(f"resolve_all, multi matcher - {len(strings)} strings",
+            lambda: [resolve_all(rs, s) for s in strings], number=20, reference=reference)
+    print()
+
+
+def bench_backtracking():
+    print("Resolving long strings with a heavy pattern (max_input_length)")
+
+    # the strings almost match: every "_" may end any of the first placeholders
+    patterns = {"heavy": "{name:(.*)}_{version:(.*)}_{state:(.*)}_{ext:(ma|mb)}", "file": "{name}/{ext}"}
+    strings = ["_".join(["a"] * 150) + f"_{i}" for i in range(10)]
+
+    resolve_first = Resolver._resolve_first  # type: ignore
+    rh = Resolver.get("heavy_misses") or Resolver("heavy_misses", patterns)
+    rl = Resolver.get("heavy_misses_limited") or Resolver("heavy_misses_limited", patterns, max_input_length=256)
+    assert rl.get_cost_report()["heavy"]["heavy"]
+    assert [resolve_first(rh, s) for s in strings] == [resolve_first(rl, s) for s in strings]
+
+    reference = measure(f"no length limit - {len(strings)} strings", lambda: [resolve_first(rh, s) for s in strings],
+                        number=2)
+    measure(f"max_input_length=256 - {len(strings)} strings", lambda: [resolve_first(rl, s) for s in strings],
+            number=2, reference=reference)
+    print()
+
+
+def bench_regex_backends():
+    print("Resolving with regex backends (without caches, nor split matchers)")
+
+    with (test_root / "ressources" / "hamlet.sids.txt").open() as f:
+        strings = f.read().splitlines()
+    heavy = {"heavy": "{name:(.*)}_{version:(.*)}_{state:(.*)}_{ext:(ma|mb)}"}
+    long = ["_".join(["a"] * 150) + f"_{i}" for i in range(10)]
+
+    resolve_first = Resolver._resolve_first  # type: ignore
+    reference = heavy_reference = None
+    for backend in ("re", "re2", "regex"):
+        try:
+            rb = Resolver(f"sids_{backend}", sid_templates, regex_backend=backend, split_matchers=False)
+            rh = Resolver(f"heavy_{backend}", heavy, regex_backend=backend)
+        except ResolvaException as error:
+            print(f"{backend:<50} {error}")
+            continue
+        per_call = measure(f"resolve_first, {backend} - {len(strings)} strings",
+                           lambda: [resolve_first(rb, s) for s in strings], number=20, reference=reference)
+        reference = reference or per_call
+        per_call = measure(f"heavy pattern, {backend} - {len(long)} strings",
+                           lambda: [resolve_first(rh, s) for s in long], number=2, reference=heavy_reference)
+        heavy_reference = heavy_reference or per_call
+    print()
+
+
+def bench_router():
+    print("Resolving with one Resolver per project (router)")
+
+    projects = [f"show{i:02d}" for i in range(20)]
+    resolvers = []
+    for project in projects:
+        patterns = {k: v.replace("hamlet", project) for k, v in sid_templates.items()}
+        resolvers.append(Resolver.get(f"sids_{project}") or Resolver(f"sids_{project}", patterns, result_cache_size=0))
+    router = ResolverRouter(resolvers)
+
+    with (test_root / "ressources" / "hamlet.sids.txt").open() as f:
+        lines = f.read().splitlines()
+    strings = [s.replace("hamlet", project) for s in lines[:500] for project in projects[::4]]
+
+    def resolve_in_turn(string):
+        for resolver in resolvers:
+            label, data = resolver.resolve_first(string)
+            if label is not None:
+                return resolver.get_id(), label, data
+        return None, None, None
+
+    assert [resolve_in_turn(s) for s in strings] == router.resolve_many(strings)
+
+    reference = measure(f"{len(resolvers)} Resolvers in turn - {len(strings)} strings",
+                        lambda: [resolve_in_turn(s) for s in strings], number=5)
+    measure(f"router - {len(strings)} strings", lambda: router.resolve_many(strings), number=5, reference=reference)
+    print()
+
+
+def bench_watch():
+    print("Keeping an index current (watch)")
+
+    from resolva.watch import QueueSource, Watcher  # type: ignore
+
+    with (test_root / "ressources" / "hamlet.sids.txt").open() as f:
+        strings = f.read().splitlines()
+    rn = Resolver.get("sids_no_result_cache") or Resolver("sids_no_result_cache", sid_templates, result_cache_size=0)
+    source = QueueSource()
+    watcher = Watcher(rn, source)
+    watcher.process(("add", s, False) for s in strings)
+    changes = [("add", f"hamlet/s/sq010/sh0010/anim/v{i:03d}", True) for i in range(10)]
+
+    def crawl():
+        return {s: result for s, result in zip(strings, map(rn.resolve_first, strings)) if result[0]}
+
+    def update():
+        watcher.process(changes)
+        watcher.process(("remove", path, True) for __, path, __ in changes)
+
+    reference = measure(f"resolve all again - {len(strings)} strings", crawl, number=10)
+    measure(f"watcher, 10 added and removed - {len(strings)} indexed", update, number=10, reference=reference)
+    print()
+
+
+def bench_complete():
+    print("Completing typed strings, at each keystroke")
+
+    with (test_root / "ressources" / "hamlet.sids.txt").open() as f:
+        strings = f.read().splitlines()[::20]
+    keystrokes = [s[:n] for s in strings for n in range(len(s) + 1)]
+    # many templates: the sids patterns of 20 projects
+    patterns = {f"{k}_{i}": v.replace("hamlet", f"hamlet{i}" if i else "hamlet")
+                for i in range(20) for k, v in sid_templates.items()}
+    rc = Resolver.get("sids_complete_bench") or Resolver("sids_complete_bench", patterns)
+    rc.complete("")
+    # reference: each pattern completed element by element, without the tree of segments
+    scan = template.construct_completer(patterns, aligned={k: False for k in patterns})
+    assert all(scan(s) == rc.complete(s) for s in keystrokes[::50])
+
+    reference = measure(f"per pattern - {len(keystrokes)} keystrokes, {len(patterns)} patterns",
+                        lambda: [scan(s) for s in keystrokes], number=1)
+    measure(f"complete - {len(keystrokes)} keystrokes, {len(patterns)} patterns",
+            lambda: [rc.complete(s) for s in keystrokes], number=1, reference=reference)
+    print()
+
+
+def bench_server():
+    print("Short-lived process: creating the Resolver, or using a server (ResolverClient)")
+
+    import os
+    import tempfile
+    import threading
+    from resolva import server as server_module  # type: ignore
+    from resolva.server import ResolverClient  # type: ignore
+
+    if not hasattr(server_module, "ResolverServer"):
+        print("No Unix domain sockets, skipped\n")
+        return
+
+    strings = test_strings[:20]
+    path = os.path.join(tempfile.mkdtemp(), "resolva.sock")
+    server = server_module.ResolverServer(path, [Resolver.get("sids") or Resolver("sids", sid_templates)])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def create():
+        Resolver.drop("sids_cold")
+        rc = Resolver("sids_cold", sid_templates)
+        return [rc.resolve_first(s) for s in strings]
+
+    def connect():
+        client = ResolverClient("sids", path=path)
+        results = client.resolve_many(strings)
+        client.close()
+        return results
+
+    assert create() == connect()
+    reference = measure(f"create Resolver and resolve - {len(strings)} strings", create, number=20)
+    measure(f"connect client and resolve - {len(strings)} strings", connect, number=20, reference=reference)
+    server.shutdown()
+    server.server_close()
+    print()
+
+
+if __name__ == "__main__":
+
+    bench_format()
+    bench_format_cache()
+    bench_resolve()
+    bench_misses()
+    bench_directories()
+    bench_match()
+    bench_split_matchers()
+    bench_backtracking()
+    bench_regex_backends()
+    bench_router()
+    bench_watch()
+    bench_server()
+    bench_complete()
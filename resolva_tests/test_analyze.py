@@ -0,0 +1,59 @@
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+ra = Resolver.get("sids_analyzed") or Resolver(id="sids_analyzed", patterns=sid_templates, analyze=True)
+
+analysis = ra.analyze()
+assert analysis["shadowed"] == {}
+assert "shot__state" in analysis["disjoint"]["asset__file"]  # different segment count
+assert "asset__movie_file" not in analysis["disjoint"]["asset__file"]  # both extensions may be "*" or ">"
+assert "shot__cache_file" not in analysis["disjoint"]["shot__cache_node"]  # "{node}" matches any extension
+
+# a generic pattern placed before a specific one
+shadow_templates = {
+    "versioned": r"{project}/s/{name}/{version:v\d+}",
+    "version_file": r"{project}/s/{name}/{version:(v001|v002)}",
+    "any_file": "{project}/{type:(a|s)}/{name}/{ext}",
+    "maya_file": "{project}/{type:(a|s)}/{name}/{ext:(ma|mb)}",
+    "asset_maya_file": "{project}/a/{name}/{ext:(ma|mb)}",
+    "project": "{project}",
+}
+rs = Resolver("shadow_analyzed", shadow_templates, analyze=True)
+rs_plain = Resolver("shadow_plain", shadow_templates)
+shadowed = rs.analyze()["shadowed"]
+assert shadowed == {"version_file": "versioned", "maya_file": "any_file", "asset_maya_file": "any_file"}, shadowed
+assert "version_file" in rs.analyze()["disjoint"]["asset_maya_file"]  # type "a" vs "s"
+assert "versioned" in rs.analyze()["disjoint"]["maya_file"]  # "v\d+" does not match "ma" or "mb"
+assert rs.resolve_first("hamlet/a/chair/ma") == ("any_file", rs_plain.resolve_first("hamlet/a/chair/ma")[1])
+
+# without both anchors, nothing is proven
+assert Resolver("shadow_unanchored", shadow_templates, anchor_end=False).analyze() == {"shadowed": {}, "disjoint": {}}
+
+start = datetime.now()
+
+strings = test_strings + ["hamlet/a/chair/ma", "hamlet/s/sh010/v001", "hamlet/s/sh010/v003", "hamlet/a/chair/ma\n"]
+for i, s in enumerate(strings):
+    log.info(f'Input {i}: {s}')
+
+    for resolver, plain in ((ra, r), (rs, rs_plain)):
+        # the analysis does not change the results
+        assert resolver.resolve_first(s) == plain.resolve_first(s)
+        assert resolver.resolve_all(s) == plain.resolve_all(s)
+
+        # the analysis is sound
+        analysis = resolver.analyze()
+        matching = [label for label, regex in plain.get_regexes().items() if regex.search(s)]
+        for label in matching:
+            assert not set(analysis["disjoint"].get(label, [])) & set(matching), (s, label)
+            if label in analysis["shadowed"]:
+                assert analysis["shadowed"][label] in matching
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
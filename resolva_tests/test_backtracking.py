@@ -0,0 +1,61 @@
+from datetime import datetime
+from resolva import Resolver, template  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+
+
+def degree(pattern):
+    return template.get_backtracking_degree(template.construct_regular_expression(pattern).pattern)
+
+
+# static analysis
+assert degree("{project}/{type}/{sequence}") == (1, False)
+assert degree("{name}.{ext}") == (2, False)  # "." may be matched by {name}
+assert degree("{name}/{ext:(ma|mb)}") == (1, False)
+assert degree("{name:(.*)}_{ext:(.*)}") == (2, True)
+assert degree("{a:(.*)}/{b:(.*)}/{c:(.*)}") == (3, True)
+assert degree("{name:((a+)+)}") == (None, True)
+assert degree("{name:(.*+)}_{ext:(.*)}") == (1, True)  # possessive repeats do not backtrack
+assert all(not report['heavy'] for report in r.get_cost_report().values())
+
+# heavy patterns are reported, and skipped for long strings with max_input_length
+patterns = {"heavy": "{a:(.*)}_{b:(.*)}_{c:(.*)}", "file": "{name}/{ext}"}
+rh = Resolver.get("heavy") or Resolver("heavy", patterns)
+rl = Resolver.get("heavy_limited") or Resolver("heavy_limited", patterns, max_input_length=50)
+assert rl.get_cost_report()["heavy"]["heavy"]
+assert not rl.get_cost_report()["file"]["heavy"]
+
+short = "a_b_c"
+long = "a" * 100 + "_b_c"
+assert rl.resolve_first(short) == rh.resolve_first(short) == ("heavy", {"a": "a", "b": "b", "c": "c"})
+assert rh.resolve_first(long)[0] == "heavy"
+assert rl.resolve_first(long) == (None, None)
+assert rl.resolve_one(long, "heavy") == {}
+assert not rl.matches(long, "heavy")
+assert rl.label_of(long.encode()) is None
+assert rl.resolve_first("a" * 100 + "/ma") == rh.resolve_first("a" * 100 + "/ma")  # other patterns are not limited
+
+# time per pattern, with the profile option
+rp = Resolver.get("sids_profiled") or Resolver("sids_profiled", sid_templates, profile=True)
+
+start = datetime.now()
+
+for i, s in enumerate(test_strings):
+    log.info(f'Input {i}: {s}')
+
+    assert rp.resolve_first(s) == r.resolve_first(s)
+    assert rp.resolve_all(s) == r.resolve_all(s)
+
+report = rp.get_cost_report()
+assert report["shot__file"]["calls"] > 0
+assert all(v["time"] >= v["max_time"] >= 0 for v in report.values())
+assert sum(v["calls"] for v in r.get_cost_report().values()) == 0  # only measured with the profile option
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
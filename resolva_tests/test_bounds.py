@@ -0,0 +1,61 @@
+from datetime import datetime
+from resolva import Resolver, template  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+ru = Resolver.get("sids_unanchored") or Resolver(id="sids_unanchored", patterns=sid_templates, anchor_end=False)
+
+# separator count and length bounds
+assert template.get_match_bounds("^a/(x|y/z)$") == (1, 2, 3, 5)
+assert template.get_match_bounds(r"^(?P<a>[^/]*)/(?P<b>v\d\d\d)$") == (1, 1, 5, None)
+assert template.get_match_bounds("^(?P<path>.*)$")[:2] == (0, None)
+assert template.get_match_bounds(b"^a/b$") == (1, 1, 3, 3)
+
+# pattern bounds, added up per placeholder, are the bounds of the whole regex
+others = [r"/mnt/{prod}/{seq}/{shot}_{version:(v\d\d\d)}.{ext:(ma|mb)}", "{path:(.*)}/{name:(a/b|c)}", "a/b", r"{x:(\d\d?)}.{y:(x/y|z)?}"]
+for pattern in list(sid_templates.values()) + others:
+    for strict in (False, True):
+        regex = template.construct_regular_expression(pattern, strict=strict).pattern
+        assert template.get_pattern_bounds(pattern, strict) == template.get_match_bounds(regex), pattern
+
+assert r._bounds["project"][:2] == (0, 0)
+assert r._bounds["shot__file"][:2] == (7, 7)
+assert ru._bounds["project"][:2][1] > 1000  # without anchor_end, there is no maximum
+
+# most strings can only match a few labels
+assert len(r._get_matchers("hamlet/s/sq010/sh0010/anim/v001/w/ma")) == 7  # of 21 labels
+
+start = datetime.now()
+
+strings = test_strings + ["hamlet/s/sq010\n", "hamlet/s/sq010/", "/hamlet", b"hamlet/s/sq010", b"hamlet/a"]
+for i, s in enumerate(strings):
+    log.info(f'Input {i}: {s!r}')
+
+    for resolver in (r, ru):
+        # the bounds hold for all matching labels
+        regexes = resolver.get_regexes() if isinstance(s, str) else resolver._get_bytes_regexes()
+        checks = resolver._checks if isinstance(s, str) else resolver._get_bytes_checks()
+        separator = "/" if isinstance(s, str) else b"/"
+        for label, regex in regexes.items():
+            if regex.search(s):
+                min_count, max_count = resolver._bounds[label][:2]
+                min_length, max_length = checks[label][3:]
+                assert min_count <= s.count(separator) <= max_count, (s, label)
+                assert min_length <= len(s) <= max_length, (s, label)
+
+        # and the results are unchanged
+        expected = {}
+        for label, regex in regexes.items():
+            match = regex.search(s)
+            if match and match.groupdict():
+                expected[label] = resolver.resolve_one(s, label)
+        assert resolver.resolve_all(s) == expected
+        assert resolver.resolve_first(s) == (next(iter(expected.items())) if expected else (None, None))
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,43 @@
+import os
+from resolva import Resolver  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+
+
+def decoded(data):
+    return {k: os.fsdecode(v) for k, v in data.items()}
+
+
+for i, s in enumerate(test_strings):
+    log.info(f'Input {i}: {s}')
+    b = os.fsencode(s)
+
+    # bytes resolve identically, with bytes values
+    label, data = r.resolve_first(s)
+    label_b, data_b = r.resolve_first(b)
+    assert label == label_b
+    if not label:
+        continue
+    assert data == decoded(data_b)
+    assert all(isinstance(v, bytes) for v in data_b.values())
+
+    assert {k: decoded(v) for k, v in r.resolve_all(b).items()} == r.resolve_all(s)
+    assert decoded(r.resolve_one(b, label)) == data
+
+    # and format back to identical bytes
+    assert r.format_first(data_b) == (label, b)
+    assert r.format_one(data_b, label) == b
+    assert r.format_many(label, [tuple(data_b[k] for k in sorted(data_b))], keys=sorted(data_b)) == [b]
+    log.info(f"\t\t{label}: {data_b}")
+
+# undecodable file names are resolved and formatted as is
+b = b"hamlet/a/char/clau\xffdius"
+label, data = r.resolve_first(b)
+assert label == "asset__asset" and data["asset"] == b"clau\xffdius"
+assert r.format_one(data, label) == b
+assert r.resolve_first(os.fsdecode(b)) == (label, decoded(data))
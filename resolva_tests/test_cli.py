@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from resolva import Resolver  # type: ignore
+from resolva import cli  # type: ignore
+from resolva_tests.data import test_file, test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+
+patterns = cli.load_patterns(str(test_file.parent.parent / "pattern.py"), "sid_templates")
+assert patterns == sid_templates
+
+# lines are streamed identically with or without mmap
+assert list(cli.read_lines([str(test_file)])) == test_strings
+assert list(cli.read_lines([str(test_file)], use_mmap=True)) == test_strings
+
+for mode in ["first", "all", "label"]:
+    for output in ["jsonl", "tsv", "csv"]:
+
+        stream = io.StringIO()
+        count, resolved = cli.run(patterns, iter(test_strings), cli.get_writer(output, stream),
+                                  mode=mode, batch_size=7, keep_unmatched=True)
+        lines = stream.getvalue().splitlines()
+        log.info(f"Mode {mode}, output {output}: {count} lines, {resolved} results")
+
+        assert count == len(test_strings)
+        assert resolved == len(lines)
+
+        if output != "jsonl":
+            continue
+
+        results = [json.loads(line) for line in lines]
+        if mode == "all":
+            expected = [(s, label, data) for s in test_strings for label, data in r.resolve_all(s).items()]
+            assert [(d["path"], d["label"], d["data"]) for d in results if d["label"]] == expected
+        else:
+            expected = [(s, *r.resolve_first(s)) for s in test_strings]
+            if mode == "label":
+                expected = [(s, r.label_of(s), None) for s in test_strings]
+            assert [(d["path"], d["label"], d["data"]) for d in results] == expected
+
+# memory mapped files give the same results, and the label mode returns the labels only
+for mode in ["first", "all", "label"]:
+    found: list = []
+    resolved = cli.scan(patterns, [str(test_file)], found.extend, mode=mode)
+    assert resolved == len(found)
+    if mode == "label":
+        assert found == [(s, r.label_of(s), None) for s in test_strings if r.label_of(s)]
+    else:
+        assert found == list(r.resolve_file(str(test_file), mode))
+
+# input errors are reported like patterns errors, and a closed output stops quietly
+pattern_args = ["-p", str(test_file.parent.parent / "pattern.py"), "--variable", "sid_templates", "-q"]
+assert cli.main(pattern_args + [str(test_file.parent / "no_such_file.txt")]) == 2
+assert cli.main(pattern_args + ["--mmap", str(test_file.parent / "no_such_file.txt")]) == 2
+
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, "paths.txt")
+    with open(path, "w") as f:
+        f.write("\n".join(test_strings * 2000))
+    process = subprocess.Popen([sys.executable, "-m", "resolva"] + pattern_args + [path],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    process.stdout.readline()
+    process.stdout.close()  # like "| head -1"
+    errors = process.stderr.read()
+    process.stderr.close()
+    process.wait()
+    assert b"Traceback" not in errors, errors
@@ -0,0 +1,74 @@
+from datetime import datetime
+from itertools import product
+import re
+
+from resolva import Resolver, template  # type: ignore
+from resolva_tests.data import test_root, test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+
+# beginnings of regex matches, compared with the matches of a small alphabet, per expression
+for expression, alphabet in [(r"(sq\d\d\d|\*|\>)", "sq0*>"), (r"v\d{2,3}", "v0a"), (r"[^/]*", "a/b"),
+                             (r"(ab|a[^b])+c?", "abc/"), (r"x(?:yz)*", "xyz"), (r"[a-c]{0,2}b", "abcx")]:
+    prefix = re.compile(template.construct_prefix_expression(expression))
+    full = re.compile(f"(?:{expression})")
+    matches = [''.join(t) for n in range(7) for t in product(alphabet, repeat=n) if full.fullmatch(''.join(t))]
+    beginnings = {m[:i] for m in matches for i in range(len(m) + 1)}
+    for n in range(5):
+        for text in map(''.join, product(alphabet, repeat=n)):
+            assert bool(prefix.fullmatch(text)) == (text in beginnings), (expression, text)
+assert template.construct_prefix_expression(r"(?<=a)b") is None
+
+# keystrokes
+found = r.complete("hamlet/s/sq010/sh0010/la")
+assert found["shot__task"] == ("task", "la", ["layout"])
+assert set(found) == {label for label in sid_templates if label.startswith("shot__") and
+                      label not in ("shot__sequence", "shot__shot")}
+assert r.complete("hamlet/s/sq01")["shot__sequence"] == ("sequence", "sq01", [])
+assert r.complete("hamlet/s/")["shot__sequence"] == ("sequence", "", ["*", ">"])
+assert r.complete("hamlet/")["shot"] == ("type", "", ["s", "*", ">"])
+assert r.complete("ham") == {label: ("project", "ham", ["hamlet"]) for label in sid_templates}
+assert r.complete("hamlet/s/qs") == {}
+assert r.complete("hamlet/s/sq010/sh0010/anim/v001/w/m", ["shot__file", "shot__movie_file", "shot__state"]) == \
+    {"shot__file": ("ext", "m", ["ma", "mb", "maya"]), "shot__movie_file": ("ext", "m", ["mp4", "mov", "movie"])}
+
+# patterns that are not segment aligned, and literal text
+rp = Resolver.get("sids_complete") or Resolver("sids_complete", {"tree": r"{root:(hamlet|othello)}/{path:(.*)}",
+                                                                 "file": r"files/{name}_{version:(v\d+)}.{ext:(ma|mb)}"})
+assert rp.complete("othe") == {"tree": ("root", "othe", ["othello"])}
+assert rp.complete("hamlet/a/b")["tree"] == ("path", "a/b", [])
+assert rp.complete("fi") == {"file": (None, "fi", ["files"])}
+assert rp.complete("files/char_") == {"file": ("version", "", [])}
+assert rp.complete("files/char_v") == {"file": ("version", "v", [])}
+assert rp.complete("files/char_v01.m") == {"file": ("ext", "m", ["ma", "mb"])}
+
+with (test_root / "ressources" / "hamlet.sids.txt").open() as f:
+    strings = f.read().splitlines()
+
+start = datetime.now()
+
+count = 0
+for i, s in enumerate(test_strings + strings[::10]):
+    log.info(f'Input {i}: {s}')
+
+    # each beginning of the string can still match the labels that the string matches
+    resolved = r.resolve_all(s)
+    for n in range(len(s) + 1):
+        found = r.complete(s[:n])
+        count += 1
+        assert set(resolved) <= set(found), (s[:n], set(resolved) - set(found))
+        for label, (key, typed, values) in found.items():
+            assert s[:n].endswith(typed)
+            assert all(value.startswith(typed) for value in values)
+
+    # the typed value of the last placeholder
+    for label in resolved:
+        assert r.complete(s, [label])[label][1] == s.split("/")[-1]
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {count} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,53 @@
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+rd = Resolver("sids_directories", sid_templates, directory_cache_size=100)
+
+patterns = {"maya_file": r"/mnt/prods/{prod}/shots/{seq}/{shot}_{version:(v\d\d\d)}.{ext:(ma|mb)}",
+            "any_file": r"/mnt/prods/{prod}/shots/{seq}/{shot}_{version:(v\d\d\d)}.{ext}",
+            "sequence": "/mnt/prods/{prod}/shots/{seq}",
+            "project": "/mnt/prods/{prod}"}
+rp = Resolver("prods", patterns)
+rpd = Resolver("prods_directories", patterns, directory_cache_size=100)
+
+# sibling files, as listed by os.scandir
+siblings = [f"hamlet/s/sq010/sh0010/anim/v001/w/{ext}" for ext in ("ma", "mb", "mov", "abc", "tmp", "*", ">")]
+siblings += [f"hamlet/s/sq010/sh0010/anim/v001/w/{node}/abc" for node in ("cam", "char")]
+siblings += [f"/mnt/prods/hamlet/shots/sq010/sh{i:03d}_v{i:03d}.{ext}" for i in range(5) for ext in ("ma", "nk")]
+siblings += ["/mnt/prods/hamlet/shots/sq010/sh010_v012.ma\n", "/mnt/prods/hamlet/shots/sq010", "/mnt/prods/hamlet"]
+
+for s in siblings:
+    rd.resolve_first(s)
+    rpd.resolve_first(s)
+
+# the directory entries only match the last segment, with the data of the directory
+label, regex, data = rd._directory_entries["hamlet/s/sq010/sh0010/anim/v001/w"][0]
+assert label == "shot__file"
+assert data == {'project': 'hamlet', 'type': 's', 'sequence': 'sq010', 'shot': 'sh0010', 'task': 'anim',
+                'version': 'v001', 'state': 'w'}
+assert regex.search("ma")
+
+# the directory cache is bounded
+rb = Resolver("sids_small_directory_cache", sid_templates, directory_cache_size=3)
+for s in test_strings:
+    rb.resolve_first(s)
+assert len(rb._directory_entries) == 3
+
+start = datetime.now()
+
+for i, s in enumerate(test_strings + siblings):
+    log.info(f'Input {i}: {s}')
+
+    # the directory cache does not change the results
+    assert rd.resolve_first(s) == r.resolve_first(s), s
+    assert rpd.resolve_first(s) == rp.resolve_first(s), s
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
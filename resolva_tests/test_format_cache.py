@@ -0,0 +1,54 @@
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+rf = Resolver.get("sids_format_cache") or Resolver("sids_format_cache", sid_templates, format_cache_size=50)
+
+assert r.get_format_cache_info()['max_size'] == 0
+
+start = datetime.now()
+
+for i, s in enumerate(test_strings):
+    log.info(f'Input {i}: {s}')
+
+    resolved = r.resolve_all(s)
+    for label, data in resolved.items():
+
+        # cached results are identical, the first time and when repeated, whatever the key order
+        for attempt in (dict(data), dict(reversed(list(data.items())))):
+            assert rf.format_first(attempt) == r.format_first(attempt)
+            assert rf.format_all(attempt) == r.format_all(attempt)
+            assert rf.format_one(attempt, label) == r.format_one(attempt, label)
+            assert rf.format_one(attempt, "shot__file") == r.format_one(attempt, "shot__file")
+
+        # non matching data, and data that is not cached
+        bad = {k: f"{v}/bad" for k, v in data.items()}
+        assert rf.format_one(bad, label) is None
+        assert rf.format_one(bad, label) is None
+        if "version" in data:
+            numbered = dict(data, version=1)
+            assert rf.format_first(numbered) == r.format_first(numbered)
+            assert rf.format_first(dict(data, version=1.0)) == r.format_first(dict(data, version=1.0))
+
+        # unhashable values are formatted like other values, without the cache
+        listed = {k: [v] for k, v in data.items()}
+        assert rf.format_first(listed) == r.format_first(listed)
+        assert rf.format_all(listed) == r.format_all(listed)
+        assert rf.format_one(listed, label) == r.format_one(listed, label)
+
+info = rf.get_format_cache_info()
+log.info(info)
+assert info['hits'] > info['misses'] > 0
+assert info['size'] == info['max_size'] == 50
+
+rf.clear_caches()
+assert rf.get_format_cache_info() == {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 50}
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,54 @@
+from datetime import datetime
+from resolva import Resolver, template  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+
+# collect resolved data per label, as rows and as columns
+rows: dict = {}
+for s in test_strings:
+    for label, resolved in r.resolve_all(s).items():
+        rows.setdefault(label, []).append(resolved)
+
+# add some rows that do not format
+for label, found in list(rows.items()):
+    for data in found[:3]:
+        rows[label].append({k: f"{v}/bad" for k, v in data.items()})
+
+start = datetime.now()
+count = 0
+
+for label, found in rows.items():
+    log.info('*'*100)
+    log.info(f'Label: {label} ({len(found)} rows)')
+
+    expected = [r.format_one(data, label) for data in found]
+
+    columns = {key: [data[key] for data in found] for key in r.get_keys_for(label)}
+    assert r.format_many(label, columns) == expected
+
+    keys = sorted(r.get_keys_for(label))
+    tuples = [tuple(data[key] for key in keys) for data in found]
+    assert r.format_many(label, tuples, keys=keys) == expected
+
+    for data, formatted in zip(found, expected):
+        log.info(f'\t\t{data} -> {formatted}')
+    count = count + len(found)
+
+    log.info(' ' * 50)
+
+# mismatching keys do not format
+assert r.format_many("project", {"foo": ["bar"]}) == [None]
+assert r.format_many("unknown", {"project": ["hamlet"]}) == []
+
+# the compiled formatters, keyed by the key order of each call, are cached in a bounded cache
+assert template.construct_formatter.cache_info().maxsize == 4096
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {count} items. \n"
+      f"Pattern lines: {len(r.get_keys())}. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,53 @@
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+
+hierarchy = r.get_hierarchy()
+for label, parent in hierarchy.items():
+    log.info(f"{label} -> {parent}")
+
+assert hierarchy["project"] is None
+assert hierarchy["shot"] == "project"
+assert hierarchy["shot__sequence"] == "shot"
+assert hierarchy["shot__file"] == "shot__state"
+assert hierarchy["shot__cache_node_file"] == "shot__cache_node"
+assert r.get_children_of("shot__state") == ["shot__file", "shot__movie_file", "shot__cache_file", "shot__cache_node"]
+
+# a declared hierarchy replaces the detected one
+declared = {label: parent for label, parent in hierarchy.items() if not label.startswith("asset")}
+rd = Resolver("sids_declared", sid_templates, hierarchy=declared)
+assert rd.get_hierarchy()["asset__file"] is None
+assert rd.get_hierarchy()["shot__file"] == "shot__state"
+
+start = datetime.now()
+
+for i, s in enumerate(test_strings):
+    log.info(f'Input {i}: {s}')
+
+    if "/" not in s:
+        continue
+    parent, segment = s.rsplit("/", 1)
+    parent_label, parent_data = r.resolve_first(parent)
+    if not parent_label:
+        continue
+
+    # resolving the child from its parent gives the first matching descendant
+    expected = (None, None)
+    for label in r.get_labels():
+        if label in r._get_relatives()[0][parent_label] and r.resolve_one(s, label):
+            expected = (label, r.resolve_one(s, label))
+            break
+
+    found = r.resolve_child(parent_label, parent_data, segment)
+    log.info(f"\t\t{parent_label} + {segment} -> {found}")
+    assert found == expected
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,89 @@
+import time
+import weakref
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva.resolver import InstanceCache, instance_cache  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+
+# explicit drop
+rd = Resolver("sids_dropped", sid_templates)
+assert Resolver.get("sids_dropped") is rd
+assert Resolver.drop("sids_dropped")
+assert not Resolver.drop("sids_dropped")
+assert Resolver.get("sids_dropped") is None
+assert rd.resolve_first(test_strings[0]) == r.resolve_first(test_strings[0])  # still usable
+
+# dropped instances are released with their caches
+reference = weakref.ref(rd)
+del rd
+assert reference() is None
+
+# least recently used eviction
+cache = InstanceCache(max_size=2)
+cache["a"], cache["b"] = r, r
+assert cache["a"] is r
+cache["c"] = r
+assert list(cache) == ["a", "c"]
+cache.configure(max_size=1)
+assert list(cache) == ["c"]
+
+# time to live
+cache = InstanceCache(ttl=0.05)
+cache["a"] = r
+assert cache.get("a") is r
+time.sleep(0.1)
+assert cache.get("a") is None
+assert len(cache) == 0
+
+# weak references
+cache = InstanceCache(weak=True)
+rw = Resolver("sids_weak", sid_templates)
+cache["w"], cache["r"] = rw, r
+assert cache["w"] is rw
+Resolver.drop("sids_weak")  # also held by the default instance cache
+del rw
+assert list(cache) == ["r"]
+cache.configure(weak=False)
+assert cache["r"] is r
+
+# memory accounting
+rm = Resolver("sids_memory", sid_templates)
+empty = rm.get_memory_usage()
+assert empty['total'] == sum(v for k, v in empty.items() if k != 'total')
+assert empty['compiled'] > 0
+for s in test_strings:
+    rm.resolve_first(s)
+    rm.resolve_all(s)
+used = rm.get_memory_usage()
+assert used['results'] > empty['results']
+assert used['compiled'] >= empty['compiled']  # matchers are compiled on first use
+rm.clear_caches()
+assert rm.get_memory_usage()['results'] == empty['results']
+assert instance_cache.get_memory_usage()["sids_memory"] > 0
+Resolver.drop("sids_memory")
+
+# result caches are bounded, and do not change the results
+rs = Resolver.get("sids_small_result_cache") or Resolver("sids_small_result_cache", sid_templates, result_cache_size=10)
+rn = Resolver.get("sids_no_result_cache") or Resolver("sids_no_result_cache", sid_templates, result_cache_size=0)
+
+start = datetime.now()
+
+for i, s in enumerate(test_strings):
+    log.info(f'Input {i}: {s}')
+
+    for __ in range(2):
+        assert rs.resolve_first(s) == rn.resolve_first(s) == r.resolve_first(s)
+        assert rs.resolve_all(s) == rn.resolve_all(s) == r.resolve_all(s)
+        assert rs.resolve_one(s, "shot__file") == rn.resolve_one(s, "shot__file") == r.resolve_one(s, "shot__file")
+    assert len(rs._first_results) <= 10
+    assert len(rs._one_results) <= 10
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,48 @@
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+ri = Resolver.get("sids_interned") or Resolver(id="sids_interned", patterns=sid_templates, intern_values=True)
+
+start = datetime.now()
+previous: dict = {}
+
+for i, s in enumerate(test_strings):
+
+    log.info('*'*100)
+    log.info(f'Input {i}: {s}')
+
+    label, data = r.resolve_first(s)
+    label_interned, data_interned = ri.resolve_first(s)
+
+    # interning does not change the result
+    assert label == label_interned
+    assert data == data_interned
+
+    if not data_interned:
+        continue
+
+    log.info(f"\t\t{label_interned}: {data_interned}")
+
+    # equal values are shared between results
+    for key, value in data_interned.items():
+        if key in previous and previous[key] == value:
+            assert previous[key] is value
+        previous[key] = value
+
+    # enum values always are the same object
+    task = data_interned.get('task')
+    if task in ('board', 'layout', 'anim', 'fx', 'render', 'comp'):
+        assert task is ri.resolve_all(s)[label_interned]['task']
+
+    log.info(' ' * 50)
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"Pattern lines: {len(r.get_keys())}. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
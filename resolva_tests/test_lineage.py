@@ -0,0 +1,36 @@
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+ru = Resolver.get("sids_unanchored") or Resolver(id="sids_unanchored", patterns=sid_templates, anchor_end=False)
+
+start = datetime.now()
+
+for i, s in enumerate(test_strings):
+    log.info(f'Input {i}: {s}')
+
+    for resolver in (r, ru):
+        # same result as resolving each prefix with resolve_first
+        parts = s.split("/")
+        expected = []
+        for count in range(1, len(parts) + 1):
+            prefix = "/".join(parts[:count])
+            label, data = resolver.resolve_first(prefix)
+            if label:
+                expected.append((prefix, label, data))
+
+        lineage = resolver.resolve_lineage(s)
+        for prefix, label, data in lineage:
+            log.info(f"\t\t{prefix} -> {label}")
+        assert lineage == expected
+
+assert r.resolve_lineage("") == []
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,50 @@
+import os
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+ru = Resolver.get("sids_unanchored") or Resolver("sids_unanchored", sid_templates, anchor_start=False, anchor_end=False)
+rn = Resolver.get("sids_no_result_cache") or Resolver("sids_no_result_cache", sid_templates, result_cache_size=0)
+
+# patterns without placeholders, and duplicate placeholders, match like resolve methods
+rd = Resolver.get("duplicates") or Resolver("duplicates", {"fixed": "a/b", "same": "{x}/{x}", "any": "{x}/{y}"})
+assert rd.label_of("a/a") == rd.resolve_first("a/a")[0] == "same"
+assert not rd.matches("a/b", "fixed")
+assert rd.matches("a/a", "same")
+try:
+    rd.matches("a/c", "same")
+    raise AssertionError("different values for a duplicate placeholder should raise")
+except Exception as e:
+    assert "Different extracted values" in str(e)
+
+labels = r.get_labels()
+start = datetime.now()
+
+for i, s in enumerate(test_strings + ["", "cache/tmp/file.tmp", "hamlet/x"]):
+    log.info(f'Input {i}: {s}')
+
+    for resolver in (r, ru, rn):
+        label = resolver.resolve_first(s)[0]
+        assert resolver.label_of(s) == label
+        assert resolver.label_of(s) == label  # cached
+        assert resolver.labels_of([s]) == [label]
+        for each in labels:
+            found = bool(resolver.resolve_one(s, each))
+            assert resolver.matches(s, each) == found
+            assert resolver.matches_many([s], each) == [found]
+
+    # bytes
+    b = os.fsencode(s)
+    assert r.label_of(b) == r.resolve_first(b)[0]
+    assert all(r.matches(b, each) == bool(r.resolve_one(b, each)) for each in labels)
+
+assert r.matches(test_strings[0], "unknown label") is False
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,52 @@
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+rm = Resolver("sids_misses", sid_templates)
+rn = Resolver("sids_no_miss_cache", sid_templates, miss_cache_size=0)
+
+misses = [f"hamlet/s/sq010/sh0010/anim/v001/w/tmp/autosave_{i}.ma" for i in range(20)] + \
+         [f"cache/tmp/{i}/file.tmp" for i in range(20)] + \
+         [f"hamlet/x/{i}" for i in range(20)]
+
+# misses are not kept in the result caches
+size = len(rm._first_results)
+for s in misses:
+    assert rm.resolve_first(s) == (None, None)
+    assert rm.resolve_all(s) == {}
+assert len(rm._first_results) == size
+assert not rm._all_results
+assert all(rm._is_known_miss(s) for s in misses)
+assert "cache/tmp/5/file.tmp" not in rm._misses  # covered by its dead directory
+
+# directories where nothing can match are known, and cover their subtree
+assert "cache" in rm._dead_directories
+assert "hamlet/x" in rm._dead_directories
+assert "hamlet/s/sq010/sh0010/anim/v001/w/tmp" not in rm._dead_directories  # "{node}/{ext}" may match below
+assert rm._is_known_miss("cache/other/file.tmp")
+assert not rm._is_known_miss("hamlet/s/sq010")
+
+# the miss cache is bounded
+rb = Resolver("sids_small_miss_cache", sid_templates, miss_cache_size=10)
+for s in misses:
+    rb.resolve_first(s)
+assert len(rb._misses) <= 10
+assert len(rb._directories) <= 10
+
+start = datetime.now()
+
+for i, s in enumerate(test_strings + misses + ["hamlet/x", "cache", "/cache/tmp"]):
+    log.info(f'Input {i}: {s}')
+
+    # the miss cache does not change the results
+    for __ in range(2):
+        assert rm.resolve_first(s) == rn.resolve_first(s)
+        assert rm.resolve_all(s) == rn.resolve_all(s)
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,52 @@
+from datetime import datetime
+from resolva import Resolver, template  # type: ignore
+from resolva_tests.data import test_root, test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+rr = Resolver.get("sids_regex_only") or Resolver("sids_regex_only", sid_templates, split_matchers=False)
+
+# matching labels with the same placeholder layout share their data
+patterns = {"maya_file": "/mnt/{prod}/{seq}/{shot}/v{version:(\\d+)}/{ext:(ma|mb)}",
+            "any_file": "/mnt/{prod}/{seq}/{shot}/v{version:(\\d+)}/{ext}",
+            "other_file": "/mnt/{prod}/{seq}/{shot}/v{version:(\\d+)}/{name}.{ext}",  # not segment aligned
+            "fixed": "/mnt/{prod}/{seq}/fixed/ma",  # shares checks, but not the layout
+            "no_placeholder": "/mnt/fixed/path/fixed/ma",
+            "sequence": "/mnt/{prod}/{seq:(sq\\d+)}"}
+matcher, labels = template.construct_multi_matcher(patterns)
+assert labels == ["maya_file", "any_file", "fixed", "no_placeholder", "sequence"]
+
+found = matcher("/mnt/hamlet/sq010/sh010/v001/ma".split("/"))
+assert list(found) == ["maya_file", "any_file"]
+assert found["maya_file"] is found["any_file"]
+assert found["maya_file"] == {'prod': 'hamlet', 'seq': 'sq010', 'shot': 'sh010', 'version': '001', 'ext': 'ma'}
+assert list(matcher("/mnt/hamlet/sq010/sh010/v001/nk".split("/"))) == ["any_file"]
+assert list(matcher("/mnt/fixed/path/fixed/ma".split("/"))) == ["fixed"]  # "no_placeholder" never matches
+assert matcher("/mnt/hamlet/sq010".split("/")) == {"sequence": {"prod": "hamlet", "seq": "sq010"}}
+assert matcher("/mnt/hamlet/sh010".split("/")) == {}
+
+rp = Resolver.get("multi_patterns") or Resolver("multi_patterns", patterns)
+rpr = Resolver.get("multi_patterns_regex") or Resolver("multi_patterns_regex", patterns, split_matchers=False)
+for s in ["/mnt/hamlet/sq010/sh010/v001/ma", "/mnt/hamlet/sq010/sh010/v001/ma\n", "/mnt/hamlet/sq010/sh010/v001/a.ma",
+          "/mnt/hamlet/sq010/fixed/ma", "/mnt/fixed/path/fixed/ma", "/mnt/hamlet/sq010", "/mnt/hamlet/sq010/sh010/v/ma"]:
+    assert rp.resolve_all(s) == rpr.resolve_all(s)
+
+# identical results, over the long sids list
+with (test_root / "ressources" / "hamlet.sids.txt").open() as f:
+    long_strings = f.read().splitlines()
+
+start = datetime.now()
+
+for i, s in enumerate(test_strings + long_strings + ["hamlet/s\n", "hamlet/s/sq010/sh0010/anim/v001/w/ma\n"]):
+    log.info(f'Input {i}: {s}')
+
+    found = r.resolve_all(s)
+    assert found == rr.resolve_all(s)
+    assert list(found) == list(rr.resolve_all(s))  # in pattern order
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,63 @@
+import concurrent.futures
+import copy
+import pickle
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva.resolver import instance_cache  # type: ignore
+from resolva.utils import ResolvaException  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver("sids_pickled", sid_templates, analyze=True, intern_values=True)
+del instance_cache["sids_pickled"]
+
+data = pickle.dumps(r)
+rp = pickle.loads(data)
+
+# unpickling has no side effect on the instance cache
+assert Resolver.get("sids_pickled") is None
+assert rp.get_id() == "sids_pickled"
+assert rp.get_patterns() == r.get_patterns()
+assert rp.get_hierarchy() == r.get_hierarchy()
+assert rp.analyze() == r.analyze()
+assert rp.get_regexes() == r.get_regexes()
+
+# copies are rebuilt the same way
+for other in (copy.copy(r), copy.deepcopy(r)):
+    assert other is not r
+    assert other.resolve_first("hamlet/s/sq010") == r.resolve_first("hamlet/s/sq010")
+
+# the state is versioned
+state = r.__getstate__()
+state["version"] = 0
+try:
+    Resolver.__new__(Resolver).__setstate__(state)
+    raise AssertionError("an unknown state version should raise")
+except ResolvaException:
+    pass
+
+
+# resolvers can be sent to worker processes, here with their bound methods
+# (a function of this test module could not be unpickled while the module is being imported)
+with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+    assert list(executor.map(r.resolve_first, test_strings[:10])) == [r.resolve_first(s) for s in test_strings[:10]]
+
+start = datetime.now()
+
+for i, s in enumerate(test_strings):
+    log.info(f'Input {i}: {s}')
+
+    assert rp.resolve_first(s) == r.resolve_first(s)
+    assert rp.resolve_all(s) == r.resolve_all(s)
+    label, found = rp.resolve_first(s)
+    if label:
+        assert rp.format_one(found, label) == r.format_one(found, label)
+        columns = {key: [value] for key, value in found.items()}
+        assert rp.format_many(label, columns) == r.format_many(label, columns)
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,74 @@
+from datetime import datetime
+import pickle
+import re
+
+from resolva import Resolver, template  # type: ignore
+from resolva.utils import ResolvaException  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+
+class NoLookAround:
+    """
+    A regex backend without look-arounds, and a "$" that only matches at the end, like re2.
+    """
+    error = ValueError
+
+    @staticmethod
+    def compile(source):
+        if '(?=' in source or '(?!' in source:
+            raise ValueError(f'look-arounds are not supported: {source}')
+        return re.compile(source.replace(r'(?:\n)?\z', r'\n?\Z'))
+
+
+template.register_regex_backend('no_look_around', NoLookAround, linear=True, end_anchor=r'(?:\n)?\z')
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+rb = Resolver.get("sids_backend") or Resolver("sids_backend", sid_templates, regex_backend="no_look_around",
+                                                split_matchers=False)
+
+# unknown, or not installed backends
+for backend in ("unknown", "re2", "regex"):
+    try:
+        __import__(backend)
+    except ImportError:
+        try:
+            Resolver("sids_missing_backend", sid_templates, regex_backend=backend)
+            assert False, f"{backend} should not be usable"
+        except ResolvaException:
+            pass
+
+# per pattern fallback, and linear backends are not heavy
+patterns = {"look_ahead": r"{name:(\w+(?=_))}_{version:(v\d+)}", "heavy": "{a:(.*)}_{b:(.*)}_{c:(.*)}"}
+rf = Resolver.get("backend_fallback") or Resolver("backend_fallback", patterns, regex_backend="no_look_around")
+report = rf.get_cost_report()
+assert report["look_ahead"]["backend"] == "re"
+assert report["heavy"]["backend"] == "no_look_around"
+assert not report["heavy"]["heavy"]
+assert rf.resolve_first("shot_v001") == ("look_ahead", {"name": "shot", "version": "v001"})
+assert rf.resolve_all("a_b_c\n") == Resolver("backend_fallback_re", patterns).resolve_all("a_b_c\n")
+
+# the backend is kept through pickling
+rp = pickle.loads(pickle.dumps(rb))
+assert all(v["backend"] == "no_look_around" for v in rp.get_cost_report().values())
+
+start = datetime.now()
+
+for i, s in enumerate(test_strings):
+    log.info(f'Input {i}: {s}')
+
+    # the backend does not change the results
+    for string in (s, s + "\n"):
+        assert rb.resolve_first(string) == r.resolve_first(string)
+        assert rb.resolve_all(string) == r.resolve_all(string)
+        assert rp.label_of(string) == r.label_of(string)
+        for label in ("shot__file", "asset__file"):
+            assert rb.resolve_one(string, label) == r.resolve_one(string, label)
+            assert rb.matches(string, label) == r.matches(string, label)
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
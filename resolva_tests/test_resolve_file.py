@@ -0,0 +1,55 @@
+import os
+import tempfile
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+
+# mixed line endings, empty lines, and an undecodable path
+lines = [s.encode() for s in test_strings] + [b"", b"hamlet/s/sq\xff10", b"hamlet/s/sq010\r"]
+with tempfile.NamedTemporaryFile("wb", suffix=".txt", delete=False) as f:
+    f.write(b"\n".join(lines))
+    f.write(b"\nhamlet/a")  # no final newline
+
+strings = [os.fsdecode(line.rstrip(b"\r")) for line in lines] + ["hamlet/a"]
+
+start = datetime.now()
+
+expected_first = [(s, *r.resolve_first(s)) for s in strings if r.resolve_first(s)[0]]
+expected_all = [(s, label, data) for s in strings for label, data in r.resolve_all(s).items()]
+expected_one = [(s, "shot__sequence", r.resolve_one(s, "shot__sequence")) for s in strings
+                if r.resolve_one(s, "shot__sequence")]
+expected_label = [(s, r.label_of(s), None) for s in strings if r.label_of(s)]
+
+for workers, chunk_size in [(1, 1 << 24), (2, 100)]:
+    log.info(f"Workers: {workers}, chunk size: {chunk_size}")
+
+    found = list(r.resolve_file(f.name, workers=workers, chunk_size=chunk_size))
+    assert found == expected_first, found
+
+    found = list(r.resolve_file(f.name, "all", workers=workers, chunk_size=chunk_size))
+    assert found == expected_all
+
+    found = list(r.resolve_file(f.name, "one", "shot__sequence", workers=workers, chunk_size=chunk_size))
+    assert found == expected_one
+
+    found = list(r.resolve_file(f.name, "label", workers=workers, chunk_size=chunk_size))
+    assert found == expected_label
+
+sunk: list = []
+assert r.resolve_file(f.name, sink=sunk.extend) == len(expected_first)
+assert sunk == expected_first
+
+for path, label, data in expected_first:
+    log.info(f"\t{path} -> {label} {data}")
+
+os.remove(f.name)
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {len(strings)} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,63 @@
+from datetime import datetime
+from resolva import Resolver, ResolverRouter  # type: ignore
+from resolva.utils import ResolvaException  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates, sid_templates_pre  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+# one Resolver per project, with the project name in the patterns
+projects = ["hamlet", "othello", "macbeth", "lear"]
+for project in projects:
+    patterns = {k: v.replace("hamlet", project) for k, v in sid_templates.items()}
+    Resolver.get(f"sids_{project}") or Resolver(f"sids_{project}", patterns)
+
+# generic patterns, with declared roots, and without roots (receives all strings)
+generic = Resolver.get("sids_generic") or Resolver("sids_generic", sid_templates_pre)
+declared = Resolver.get("sids_declared") or Resolver("sids_declared", sid_templates_pre)
+
+ids = [f"sids_{project}" for project in projects] + ["sids_declared", "sids_generic"]
+router = ResolverRouter(ids, roots={"sids_declared": ["tempest/"]})
+resolvers = [Resolver.get(id) for id in ids]
+
+assert router.get_ids() == ids
+assert router.get_roots()["sids_declared"] == ["tempest/"]
+assert "othello/" in router.get_roots()["sids_othello"]
+assert router.get_roots()["sids_generic"] == [""]
+assert router.get_resolvers("othello/s/sq010") == [Resolver.get("sids_othello"), generic]
+assert router.get_resolvers("tempest/s/sq010") == [declared, generic]
+assert router.get_resolvers("other/s/sq010") == [generic]
+
+try:
+    router.add("sids_generic")
+    assert False, "ids are routed once"
+except ResolvaException:
+    pass
+try:
+    ResolverRouter(["no_such_resolver"])
+    assert False, "unknown ids raise"
+except ResolvaException:
+    pass
+
+strings = [s.replace("hamlet", project) for project in projects + ["tempest", "other"] for s in test_strings]
+
+start = datetime.now()
+
+for i, s in enumerate(strings):
+    log.info(f'Input {i}: {s}')
+
+    # same results as trying all Resolvers in turn (the declared Resolver only for its root)
+    candidates = [r for r in resolvers if r is not declared or s.startswith("tempest/")]
+    expected = next(((r.get_id(),) + r.resolve_first(s) for r in candidates if r.resolve_first(s)[0]),
+                    (None, None, None))
+    assert router.resolve_first(s) == expected
+    assert router.resolve_all(s) == {r.get_id(): r.resolve_all(s) for r in candidates if r.resolve_all(s)}
+
+# batches, in worker processes
+assert router.resolve_many(strings) == [router.resolve_first(s) for s in strings]
+assert router.resolve_many(strings, "all", workers=2, batch_size=50) == [router.resolve_all(s) for s in strings]
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
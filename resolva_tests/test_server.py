@@ -0,0 +1,179 @@
+from datetime import datetime
+import os
+import socket
+import tempfile
+import threading
+
+from resolva import Resolver  # type: ignore
+from resolva import server as server_module  # type: ignore
+from resolva.server import ResolverClient  # type: ignore
+from resolva.utils import ResolvaException  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates, sid_templates_pre  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+
+start = datetime.now()
+
+# without server, clients resolve in-process
+with tempfile.TemporaryDirectory() as directory:
+    local = ResolverClient("sids_no_server", sid_templates, path=os.path.join(directory, "resolva.sock"))
+    assert not local.is_connected()
+    assert local.resolve_many(test_strings) == [r.resolve_first(s) for s in test_strings]
+
+# without Unix domain sockets (Windows), there is no server, and the server tests are skipped
+if not hasattr(socket, "AF_UNIX"):
+    assert not hasattr(server_module, "ResolverServer")
+    assert not ResolverClient("sids_no_server").is_connected()
+    log.warning("No Unix domain sockets, skipping the server tests.")
+
+else:
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "resolva.sock")
+    server = server_module.ResolverServer(path, [r])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        server_module.ResolverServer(path)
+        assert False, "only one server per socket"
+    except ResolvaException:
+        pass
+
+    client = ResolverClient("sids", path=path)
+    assert client.is_connected()
+    assert client.get_labels() == r.get_labels()
+
+    for i, s in enumerate(test_strings):
+        log.info(f'Input {i}: {s}')
+
+        assert client.resolve_first(s) == r.resolve_first(s)
+        assert client.resolve_all(s) == r.resolve_all(s)
+        assert client.label_of(s) == r.label_of(s)
+        label, data = r.resolve_first(s)
+        if label:
+            assert client.resolve_one(s, label) == data
+            assert client.matches(s, label)
+            assert client.format_first(data) == r.format_first(data)
+            assert client.format_one(data, label) == r.format_one(data, label)
+            assert client.format_all(data) == r.format_all(data)
+
+    # batched and pipelined
+    strings = test_strings * 20
+    assert client.resolve_many(strings) == [r.resolve_first(s) for s in strings]
+    assert client.resolve_many(strings, "all") == [r.resolve_all(s) for s in strings]
+    assert client.labels_of(strings) == r.labels_of(strings)
+    assert client.matches_many(strings, "shot__file") == r.matches_many(strings, "shot__file")
+    assert client._call_many('label_of', [(s,) for s in strings], batch_size=7) == r.labels_of(strings)
+
+    # large batches, with large responses, are sent while the responses are read, without blocking
+    tree = {"tree": r"{root:(hamlet|othello)}/{path:(.*)}"}
+    client_tree = ResolverClient("sids_server_tree", tree, path=path)
+    long_strings = [f"hamlet/{n:06d}/{'x' * 170}" for n in range(20000)]
+    assert client_tree.resolve_many(long_strings, "all") == \
+        [{"tree": {"root": "hamlet", "path": s[7:]}} for s in long_strings]
+    assert client_tree.is_connected()
+
+    # errors are raised by the client, and the connection stays usable
+    duplicates = {"twice": "{project}/{type}/{project}"}
+    client_duplicates = ResolverClient("sids_duplicates", duplicates, path=path)
+    try:
+        client_duplicates.resolve_first("hamlet/s/othello")
+        assert False, "duplicate placeholders with different values raise"
+    except ResolvaException:
+        pass
+    assert client_duplicates.resolve_first("hamlet/s/hamlet") == ("twice", {"project": "hamlet", "type": "s"})
+    batch = ["hamlet/s/hamlet"] * 20 + ["hamlet/s/othello"] + ["hamlet/s/hamlet"] * 20
+    try:
+        client_duplicates._call_many('resolve_first', [(s,) for s in batch], batch_size=3)
+        assert False, "an error in one of the batches raises"
+    except ResolvaException:
+        pass
+    assert client_duplicates.resolve_many(batch[:20]) == [("twice", {"project": "hamlet", "type": "s"})] * 20
+    assert client_duplicates.is_connected()
+
+    # malformed requests are answered with an error, and the connection stays usable
+    try:
+        client._call('format_first', ['x'])
+        assert False, "malformed calls raise"
+    except ResolvaException:
+        pass
+    assert client.is_connected()
+    assert client.resolve_first(test_strings[0]) == r.resolve_first(test_strings[0])
+
+    raw = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    raw.connect(path)
+    stream = raw.makefile('rb')
+    server_module.send_message(raw, ["not", "a", "request"])
+    assert "error" in server_module.receive_message(stream)
+    server_module.send_message(raw, {"id": 1, "resolver": "sids", "method": "get_labels"})
+    assert server_module.receive_message(stream) == {"id": 1, "result": r.get_labels()}
+    stream.close()
+    raw.close()
+
+    # a client that lost its connection resolves in-process, and reconnects after the retry interval
+    client_retry = ResolverClient("sids", path=path, retry_interval=0)
+    client_retry._socket.shutdown(socket.SHUT_RDWR)
+    assert client_retry.resolve_first(test_strings[0]) == r.resolve_first(test_strings[0])
+    assert not client_retry.is_connected()
+    assert client_retry.resolve_first(test_strings[0]) == r.resolve_first(test_strings[0])
+    assert client_retry.is_connected()
+    client_retry.close()
+    assert client_retry.resolve_first(test_strings[0]) == r.resolve_first(test_strings[0])
+    assert not client_retry.is_connected()
+
+    # connections are only made between processes of the same user
+    assert server_module.get_peer_uid(client._socket) in (None, os.getuid())
+    assert server.verify_request(client._socket, None)
+    get_peer_uid = server_module.get_peer_uid
+    server_module.get_peer_uid = lambda connection: os.getuid() + 1
+    try:
+        assert not server.verify_request(client._socket, None)
+        assert not ResolverClient("sids", path=path).is_connected()
+    finally:
+        server_module.get_peer_uid = get_peer_uid
+
+    # the default socket is in the runtime directory, or in a private directory
+    environment = {k: os.environ.pop(k) for k in ("RESOLVA_SOCKET", "XDG_RUNTIME_DIR") if k in os.environ}
+    temporary = tempfile.tempdir
+    tempfile.tempdir = directory
+    try:
+        os.environ["XDG_RUNTIME_DIR"] = directory
+        assert server_module.get_default_socket_path() == os.path.join(directory, "resolva.sock")
+        del os.environ["XDG_RUNTIME_DIR"]
+        private = os.path.join(directory, f"resolva-{os.getuid()}")
+        assert server_module.get_default_socket_path(create=True) == os.path.join(private, "resolva.sock")
+        assert os.stat(private).st_mode & 0o777 == 0o700
+        os.chmod(private, 0o755)
+        try:
+            server_module.get_default_socket_path(create=True)
+            assert False, "a directory accessible to others is refused"
+        except ResolvaException:
+            pass
+        os.rmdir(private)
+    finally:
+        tempfile.tempdir = temporary
+        os.environ.update(environment)
+
+    # unknown Resolvers are registered by the client, with their options
+    client_pre = ResolverClient("sids_server_pre", sid_templates_pre, path=path, result_cache_size=0)
+    local_pre = Resolver.get("sids_local_pre") or Resolver("sids_local_pre", sid_templates_pre)
+    assert client_pre.resolve_many(test_strings) == [local_pre.resolve_first(s) for s in test_strings]
+    assert server.resolvers["sids_server_pre"]._options["result_cache_size"] == 0
+    try:
+        ResolverClient("sids_unknown", path=path).resolve_first("hamlet")
+        assert False, "unknown Resolvers without patterns raise"
+    except ResolvaException:
+        pass
+
+    server.shutdown()
+    server.server_close()
+    assert not os.path.exists(path)
+    os.rmdir(directory)
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {len(test_strings)} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,62 @@
+from datetime import datetime
+from resolva import Resolver, template  # type: ignore
+from resolva_tests.data import test_root, test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+rr = Resolver.get("sids_regex_only") or Resolver("sids_regex_only", sid_templates, split_matchers=False)
+ri = Resolver.get("sids_interned") or Resolver(id="sids_interned", patterns=sid_templates, intern_values=True)
+
+# every sid pattern is segment aligned, and gets a split matcher
+assert all(r._get_split_matcher(label) is not None for label in r.get_labels())
+assert all(rr._get_split_matcher(label) is None for label in rr.get_labels())
+
+# segments with literal text, default placeholders and expressions
+patterns = {"file": r"/mnt/{prod}/sq{seq:(\d+)}/{shot:(sh010|sh020)}/v{version}/{name}_final/{ext:(ma|mb)}",
+            "two_placeholders": r"/mnt/{prod}/{shot}_{version}",
+            "fixed": "/mnt/{prod}/fixed",
+            "duplicate": "/mnt/{prod}/{prod}",
+            "unaligned": "/mnt/{prod}/{path:(.*)}"}
+matchers = {k: template.construct_split_matcher(v) for k, v in patterns.items()}
+assert matchers["file"] is not None
+assert matchers["fixed"] is not None
+assert matchers["two_placeholders"] is None
+assert matchers["duplicate"] is None
+assert matchers["unaligned"] is None
+assert template.construct_split_matcher(r"{name:(\w+)}/v.{ext}") is None  # "." is a regex
+assert template.construct_split_matcher(r"{name:(\w+)}/v.{ext}", strict=True) is not None
+
+del patterns["duplicate"]  # different values raise an exception
+rp = Resolver.get("split_patterns") or Resolver("split_patterns", patterns)
+rpr = Resolver.get("split_patterns_regex") or Resolver("split_patterns_regex", patterns, split_matchers=False)
+for s in ["/mnt/hamlet/sq010/sh010/v001/anim_final/ma", "/mnt/hamlet/sq010/sh030/v001/anim_final/ma",
+          "/mnt/hamlet/sq/sh010/v001/anim_final/ma", "/mnt/hamlet/sq010/sh010/v/_final/mb",
+          "/mnt/hamlet/sq010/sh010/001/anim_final/ma", "/mnt/hamlet/sq010/sh010/v001/anim_fina/ma",
+          "/mnt/hamlet/sq010/sh010/v001/anim_final/ma\n", "/mnt/hamlet/sh010_v001", "/mnt/hamlet/fixed",
+          "/mnt/hamlet/hamlet", "/mnt/hamlet/a/b/c", "/mnt/hamlet/fixed\n", "mnt/hamlet/fixed"]:
+    assert rp.resolve_first(s) == rpr.resolve_first(s)
+    assert rp.resolve_all(s) == rpr.resolve_all(s)
+
+# identical results, over the long sids list
+with (test_root / "ressources" / "hamlet.sids.txt").open() as f:
+    long_strings = f.read().splitlines()
+
+start = datetime.now()
+
+for i, s in enumerate(test_strings + long_strings + ["hamlet/s\n", "hamlet/s/sq010/sh0010/anim/v001/w/ma\n"]):
+    log.info(f'Input {i}: {s}')
+
+    assert r.resolve_first(s) == rr.resolve_first(s)
+    assert r.resolve_all(s) == rr.resolve_all(s)
+
+    # interning applies to split matchers
+    label, data = ri.resolve_first(s)
+    if data and data.get('task') in ('board', 'layout', 'anim', 'fx', 'render', 'comp'):
+        assert data['task'] is ri.resolve_all(s)[label]['task']
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
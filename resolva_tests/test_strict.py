@@ -0,0 +1,61 @@
+from datetime import datetime
+from resolva import Resolver  # type: ignore
+from resolva_tests.data import test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+patterns = {"maya_file": r"/mnt/prods/{prod}/shots/{seq}/{shot}_{version:(v\d\d\d)}.{ext:(ma|mb)}",
+            "any_file": r"/mnt/prods/{prod}/shots/{seq}/{shot}_{version:(v\d\d\d)}.{ext}",
+            "sequence": "/mnt/prods/{prod}/shots/{seq}",
+            "project": "/mnt/prods/{prod}"}
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+rp = Resolver("prods", patterns)
+rs = Resolver("prods_strict", patterns, strict=True)
+
+# the unescaped "." matches any character, unless in strict mode
+assert rp.resolve_first("/mnt/prods/hamlet/shots/sq010/sh010_v012_ma")[0] == "maya_file"
+assert rs.resolve_first("/mnt/prods/hamlet/shots/sq010/sh010_v012_ma") == (None, None)
+assert rs.resolve_first("/mnt/prods/hamlet/shots/sq010/sh010_v012.ma")[0] == "maya_file"
+assert rs.format_one(rs.resolve_one("/mnt/prods/hamlet/shots/sq010/sh010_v012.nk", "any_file"), "any_file") == \
+       "/mnt/prods/hamlet/shots/sq010/sh010_v012.nk"
+
+# strict patterns are segment aligned, and part of the hierarchy
+assert rs.get_hierarchy()["maya_file"] == "sequence"
+assert rp.get_hierarchy()["maya_file"] == "sequence"
+assert rs.get_children_of("sequence") == ["maya_file", "any_file"]
+
+strings = test_strings + [
+    "/mnt/prods/hamlet/shots/sq010/sh010_v012.ma",
+    "/mnt/prods/hamlet/shots/sq010/sh010_v012.ma\n",
+    "/mnt/prods/hamlet/shots/sq010/sh010_v012_ma",
+    "/mnt/prods/hamlet/shots/sq010",
+    "/mnt/prods/hamlet",
+    "/mnt/other/hamlet/shots/sq010",
+    b"/mnt/prods/hamlet/shots/sq010/sh010_v012.nk",
+    b"/mnt/other/hamlet",
+]
+
+start = datetime.now()
+
+for i, s in enumerate(strings):
+    log.info(f'Input {i}: {s!r}')
+
+    for resolver in (r, rp, rs):
+        # literal checks do not change the results
+        regexes = resolver.get_regexes() if isinstance(s, str) else resolver._get_bytes_regexes()
+        expected = {}
+        for label, regex in regexes.items():
+            match = regex.search(s)
+            if match and match.groupdict():
+                expected[label] = resolver.resolve_one(s, label)
+        assert resolver.resolve_all(s) == expected
+        assert resolver.resolve_first(s) == (next(iter(expected.items())) if expected else (None, None))
+        for label in resolver.get_labels():
+            assert bool(resolver.resolve_one(s, label)) == (label in expected)
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {i} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")
@@ -0,0 +1,116 @@
+from datetime import datetime
+import os
+import shutil
+import tempfile
+
+from resolva import Resolver  # type: ignore
+from resolva.utils import ResolvaException  # type: ignore
+from resolva.watch import InotifySource, QueueSource, ResultIndex, Watcher  # type: ignore
+from resolva_tests.data import test_root, test_strings  # type: ignore
+from resolva_tests.pattern import sid_templates  # type: ignore
+
+from resolva.utils import log  # type: ignore
+log.setLevel(log.INFO)  # type: ignore
+
+r = Resolver.get("sids") or Resolver(id="sids", patterns=sid_templates)
+
+with (test_root / "ressources" / "hamlet.sids.txt").open() as f:
+    strings = f.read().splitlines()
+
+start = datetime.now()
+
+# the index follows the changes of a fake source
+source = QueueSource()
+watcher = Watcher(r, source, root="/mnt/prods")
+for s in strings + ["/tmp/outside"]:
+    source.put("add", f"/mnt/prods/{s}")
+events = watcher.poll(timeout=0)
+expected = {s: r.resolve_first(s) for s in strings if r.resolve_first(s)[0]}
+assert dict(watcher.index.items()) == expected
+assert {path: (label, data) for kind, path, label, data in events} == expected
+assert len(events) == len(expected)
+assert watcher.index.get_paths("shot__sequence") == {s for s, v in expected.items() if v[0] == "shot__sequence"}
+
+# known paths give no event, and bursts are coalesced
+source.put("add", "/mnt/prods/hamlet/s/sq010")
+source.put("add", "/mnt/prods/hamlet/s/sq010/sh9999/anim", True)
+source.put("remove", "/mnt/prods/hamlet/s/sq010/sh9999/anim", True)
+source.put("remove", "/mnt/prods/hamlet/a/char/claudius/rig/v001/w/ma")
+source.put("add", "/mnt/prods/hamlet/a/char/claudius/rig/v001/w/ma")
+assert watcher.poll(timeout=0) == []
+
+# a directory removed and added again within a burst (replaced by another one) loses its subtree
+replaced = {s for s in expected if s.startswith("hamlet/s/sq030/")}
+assert replaced
+source.put("remove", "/mnt/prods/hamlet/s/sq030", True)
+source.put("add", "/mnt/prods/hamlet/s/sq030", True)
+events = watcher.poll(timeout=0)
+assert {path for kind, path, label, data in events} == replaced
+assert all(kind == "remove" for kind, path, label, data in events)
+assert "hamlet/s/sq030" in watcher.index
+for path in replaced:
+    assert path not in watcher.index
+    del expected[path]
+assert dict(watcher.index.items()) == expected
+
+# an indexed path added again that does not resolve (anymore) is removed, without its subtree
+assert r.resolve_first("hamlet/s/sq030/notes")[0] is None
+watcher.index.add("hamlet/s/sq030/notes", "shot__shot", {"project": "hamlet", "type": "s", "sequence": "sq030"})
+watcher.index.add("hamlet/s/sq030/notes/sh0010", "shot__shot", {"project": "hamlet", "type": "s", "sequence": "sq030"})
+source.put("add", "/mnt/prods/hamlet/s/sq030/notes", True)
+assert watcher.poll(timeout=0) == [("remove", "hamlet/s/sq030/notes", "shot__shot",
+                                    {"project": "hamlet", "type": "s", "sequence": "sq030"})]
+assert "hamlet/s/sq030/notes" not in watcher.index
+assert [path for path, label, data in watcher.index.remove("hamlet/s/sq030/notes")] == ["hamlet/s/sq030/notes/sh0010"]
+assert dict(watcher.index.items()) == expected
+
+# removing a directory removes its subtree
+below = {s for s in expected if s.startswith("hamlet/s/sq010/")}
+assert below
+source.put("remove", "/mnt/prods/hamlet/s/sq010", True)
+events = watcher.poll(timeout=0)
+assert {path for kind, path, label, data in events} == below | {"hamlet/s/sq010"}
+assert all(kind == "remove" for kind, path, label, data in events)
+assert len(watcher.index) == len(expected) - len(below) - 1
+assert watcher.poll(timeout=0) == []
+
+# the index tree is pruned with the removed paths
+index = ResultIndex()
+for s in test_strings:
+    label, data = r.resolve_first(s)
+    if label:
+        index.add(s, label, data)
+for s in list(index):
+    index.remove(s)
+assert len(index) == 0 and not index._children
+
+# inotify, on Linux
+try:
+    directory = tempfile.mkdtemp()
+    inotify = InotifySource(directory)
+except ResolvaException as error:
+    log.info(f"Skipping inotify: {error}")
+else:
+    watcher = Watcher(r, inotify, root=directory)
+    os.makedirs(os.path.join(directory, "hamlet/s/sq010/sh0010/anim/v001/w"))
+    open(os.path.join(directory, "hamlet/s/sq010/sh0010/anim/v001/w/ma"), "w").close()
+    events = watcher.poll(timeout=2)
+    assert watcher.index.get("hamlet/s/sq010/sh0010/anim/v001/w/ma")[0] == "shot__file"  # type: ignore
+    assert len(events) == len(watcher.index) == 8
+
+    os.rename(os.path.join(directory, "hamlet/s/sq010"), os.path.join(directory, "sq010"))
+    events = watcher.poll(timeout=2)
+    assert len(events) == 6 and all(event[0] == "remove" for event in events)
+    assert len(watcher.index) == 2
+    open(os.path.join(directory, "sq010/sh0010/anim/v001/w/mb"), "w").close()  # moved out: no longer watched
+    assert watcher.poll(timeout=0.2) == []
+
+    shutil.rmtree(os.path.join(directory, "hamlet"))
+    watcher.poll(timeout=2)
+    assert len(watcher.index) == 0
+    watcher.close()
+    shutil.rmtree(directory)
+
+end = datetime.now()
+log.warning(f"\nDuration: {end-start} for {len(strings)} items. \n"
+      f"(set log level to log.WARNING to measure time, or log.INFO to see detail)")